@@ -1,9 +1,16 @@
 """
 示例Agent实现
 """
+from utils.lazy import lazy_exports
 
-from .prompt_agent import PromptAgent
-from .code_agent import CodeAgent, RandomAgent, AggressiveAgent, DefensiveAgent
-
-__all__ = ['PromptAgent', 'CodeAgent', 'RandomAgent', 'AggressiveAgent', 'DefensiveAgent']
+_EXPORTS = {
+    'PromptAgent': '.prompt_agent',
+    'AsyncPromptAgent': '.async_prompt_agent',
+    'CodeAgent': '.code_agent',
+    'RandomAgent': '.code_agent',
+    'AggressiveAgent': '.code_agent',
+    'DefensiveAgent': '.code_agent',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
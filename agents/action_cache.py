@@ -0,0 +1,110 @@
+"""
+决策缓存
+把观察量化为粗粒度的键（位置、血量、最近敌人的方位与距离、射击冷却等），
+相近局面复用已有的决策，LLM Agent 无需为几乎相同的 Prompt 重复调用模型。
+"""
+import math
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from game.agent import Observation
+
+
+class ActionCache:
+    """按观察键缓存动作，LRU 容量淘汰 + 按回合计的 TTL 过期"""
+
+    def __init__(self, max_size: int = 256, ttl: int = 20, position_bucket: float = 10.0,
+                 health_bucket: int = 20, distance_bucket: float = 5.0, bearing_sectors: int = 8):
+        """
+        Args:
+            max_size: 最多缓存的条目数，超出时淘汰最久未使用的条目
+            ttl: 条目存活的查询次数（每回合一次查询，即回合数），过期后重新询问模型
+            position_bucket: 位置量化格宽
+            health_bucket: 血量量化档宽
+            distance_bucket: 敌人/子弹距离量化档宽
+            bearing_sectors: 最近敌人相对朝向的方位扇区数
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.position_bucket = position_bucket
+        self.health_bucket = health_bucket
+        self.distance_bucket = distance_bucket
+        self.bearing_sectors = bearing_sectors
+        # 键 -> (动作, 写入时的时钟)
+        self._entries: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, observation: Observation) -> Hashable:
+        """把观察量化为缓存键"""
+        x, y = observation.my_position
+        pb = self.position_bucket
+        enemy = None
+        if observation.enemies_in_view:
+            nearest = min(observation.enemies_in_view, key=lambda e: e['distance'])
+            dx = nearest['position'][0] - x
+            dy = nearest['position'][1] - y
+            # 相对自身朝向的方位，决定该转向还是射击
+            bearing = math.atan2(dy, dx) - math.atan2(observation.my_direction[1], observation.my_direction[0])
+            sector = int(round(bearing / (2 * math.pi) * self.bearing_sectors)) % self.bearing_sectors
+            enemy = (sector, int(nearest['distance'] // self.distance_bucket),
+                     min(len(observation.enemies_in_view), 3))
+        bullet = None
+        if observation.bullets_in_view:
+            bullet = int(min(b['distance'] for b in observation.bullets_in_view) // self.distance_bucket)
+        return (
+            int(x // pb), int(y // pb),
+            int(observation.my_health // self.health_bucket),
+            observation.shoot_cooldown == 0,
+            enemy,
+            bullet,
+        )
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        查询缓存（每次查询推进一次时钟）
+
+        Returns:
+            命中且未过期时返回动作，否则返回 None
+        """
+        self.clock += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            action, stored_at = entry
+            if self.clock - stored_at <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return action
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, action: str):
+        """写入一条决策"""
+        self._entries[key] = (action, self.clock)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率（0~1）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """命中统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'size': len(self._entries),
+        }
+
+    def clear(self):
+        """清空缓存与统计"""
+        self._entries.clear()
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
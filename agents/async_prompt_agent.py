@@ -0,0 +1,161 @@
+"""
+并发版 Prompt Agent - 同一回合的LLM请求并发发出
+"""
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from game.agent import Observation
+from .prompt_agent import PromptAgent
+
+
+# 异步请求共用的后台事件循环与连接池客户端（每个进程各一份，首次使用时创建）
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_async_clients: Dict[Tuple[Optional[str], Optional[str]], "AsyncOpenAI"] = {}
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """获取在守护线程中常驻运行的事件循环"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="prompt-agent-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _shared_async_client(api_key: Optional[str], base_url: Optional[str]) -> "AsyncOpenAI":
+    """同一 (api_key, base_url) 共用一个异步客户端及其连接池"""
+    key = (api_key, base_url)
+    with _loop_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            from openai import AsyncOpenAI
+            # 重试由下一回合重新请求代替，避免单个请求拖过截止时间
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            _async_clients[key] = client
+    return client
+
+
+class AsyncPromptAgent(PromptAgent):
+    """
+    并发版 PromptAgent
+
+    实现批量决策协议 step_batch：引擎每回合把同类全部存活实例交给它一次，
+    各实例的请求通过共享连接池并发发出，Prompt 完全相同的请求合并为一次调用；
+    到达每回合截止时间仍未返回的请求被取消，对应Agent使用上一回合动作或简单脚本动作。
+    """
+    
+    # 每回合截止时间（秒），须小于引擎对 step_batch 的 3 秒限制
+    turn_deadline: float = 2.0
+    
+    def __init__(self, name: str, api_key: Optional[str] = None, model: str = "gpt-4o-mini",
+                 base_url: Optional[str] = None, cache_size: int = 256, cache_ttl: int = 20):
+        super().__init__(name, api_key, model, base_url, cache_size, cache_ttl)
+        self.last_action: Optional[str] = None
+        self.fallback_count = 0
+    
+    def _create_client(self):
+        """异步客户端按 (api_key, base_url) 共享"""
+        return _shared_async_client(self.api_key, self.base_url)
+    
+    def reset(self):
+        """重置Agent状态"""
+        super().reset()
+        self.last_action = None
+    
+    def fallback_action(self, observation: Observation) -> str:
+        """LLM 未按时返回时的动作：沿用上一回合动作，没有则视野内有敌人且可射击时射击"""
+        if self.last_action is not None:
+            return self.last_action
+        if observation.enemies_in_view and observation.shoot_cooldown == 0:
+            return "shoot"
+        return "idle"
+    
+    def step(self, observation: Observation) -> str:
+        """单独调用时等同于只有一个实例的批量决策"""
+        return self.step_batch([self], [observation])[0]
+    
+    @classmethod
+    def step_batch(cls, agents: List["AsyncPromptAgent"], observations: List[Observation]) -> List[str]:
+        """
+        并发请求本回合全部实例的决策
+        
+        引擎把共用此实现的全部子类实例合为一批（每个参赛者都会定义自己的子类），
+        因此截止时间取调用类与各实例所属类中最短的 turn_deadline，回复按各实例所属类解析。
+        
+        Args:
+            agents: 存活实例（可以属于不同子类）
+            observations: 对应的观察
+        
+        Returns:
+            与 agents 顺序一致的动作列表
+        """
+        # 命中决策缓存的实例不发请求；相同客户端、模型与 Prompt 的请求只发一次
+        cached: Dict[int, str] = {}
+        cache_keys = []
+        requests: Dict[Tuple, Tuple["AsyncPromptAgent", str]] = {}
+        keys = []
+        for i, (agent, observation) in enumerate(zip(agents, observations)):
+            cache = agent.action_cache
+            cache_key = cache.key(observation) if cache is not None else None
+            cache_keys.append(cache_key)
+            action = cache.get(cache_key) if cache is not None else None
+            if action is not None:
+                cached[i] = action
+                keys.append(None)
+                continue
+            prompt = agent.build_prompt(observation)
+            key = (id(agent.client), agent.model, prompt)
+            requests.setdefault(key, (agent, prompt))
+            keys.append(key)
+        
+        replies: Dict[Tuple, Optional[str]] = {}
+        if requests:
+            deadline = min([cls.turn_deadline] + [type(agent).turn_deadline for agent, _ in requests.values()])
+            future = asyncio.run_coroutine_threadsafe(cls._request_all(requests, deadline), _background_loop())
+            try:
+                replies = future.result(timeout=deadline + 0.5)
+            except Exception as e:
+                future.cancel()
+                print(f"{cls.__name__} 批量请求失败: {e}")
+        
+        actions = []
+        for i, (agent, observation, key) in enumerate(zip(agents, observations, keys)):
+            if i in cached:
+                action = cached[i]
+            elif key in replies:
+                action = type(agent).parse_action(replies[key])
+                if agent.action_cache is not None:
+                    agent.action_cache.put(cache_keys[i], action)
+            else:
+                agent.fallback_count += 1
+                action = agent.fallback_action(observation)
+            agent.last_action = action
+            actions.append(action)
+        return actions
+    
+    @staticmethod
+    async def _request_all(requests: Dict[Tuple, Tuple["AsyncPromptAgent", str]],
+                           deadline: float) -> Dict[Tuple, Optional[str]]:
+        """并发发出请求，截止时间到达后取消未完成的请求，返回 {请求键: 回复文本}"""
+        tasks = {
+            asyncio.ensure_future(agent.client.chat.completions.create(**agent._request_kwargs(prompt))): key
+            for key, (agent, prompt) in requests.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"警告: {len(pending)} 个LLM请求超过截止时间 ({deadline:.1f}秒)，使用后备动作")
+        
+        replies = {}
+        for task in done:
+            key = tasks[task]
+            if task.exception() is not None:
+                print(f"AsyncPromptAgent {requests[key][0].name} LLM调用失败: {task.exception()}")
+                continue
+            replies[key] = task.result().choices[0].message.content
+        return replies
@@ -1,21 +1,38 @@
 """
 Prompt派Agent - 通过LLM生成决策
 """
+import importlib.util
 import os
-from typing import Optional
+from typing import Dict, Optional
 from game.agent import Agent, Observation
+from .action_cache import ActionCache
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# openai 库导入较慢，只检查是否安装，创建客户端时才导入
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+
+VALID_ACTIONS = [
+    "move_up", "move_down", "move_left", "move_right",
+    "turn_left", "turn_right", "shoot", "idle"
+]
+
+SYSTEM_PROMPT = "你是一个战斗AI，只返回动作指令，不要有任何解释。"
 
 
 class PromptAgent(Agent):
     """通过Prompt调用LLM生成决策的Agent"""
     
-    def __init__(self, name: str, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+    def __init__(self, name: str, api_key: Optional[str] = None, model: str = "gpt-4o-mini",
+                 base_url: Optional[str] = None, cache_size: int = 256, cache_ttl: int = 20):
+        """
+        Args:
+            name: Agent名称
+            api_key: OpenAI API Key，None 时读取 OPENAI_API_KEY 环境变量
+            model: 模型名称
+            base_url: 兼容 OpenAI 协议的服务地址，None 表示官方接口
+            cache_size: 决策缓存容量（见 agents.action_cache），0 表示不缓存
+            cache_ttl: 缓存条目存活的回合数
+        """
         super().__init__(name)
         self.model = model
         
@@ -29,9 +46,17 @@ class PromptAgent(Agent):
         if api_key is None:
             raise ValueError("需要提供 OpenAI API Key 或设置 OPENAI_API_KEY 环境变量")
         
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = self._create_client()
+        self.action_cache = ActionCache(cache_size, cache_ttl) if cache_size > 0 else None
         self.prompt_template = self._default_prompt_template()
     
+    def _create_client(self):
+        """创建同步客户端"""
+        from openai import OpenAI
+        return OpenAI(api_key=self.api_key, base_url=self.base_url)
+    
     def _default_prompt_template(self) -> str:
         """默认Prompt模板"""
         return """你是一个顶级的战斗特工AI。你的目标是生存并击败所有敌人。
@@ -70,8 +95,8 @@ class PromptAgent(Agent):
 请根据当前状态，分析最优策略，只返回一个动作字符串，不要有任何其他解释。
 你的决策是："""
     
-    def step(self, observation: Observation) -> str:
-        """通过LLM生成决策"""
+    def build_prompt(self, observation: Observation) -> str:
+        """根据观察填充Prompt模板"""
         # 格式化敌人信息
         if observation.enemies_in_view:
             enemies_info = "\n".join([
@@ -91,8 +116,7 @@ class PromptAgent(Agent):
         else:
             bullets_info = "  无"
         
-        # 构建Prompt
-        prompt = self.prompt_template.format(
+        return self.prompt_template.format(
             my_health=observation.my_health,
             my_position=observation.my_position,
             my_direction=observation.my_direction,
@@ -101,44 +125,61 @@ class PromptAgent(Agent):
             enemies_info=enemies_info,
             bullets_info=bullets_info
         )
+    
+    def _request_kwargs(self, prompt: str) -> Dict:
+        """chat.completions.create 的参数"""
+        return {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 10
+        }
+    
+    @staticmethod
+    def parse_action(text: Optional[str]) -> str:
+        """从LLM回复中提取动作，无法识别时返回 idle"""
+        action = (text or "").strip().lower()
+        
+        # 如果返回的动作不在有效列表中，尝试提取
+        if action not in VALID_ACTIONS:
+            for valid_action in VALID_ACTIONS:
+                if valid_action in action:
+                    return valid_action
+            # 如果无法匹配，返回idle
+            return "idle"
+        return action
+    
+    def step(self, observation: Observation) -> str:
+        """通过LLM生成决策（相近局面直接使用缓存的决策）"""
+        cache = self.action_cache
+        if cache is not None:
+            key = cache.key(observation)
+            action = cache.get(key)
+            if action is not None:
+                return action
+        
+        prompt = self.build_prompt(observation)
         
         try:
             # 调用LLM
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个战斗AI，只返回动作指令，不要有任何解释。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=10
-            )
-            
-            action = response.choices[0].message.content.strip().lower()
-            
-            # 验证动作有效性
-            valid_actions = [
-                "move_up", "move_down", "move_left", "move_right",
-                "turn_left", "turn_right", "shoot", "idle"
-            ]
-            
-            # 如果返回的动作不在有效列表中，尝试提取
-            if action not in valid_actions:
-                for valid_action in valid_actions:
-                    if valid_action in action:
-                        action = valid_action
-                        break
-                else:
-                    # 如果无法匹配，返回idle
-                    action = "idle"
-            
-            return action
+            response = self.client.chat.completions.create(**self._request_kwargs(prompt))
+            action = self.parse_action(response.choices[0].message.content)
             
         except Exception as e:
             print(f"PromptAgent {self.name} LLM调用失败: {e}")
             return "idle"
+        
+        if cache is not None:
+            cache.put(key, action)
+        return action
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """决策缓存命中统计（未启用缓存时为空字典）"""
+        return self.action_cache.stats() if self.action_cache is not None else {}
     
     def set_prompt_template(self, template: str):
         """设置自定义Prompt模板"""
         self.prompt_template = template
-
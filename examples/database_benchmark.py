@@ -0,0 +1,83 @@
+"""
+数据库写入性能基准
+在临时数据库中写入 100000 条比赛记录（每场附带一条积分历史），比较：
+逐条提交、工作单元（一个事务内逐条写入）、工作单元 + executemany 批量写入，
+以及 4 个线程各用自己的连接并发写入。
+
+运行: python -m examples.database_benchmark
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from utils.database import Database
+
+
+NUM_MATCHES = 100_000
+NUM_THREADS = 4
+PARTICIPANTS = [f"player_{i:03d}" for i in range(100)]
+
+
+def make_records(count: int, offset: int = 0):
+    matches, points = [], []
+    for i in range(offset, offset + count):
+        players = [PARTICIPANTS[(i + k * 7) % len(PARTICIPANTS)] for k in range(4)]
+        record = {'date': f"2026-03-{i % 28 + 1:02d}", 'match_index': i,
+                  'winner_id': players[0], 'replay_path': f"match_{i:06d}.replay.json"}
+        for k, pid in enumerate(players, 1):
+            record[f'agent{k}_id'] = pid
+            record[f'agent{k}_score'] = (i * k) % 100
+        matches.append(record)
+        points.append((players[0], record['date'], 3, None, "match_win"))
+    return matches, points
+
+
+def per_row_commit(db: Database, matches, points):
+    for match, point in zip(matches, points):
+        db.record_match(match)
+        db.record_point_history(*point)
+
+
+def unit_of_work(db: Database, matches, points):
+    with db.transaction():
+        per_row_commit(db, matches, points)
+
+
+def bulk(db: Database, matches, points):
+    with db.transaction():
+        db.record_matches(matches)
+        db.record_point_history_batch(points)
+
+
+def threaded_bulk(db: Database, matches, points):
+    chunk = len(matches) // NUM_THREADS
+    threads = [threading.Thread(target=bulk, args=(db, matches[i * chunk:(i + 1) * chunk],
+                                                   points[i * chunk:(i + 1) * chunk]))
+               for i in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    matches, points = make_records(NUM_MATCHES)
+    print(f"数据库写入基准: {NUM_MATCHES} 场比赛 + {len(points)} 条积分历史\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, write in (("逐条提交", per_row_commit),
+                             ("工作单元（逐条写入）", unit_of_work),
+                             ("工作单元 + executemany", bulk),
+                             (f"{NUM_THREADS} 线程 executemany", threaded_bulk)):
+            db = Database(str(Path(tmp) / f"{write.__name__}.db"))
+            start = time.perf_counter()
+            write(db, matches, points)
+            elapsed = time.perf_counter() - start
+            count = db.conn.execute("SELECT COUNT(*) FROM daily_matches").fetchone()[0]
+            db.close()
+            print(f"{label:<24} {elapsed * 1000:>9.1f}ms  {NUM_MATCHES / elapsed:>10.0f} 场/秒  (写入 {count} 场)")
+
+
+if __name__ == "__main__":
+    main()
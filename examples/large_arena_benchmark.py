@@ -0,0 +1,56 @@
+"""
+大地图模式性能基准
+在 2000×2000 地图上逐步增加Agent数量，比较区块兴趣管理与全量扫描下单个Agent每回合的耗时。
+开启兴趣管理时单个Agent的代价应基本不随总人数增长（亚线性），全量扫描则随人数线性增长。
+
+运行: python -m examples.large_arena_benchmark
+"""
+import random
+import time
+
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+from game.arena import LargeArena
+from game.engine import GameEngine
+
+
+MAP_SIZE = 2000
+TURNS = 30
+
+
+def measure(num_agents: int, interest_management: bool, seed: int = 7):
+    """
+    运行若干回合
+
+    Returns:
+        (地图生成耗时秒, 单个Agent每回合耗时微秒, 终局状态)
+    """
+    random.seed(seed)
+    agents = [(AggressiveAgent if i % 2 else DefensiveAgent)(f"p{i}") for i in range(num_agents)]
+
+    start = time.perf_counter()
+    engine = GameEngine(agents, MAP_SIZE, MAP_SIZE, seed=seed, arena=LargeArena())
+    setup = time.perf_counter() - start
+    if not interest_management:
+        # 保留同样的地图，只关闭区块查询，退回逐个扫描全部Agent/子弹/障碍
+        engine.arena = None
+
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        engine.step()
+    per_agent = (time.perf_counter() - start) / TURNS / num_agents * 1e6
+    final = [(a.health, a.position) for a in agents]
+    return setup, per_agent, final
+
+
+def main():
+    print(f"大地图基准: {MAP_SIZE}x{MAP_SIZE} 地图，{TURNS} 回合\n")
+    print(f"{'Agent数':>8} {'地图生成':>10} {'区块查询':>14} {'全量扫描':>14} {'结果一致':>8}")
+    for n in (50, 100, 250, 500):
+        setup, indexed, final_indexed = measure(n, True)
+        _, full, final_full = measure(n, False)
+        print(f"{n:>8} {setup * 1000:>8.1f}ms {indexed:>10.1f}us/个 {full:>10.1f}us/个 "
+              f"{'是' if final_indexed == final_full else '否':>8}")
+
+
+if __name__ == "__main__":
+    main()
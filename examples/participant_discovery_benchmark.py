@@ -0,0 +1,79 @@
+"""
+参赛者发现性能基准
+在临时目录中生成 1000 个参赛者，比较首次扫描（逐个导入并写入清单）与
+清单命中后的扫描耗时（不导入任何参赛者模块）。
+
+运行: python -m examples.participant_discovery_benchmark
+"""
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from utils.agent_loader import AgentLoader
+from utils.participant_manager import ParticipantManager
+
+
+NUM_PARTICIPANTS = 1000
+
+AGENT_TEMPLATE = '''"""
+生成的测试选手 {index}
+"""
+from agents.code_agent import CodeAgent
+from game.agent import Observation
+
+
+class Agent(CodeAgent):
+    """按编号巡逻的测试选手"""
+
+    def step(self, observation: Observation) -> str:
+        if observation.enemies_in_view and observation.shoot_cooldown == 0:
+            return "shoot"
+        return ["move_up", "move_right", "move_down", "move_left"][({index} + observation.shoot_cooldown) % 4]
+'''
+
+
+def make_participants(root: Path, count: int):
+    for i in range(count):
+        player_dir = root / f"player_{i:04d}"
+        player_dir.mkdir()
+        (player_dir / "agent.py").write_text(AGENT_TEMPLATE.format(index=i), encoding='utf-8')
+
+
+def timed(func):
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "participants"
+        root.mkdir()
+        make_participants(root, NUM_PARTICIPANTS)
+        print(f"参赛者发现基准: {NUM_PARTICIPANTS} 个参赛者目录\n")
+
+        for label, factory, scan in (
+            ("AgentLoader.discover_agents", AgentLoader, lambda o: o.discover_agents()),
+            ("ParticipantManager.scan", ParticipantManager, lambda o: o.scan_participants_directory()),
+        ):
+            manifest_file = str(Path(tmp) / f"{factory.__name__}.manifest.json")
+            cold_obj = factory(str(root), manifest_file=manifest_file)
+            cold, found = timed(lambda: scan(cold_obj))
+            warm_obj = factory(str(root), manifest_file=manifest_file)
+            warm, _ = timed(lambda: scan(warm_obj))
+            print(f"{label:<30} 首次 {cold * 1000:>8.1f}ms（导入 {cold_obj.manifest.imports} 个）  "
+                  f"清单命中 {warm * 1000:>7.1f}ms（导入 {warm_obj.manifest.imports} 个）  发现 {len(found)} 个")
+
+        # 修改一个参赛者后只重新导入这一个
+        target = root / "player_0007" / "agent.py"
+        target.write_text(target.read_text(encoding='utf-8') + "\n# 修改\n", encoding='utf-8')
+        loader = AgentLoader(str(root), manifest_file=str(Path(tmp) / "AgentLoader.manifest.json"))
+        elapsed, _ = timed(loader.discover_agents)
+        print(f"\n修改 1 个参赛者后重新扫描: {elapsed * 1000:.1f}ms（导入 {loader.manifest.imports} 个）")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,18 +32,19 @@ def main():
         while engine.state.turn < 500:
             state_info = engine.step()
             
-            # 每5回合显示一次
-            if engine.state.turn % 5 == 0:
-                visualizer.render(state_info, clear=True)
-                time.sleep(0.2)
+            # 每回合都提交渲染，差量刷新只重绘变化的部分，超出帧率的帧会被跳过
+            visualizer.render(state_info, clear=True)
+            time.sleep(0.04)
             
             # 检查是否有获胜者（只允许在只剩一个存活者时判定）
             winner = engine.state.get_winner(allow_score_judge=False)
             if winner:
-                visualizer.render(state_info, clear=True)
+                visualizer.render(state_info, clear=True, force=True)
+                visualizer.close()
                 print(f"\n{winner.name} 获胜！")
                 break
     except KeyboardInterrupt:
+        visualizer.close()
         print("\n\n游戏被用户中断")
     
     # 显示最终统计
@@ -1,9 +1,21 @@
 """
 AI竞技平台 - 游戏框架
 """
+from utils.lazy import lazy_exports
 
-from .engine import GameEngine, GameState
-from .agent import Agent, Observation
-
-__all__ = ['GameEngine', 'GameState', 'Agent', 'Observation']
+_EXPORTS = {
+    'GameEngine': '.engine',
+    'GameState': '.engine',
+    'Agent': '.agent',
+    'Observation': '.agent',
+    'ActionPlan': '.agent',
+    'MatchRunner': '.match_runner',
+    'ReplayRecorder': '.match_runner',
+    'StallTimeoutPolicy': '.match_runner',
+    'Ruleset': '.ruleset',
+    'load_ruleset': '.ruleset',
+    'LargeArena': '.arena',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
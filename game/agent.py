@@ -1,7 +1,7 @@
 """
 Agent基类定义
 """
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Sequence, Iterable, Union, Callable
 from abc import ABC, abstractmethod
 import math
 
@@ -21,6 +21,8 @@ class Observation:
         self.supplies_in_view = data.get('supplies_in_view', [])
         self.map_boundary = tuple(data.get('map_boundary', [100, 100]))
         self.shoot_cooldown = data.get('shoot_cooldown', 0)
+        # 定长特征向量（numpy 数组，引擎设置了 observation_encoder 时提供，见 game.features）
+        self.features = None
         self._raw = data
     
     def to_dict(self) -> Dict[str, Any]:
@@ -41,6 +43,35 @@ class Observation:
         }
 
 
+class ActionPlan:
+    """
+    多回合动作计划：step() 可返回 ActionPlan（或动作列表）一次决定接下来的若干回合
+
+    引擎本回合执行第一个动作，之后逐回合执行剩余动作而不再调用 step()，
+    直到队列为空或中断条件成立（此时丢弃剩余动作并重新调用 step()）。
+    """
+    
+    # 内置中断条件
+    NEW_ENEMY = 'new_enemy'  # 视野中出现制定计划时没有看到的敌人
+    DAMAGED = 'damaged'      # 受到伤害
+    
+    def __init__(self, actions: Sequence[str],
+                 interrupt_on: Iterable[Union[str, Callable[[Observation], bool]]] = (NEW_ENEMY, DAMAGED)):
+        """
+        Args:
+            actions: 依次执行的动作
+            interrupt_on: 中断条件，内置条件名或 callable(observation) -> bool
+        """
+        self.actions = list(actions)
+        self.interrupt_on = tuple(interrupt_on)
+        for condition in self.interrupt_on:
+            if not callable(condition) and condition not in (self.NEW_ENEMY, self.DAMAGED):
+                raise ValueError(f"未知的中断条件: {condition}")
+    
+    def __repr__(self) -> str:
+        return f"ActionPlan({self.actions}, interrupt_on={self.interrupt_on})"
+
+
 class Agent(ABC):
     """Agent基类，所有参与者需要继承此类"""
     
@@ -61,6 +92,13 @@ class Agent(ABC):
             'rocket': 0
         }
     
+    # 可选的批量决策协议：子类可实现类方法
+    #     @classmethod
+    #     def step_batch(cls, agents: List["Agent"], observations: List[Observation]) -> List[str]
+    # 引擎每回合对同一类的全部存活实例只调用一次（观察均在本回合行动前构建），
+    # 返回与 agents 顺序一致的动作列表；实现后该类不再逐个调用 step()。
+    # step_batch 的每个结果只能是单个动作，多回合计划（ActionPlan）仅适用于 step()。
+    
     @abstractmethod
     def step(self, observation: Observation) -> str:
         """
@@ -75,6 +113,7 @@ class Agent(ABC):
             - "turn_left", "turn_right"
             - "shoot"
             - "idle" (不执行任何动作)
+            也可返回 ActionPlan 或动作列表，一次决定多个回合（见 ActionPlan）
         """
         pass
     
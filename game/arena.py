@@ -0,0 +1,196 @@
+"""
+大地图模式
+支持 2000×2000 级别地图与数百名Agent：Poisson-disk 出生点、按网格程序化生成的障碍及其空间索引，
+以及按区块（chunk）的兴趣管理——构建观察和碰撞检测时只查询附近区块中的对象，单个Agent的代价与总人数基本无关。
+"""
+import math
+import random
+from typing import Dict, Iterable, List, Tuple
+
+
+class SpatialHash:
+    """均匀网格空间索引：按区块存放对象编号，按范围取候选"""
+
+    def __init__(self, cell_size: float):
+        """
+        Args:
+            cell_size: 区块边长
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def insert(self, item: int, x: float, y: float):
+        """放入一个点对象"""
+        cs = self.cell_size
+        self.cells.setdefault((int(x // cs), int(y // cs)), []).append(item)
+
+    def insert_rect(self, item: int, x: float, y: float, w: float, h: float):
+        """放入一个矩形对象（登记到它覆盖的每个区块）"""
+        cs = self.cell_size
+        for cx in range(int(x // cs), int((x + w) // cs) + 1):
+            for cy in range(int(y // cs), int((y + h) // cs) + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def at(self, x: float, y: float) -> List[int]:
+        """点 (x, y) 所在区块中的对象"""
+        cs = self.cell_size
+        return self.cells.get((int(x // cs), int(y // cs)), [])
+
+    def query(self, x: float, y: float, radius: float) -> List[int]:
+        """
+        与以 (x, y) 为中心、边长 2*radius 的正方形相交的区块中的对象
+
+        Returns:
+            升序去重的对象编号（调用方仍需做精确距离判断）
+        """
+        cs = self.cell_size
+        cells = self.cells
+        found: List[int] = []
+        for cx in range(int((x - radius) // cs), int((x + radius) // cs) + 1):
+            for cy in range(int((y - radius) // cs), int((y + radius) // cs) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return sorted(set(found))
+
+
+def poisson_disk_points(rng: random.Random, count: int, width: float, height: float,
+                        spacing: float, margin: float = 0.0,
+                        max_attempts_per_point: int = 30) -> List[Tuple[float, float]]:
+    """
+    在矩形区域内投点，任意两点间距不小于 spacing（Poisson-disk 投镖采样）
+
+    以 spacing/√2 为格宽的背景网格每格至多一个点，每次候选只需检查周围 5×5 格，
+    总代价与点数成线性，而不是逐个与已放置的点比较。
+
+    Args:
+        rng: 随机源
+        count: 需要的点数
+        width: 区域宽度
+        height: 区域高度
+        spacing: 最小间距
+        margin: 与边界的距离
+        max_attempts_per_point: 平均每个点的最大尝试次数
+
+    Returns:
+        点列表（区域过于拥挤时可能少于 count 个）
+    """
+    cell = spacing / math.sqrt(2)
+    grid: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    points: List[Tuple[float, float]] = []
+    spacing_sq = spacing * spacing
+    attempts = count * max_attempts_per_point
+    while len(points) < count and attempts > 0:
+        attempts -= 1
+        x = rng.uniform(margin, width - margin)
+        y = rng.uniform(margin, height - margin)
+        gx, gy = int(x // cell), int(y // cell)
+        ok = True
+        for cx in range(gx - 2, gx + 3):
+            for cy in range(gy - 2, gy + 3):
+                p = grid.get((cx, cy))
+                if p is not None and (p[0] - x) ** 2 + (p[1] - y) ** 2 < spacing_sq:
+                    ok = False
+                    break
+            if not ok:
+                break
+        if ok:
+            grid[(gx, gy)] = (x, y)
+            points.append((x, y))
+    return points
+
+
+class LargeArena:
+    """大地图模式参数与地图生成"""
+
+    # 障碍索引中矩形外扩的距离（与引擎中的角色半径一致）
+    AGENT_RADIUS = 2.0
+
+    def __init__(self, chunk_size: float = 30.0, spawn_spacing: float = 15.0,
+                 spawn_margin: float = 20.0, obstacle_cell: float = 60.0,
+                 obstacle_chance: float = 0.4, agent_margin: float = 12.0):
+        """
+        Args:
+            chunk_size: 兴趣管理的区块边长（建议与视野距离相当）
+            spawn_spacing: 出生点最小间距
+            spawn_margin: 出生点与地图边界的距离
+            obstacle_cell: 障碍生成网格的格宽，每格至多一个障碍，障碍之间天然不重叠
+            obstacle_chance: 每格生成障碍的概率
+            agent_margin: 障碍与出生点的最小距离
+        """
+        self.chunk_size = chunk_size
+        self.spawn_spacing = spawn_spacing
+        self.spawn_margin = spawn_margin
+        self.obstacle_cell = obstacle_cell
+        self.obstacle_chance = obstacle_chance
+        self.agent_margin = agent_margin
+
+    def to_dict(self) -> Dict[str, float]:
+        """导出参数（可用 LargeArena(**d) 重建，用于回放）"""
+        return dict(vars(self))
+
+    def place_agents(self, agents: Iterable, rng: random.Random, width: float, height: float):
+        """用 Poisson-disk 采样放置Agent并随机朝向"""
+        agents = list(agents)
+        points = poisson_disk_points(rng, len(agents), width, height,
+                                     self.spawn_spacing, self.spawn_margin)
+        if len(points) < len(agents):
+            print(f"警告: 地图过于拥挤，{len(agents) - len(points)} 名Agent无法满足出生间距，使用随机位置")
+        for i, agent in enumerate(agents):
+            if i < len(points):
+                agent.position = points[i]
+            else:
+                agent.position = (rng.uniform(self.spawn_margin, width - self.spawn_margin),
+                                  rng.uniform(self.spawn_margin, height - self.spawn_margin))
+            angle = rng.uniform(0, 2 * math.pi)
+            agent.direction = (math.cos(angle), math.sin(angle))
+
+    def generate_obstacles(self, agents: Iterable, rng: random.Random, width: float,
+                           height: float) -> List[Tuple[float, float, float, float]]:
+        """
+        按网格程序化生成矩形障碍：每格以 obstacle_chance 的概率在格内（留出间距）放一个障碍，
+        与出生点过近的障碍被丢弃
+
+        Returns:
+            [(x, y, w, h), ...]
+        """
+        spawn_index = SpatialHash(self.obstacle_cell)
+        positions = [a.position for a in agents]
+        for i, (x, y) in enumerate(positions):
+            spawn_index.insert(i, x, y)
+
+        cell = self.obstacle_cell
+        gap = 6.0  # 障碍与格边的间距，保证相邻障碍之间留出通道
+        max_w = min(12.0 + cell / 5, cell - 2 * gap)
+        max_h = min(8.0 + cell / 8, cell - 2 * gap)
+        placed = []
+        for gx in range(int(width // cell)):
+            for gy in range(int(height // cell)):
+                if rng.random() >= self.obstacle_chance:
+                    continue
+                w = rng.uniform(6.0, max_w)
+                h = rng.uniform(4.0, max_h)
+                x = gx * cell + rng.uniform(gap, cell - gap - w)
+                y = gy * cell + rng.uniform(gap, cell - gap - h)
+                if self._far_from_spawns(x, y, w, h, positions, spawn_index):
+                    placed.append((x, y, w, h))
+        return placed
+
+    def _far_from_spawns(self, x, y, w, h, positions, spawn_index: SpatialHash) -> bool:
+        m = self.agent_margin
+        for i in spawn_index.query(x + w / 2, y + h / 2, max(w, h) / 2 + m):
+            ax, ay = positions[i]
+            cx = min(max(ax, x), x + w)
+            cy = min(max(ay, y), y + h)
+            if (ax - cx) ** 2 + (ay - cy) ** 2 < m * m:
+                return False
+        return True
+
+    def build_obstacle_index(self, obstacles: List[dict]) -> SpatialHash:
+        """障碍空间索引（矩形按角色半径外扩后登记），用于阻挡判定与视野查询"""
+        index = SpatialHash(self.chunk_size)
+        r = self.AGENT_RADIUS
+        for i, obs in enumerate(obstacles):
+            x, y, w, h = obs['rect']
+            index.insert_rect(i, x - r, y - r, w + 2 * r, h + 2 * r)
+        return index
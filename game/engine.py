@@ -4,8 +4,23 @@
 import random
 import math
 import time
-from typing import List, Dict, Tuple, Optional, Any
-from .agent import Agent, Observation
+from typing import List, Dict, Tuple, Optional, Any, Callable
+from collections import deque
+from .agent import Agent, Observation, ActionPlan
+from .events import GameEvent, FIRE, HIT, SPLASH, KILL, PICKUP, SPAWN
+from .ruleset import Ruleset, default_ruleset
+from .arena import LargeArena, SpatialHash
+
+
+# 引擎规则版本：任何会改变同种子同动作下比赛结果的改动都应递增（回放据此校验）
+ENGINE_VERSION = 3
+
+# 合法动作（顺序即回放中的动作编码，只能在末尾追加）
+VALID_ACTIONS = ["move_up", "move_down", "move_left", "move_right",
+                 "turn_left", "turn_right", "shoot", "idle"]
+ACTION_CODES = {action: code for code, action in enumerate(VALID_ACTIONS)}
+NO_ACTION = 255  # 回放中阵亡Agent的占位编码
+MAX_PLAN_LENGTH = 50  # 单个动作计划最多的回合数
 
 
 class Bullet:
@@ -38,8 +53,15 @@ class Bullet:
 
 class GameState:
     """游戏状态"""
-    def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100):
+    def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100,
+                 rng: Optional[random.Random] = None, ruleset: Optional[Ruleset] = None,
+                 arena: Optional[LargeArena] = None):
         self.agents = agents
+        # 引擎内部随机源（传入固定种子的 Random 可复现整场比赛）
+        self.rng = rng or random.Random()
+        self.ruleset = ruleset or default_ruleset()
+        # 大地图模式（None 为默认的小地图生成方式）
+        self.arena = arena
         self.map_width = map_width
         self.map_height = map_height
         self.bullets: List[Bullet] = []
@@ -47,14 +69,25 @@ class GameState:
         # 障碍物作为轴对齐矩形（AABB），充当墙体
         # 结构：{'rect': (x, y, w, h)}，x,y 为左上角
         self.obstacles: List[Dict[str, Any]] = []
-        self.supplies: List[Dict[str, Any]] = []   # {position:(x,y), type: 'health'|'ammo_shotgun'|'ammo_sniper'|'ammo_rocket'|'weapon_shotgun'|'weapon_sniper'|'weapon_rocket'}
+        self.obstacle_index: Optional[SpatialHash] = None  # 大地图模式下的障碍空间索引
+        self.supplies: List[Dict[str, Any]] = []   # {position:(x,y), type: 规则集 supplies 中的补给类型，如 'health'|'ammo_shotgun'|'weapon_rocket'}
         self.turn = 0
         self.max_turns = 500  # 最大回合数，防止无限循环
         
-        # 初始化Agent位置（随机分布）
-        self._initialize_positions()
-        # 初始化障碍物
-        self._initialize_obstacles()
+        # 存活计数（Agent阵亡时增量维护，终局判定无需每回合重建存活列表）
+        self.recount_alive()
+        
+        if arena is not None:
+            # 大地图：Poisson-disk 出生点 + 按网格程序化生成的障碍
+            arena.place_agents(agents, self.rng, map_width, map_height)
+            rects = arena.generate_obstacles(agents, self.rng, map_width, map_height)
+            self.obstacles = [{'rect': rect} for rect in rects]
+            self.obstacle_index = arena.build_obstacle_index(self.obstacles)
+        else:
+            # 初始化Agent位置（随机分布）
+            self._initialize_positions()
+            # 初始化障碍物
+            self._initialize_obstacles()
         # 在游戏开始时放置少量武器和弹药，确保玩家能找到并使用特殊武器
         self._initialize_starting_supplies()
     
@@ -66,22 +99,22 @@ class GameState:
             attempts = 0
             while attempts < max_attempts_per_agent:
                 attempts += 1
-                x = random.uniform(20, self.map_width - 20)
-                y = random.uniform(20, self.map_height - 20)
+                x = self.rng.uniform(20, self.map_width - 20)
+                y = self.rng.uniform(20, self.map_height - 20)
                 pos = (x, y)
                 # 确保位置不重叠
                 if all(math.sqrt((x - px[0])**2 + (y - px[1])**2) > 15 for px in positions):
                     positions.append(pos)
                     agent.position = pos
                     # 随机初始方向
-                    angle = random.uniform(0, 2 * math.pi)
+                    angle = self.rng.uniform(0, 2 * math.pi)
                     agent.direction = (math.cos(angle), math.sin(angle))
                     break
             else:
                 # 如果无法找到不重叠的位置，使用最后一个尝试的位置
                 print(f"警告: Agent {agent.name} 位置初始化达到最大尝试次数，使用随机位置")
                 agent.position = (x, y)
-                angle = random.uniform(0, 2 * math.pi)
+                angle = self.rng.uniform(0, 2 * math.pi)
                 agent.direction = (math.cos(angle), math.sin(angle))
                 positions.append(agent.position)
     
@@ -110,10 +143,10 @@ class GameState:
 
         while len(placed) < num_obstacles and attempts < max_attempts:
             attempts += 1
-            w = random.uniform(min_w, max_w)
-            h = random.uniform(min_h, max_h)
-            x = random.uniform(margin, self.map_width - margin - w)
-            y = random.uniform(margin, self.map_height - margin - h)
+            w = self.rng.uniform(min_w, max_w)
+            h = self.rng.uniform(min_h, max_h)
+            x = self.rng.uniform(margin, self.map_width - margin - w)
+            y = self.rng.uniform(margin, self.map_height - margin - h)
 
             ok = True
             for (px, py, pw, ph) in placed:
@@ -134,55 +167,125 @@ class GameState:
     
     def _initialize_starting_supplies(self):
         """在游戏开始时放置少量武器和弹药，确保玩家能找到并使用特殊武器"""
-        # 放置2-3个武器，分散在地图上
-        weapon_types = ['weapon_rocket', 'weapon_sniper', 'weapon_shotgun']
-        ammo_types = ['ammo_rocket', 'ammo_sniper', 'ammo_shotgun']
-        
-        # 随机选择2-3个武器类型
-        num_weapons = random.randint(2, 3)
-        selected_weapons = random.sample(list(range(3)), num_weapons)
+        # 按规则集放置若干武器（默认2-3个），分散在地图上
+        starting = self.ruleset.starting_supplies
+        if not starting:
+            return
         
-        def _is_blocked(pos):
-            """检查位置是否被障碍物阻挡"""
-            radius = 2.0
-            x, y = pos
-            for obs in self.obstacles:
-                rx, ry, rw, rh = obs['rect']
-                if (rx - radius) <= x <= (rx + rw + radius) and (ry - radius) <= y <= (ry + rh + radius):
-                    return True
-            return False
+        low, high = self.ruleset.starting_weapon_count
+        num_weapons = self.rng.randint(low, high)
+        selected_weapons = self.rng.sample(list(range(len(starting))), num_weapons)
         
         for idx in selected_weapons:
+            weapon_type, ammo_type = starting[idx]
             # 随机位置，避开障碍物
             for _ in range(30):
-                x = random.uniform(20, self.map_width - 20)
-                y = random.uniform(20, self.map_height - 20)
-                if not _is_blocked((x, y)):
+                x = self.rng.uniform(20, self.map_width - 20)
+                y = self.rng.uniform(20, self.map_height - 20)
+                if not self.is_blocked((x, y)):
                     # 放置武器
                     self.supplies.append({
                         'position': (x, y),
-                        'type': weapon_types[idx]
+                        'type': weapon_type
                     })
+                    if ammo_type is None:
+                        break
                     # 在武器附近放置对应的弹药（1-2个）
-                    num_ammo = random.randint(1, 2)
+                    num_ammo = self.rng.randint(1, 2)
                     for _ in range(num_ammo):
                         for _ in range(20):
-                            ax = x + random.uniform(-8, 8)
-                            ay = y + random.uniform(-8, 8)
+                            ax = x + self.rng.uniform(-8, 8)
+                            ay = y + self.rng.uniform(-8, 8)
                             ax = max(10, min(self.map_width - 10, ax))
                             ay = max(10, min(self.map_height - 10, ay))
-                            if not _is_blocked((ax, ay)):
+                            if not self.is_blocked((ax, ay)):
                                 self.supplies.append({
                                     'position': (ax, ay),
-                                    'type': ammo_types[idx]
+                                    'type': ammo_type
                                 })
                                 break
                     break
     
+    def is_blocked(self, pos: Tuple[float, float]) -> bool:
+        """点是否被任何矩形障碍阻挡，考虑角色半径膨胀（大地图模式只检查所在区块的障碍）"""
+        radius = 2.0
+        x, y = pos
+        obstacles = self.obstacles
+        if self.obstacle_index is not None:
+            obstacles = [obstacles[i] for i in self.obstacle_index.at(x, y)]
+        for obs in obstacles:
+            rx, ry, rw, rh = obs['rect']
+            # 将矩形外扩 radius，判断点是否在外扩矩形内
+            if (rx - radius) <= x <= (rx + rw + radius) and (ry - radius) <= y <= (ry + rh + radius):
+                return True
+        return False
+    
     def get_alive_agents(self) -> List[Agent]:
         """获取存活的Agent列表"""
         return [a for a in self.agents if a.health > 0]
     
+    def recount_alive(self):
+        """
+        按当前血量重建存活计数
+        
+        引擎内的阵亡都会通过 mark_dead() 增量更新计数；只有在外部直接修改Agent血量后才需要调用。
+        """
+        self.alive_count = 0
+        self.team_alive: Dict[Any, int] = {}  # {team_id: 存活人数}，仅统计有队伍的Agent
+        self._solo_alive = 0  # 无队伍的存活Agent数
+        self._winner: Optional[Agent] = None
+        self.decided_turn: Optional[int] = None  # 比赛分出结果（至多剩一方存活）的回合
+        for agent in self.agents:
+            if agent.health > 0:
+                self._count_alive(agent, 1)
+        if self.is_decided:
+            self._on_decided()
+    
+    def _count_alive(self, agent: Agent, delta: int):
+        self.alive_count += delta
+        if agent.team_id is None:
+            self._solo_alive += delta
+        else:
+            count = self.team_alive.get(agent.team_id, 0) + delta
+            if count > 0:
+                self.team_alive[agent.team_id] = count
+            else:
+                self.team_alive.pop(agent.team_id, None)
+    
+    def mark_dead(self, agent: Agent):
+        """Agent阵亡时由引擎调用，更新存活计数并在比赛分出结果时记录回合"""
+        self._count_alive(agent, -1)
+        if self.decided_turn is None and self.is_decided:
+            self._on_decided()
+        elif self.alive_count == 1:
+            # 组队比赛在队友仍有多人存活时就已分出结果，之后（如友军火箭溅射）只剩一人时才有唯一存活者
+            self._find_winner()
+    
+    def _on_decided(self):
+        self.decided_turn = self.turn
+        self._find_winner()
+    
+    def _find_winner(self):
+        if self.alive_count == 1:
+            self._winner = next(a for a in self.agents if a.health > 0)
+    
+    @property
+    def is_decided(self) -> bool:
+        """是否至多剩一方存活（一个队伍，或一名无队伍的Agent，或全部阵亡）"""
+        return len(self.team_alive) + self._solo_alive <= 1
+    
+    @property
+    def winner(self) -> Optional[Agent]:
+        """唯一的存活者（与 get_winner(allow_score_judge=False) 一致），O(1)"""
+        return self._winner if self.alive_count == 1 else None
+    
+    @property
+    def winning_team(self) -> Optional[Any]:
+        """所有有队伍的存活者同属的队伍ID（与 GameEngine._get_winning_team 一致），O(1)"""
+        if len(self.team_alive) == 1:
+            return next(iter(self.team_alive))
+        return None
+    
     def get_winner(self, allow_score_judge: bool = False) -> Optional[Agent]:
         """
         获取获胜者
@@ -194,17 +297,16 @@ class GameState:
         Args:
             allow_score_judge: 是否允许通过评分判定获胜者（用于超时后的判定）
         """
-        alive = self.get_alive_agents()
-        if len(alive) == 1:
-            return alive[0]
-        if len(alive) == 0:
+        if self.alive_count == 1:
+            return self.winner
+        if self.alive_count == 0:
             return None
         
         # 如果有多个存活者，只有在明确允许的情况下才按评分判定
         # 这避免了游戏在早期就因为评分差异而过早结束
         if allow_score_judge:
             # 按评分排序：击杀数 > 剩余血量
-            scored = [(a, a.kills * 10000 + a.health) for a in alive]
+            scored = [(a, a.kills * 10000 + a.health) for a in self.get_alive_agents()]
             scored.sort(key=lambda x: x[1], reverse=True)
             
             # 检查是否有明确的获胜者（评分最高且唯一）
@@ -215,20 +317,106 @@ class GameState:
         return None
 
 
+class _QueuedPlan:
+    """执行中的动作计划：剩余动作与判断中断所需的基准"""
+
+    def __init__(self, plan: ActionPlan, observation: Observation, health: int):
+        self.actions = deque(plan.actions[1:])
+        self.interrupt_on = plan.interrupt_on
+        self.seen_enemies = {e['name'] for e in observation.enemies_in_view}
+        self.last_health = health
+
+    def interrupted(self, agent: Agent, observation: Observation) -> bool:
+        """中断条件是否成立（并更新受伤判断的基准血量）；自定义条件抛出异常时视为中断"""
+        damaged = agent.health < self.last_health
+        self.last_health = agent.health
+        for condition in self.interrupt_on:
+            if condition == ActionPlan.DAMAGED:
+                if damaged:
+                    return True
+            elif condition == ActionPlan.NEW_ENEMY:
+                if any(e['name'] not in self.seen_enemies for e in observation.enemies_in_view):
+                    return True
+            else:
+                try:
+                    if condition(observation):
+                        return True
+                except Exception as e:
+                    # 否则每回合都会重新调用同一个出错的条件，Agent 在计划剩余回合内无法再决策
+                    print(f"警告: Agent {agent.name} 的动作计划中断条件抛出异常: {e}，中断计划")
+                    return True
+        return False
+
+
 class GameEngine:
     """游戏引擎"""
     
-    def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100):
-        self.state = GameState(agents, map_width, map_height)
+    def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100,
+                 seed: Optional[int] = None, event_sink=None, record_actions: bool = False,
+                 ruleset: Optional[Ruleset] = None, arena: Optional[LargeArena] = None,
+                 observation_encoder=None):
+        """
+        Args:
+            agents: 参赛Agent列表
+            map_width: 地图宽度
+            map_height: 地图高度
+            seed: 随机种子（None 时随机生成，可从 engine.seed 读取；相同种子+相同动作可复现比赛）
+            event_sink: 事件接收器（提供 emit(event)，如 game.events.EventRingBuffer），None 表示不记录事件
+            record_actions: 是否记录每回合动作（每个Agent每回合 1 字节，用于 game.replay）
+            ruleset: 规则集（武器、补给与生成权重，见 game.ruleset），None 表示默认规则
+            arena: 大地图模式参数（见 game.arena.LargeArena），None 表示默认地图生成；
+                开启后观察与碰撞只查询附近区块中的对象
+            observation_encoder: 观察特征编码器（如 game.features.ObservationEncoder），
+                设置后每回合行动前一次性编码全部Agent，observation.features 为对应行
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 31)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.event_sink = event_sink
+        self.action_log: Optional[bytearray] = bytearray() if record_actions else None
+        self.ruleset = ruleset or default_ruleset()
+        self.arena = arena
+        self.state = GameState(agents, map_width, map_height, rng=self.rng, ruleset=self.ruleset,
+                               arena=arena)
+        # 大地图模式下每回合重建的区块索引（存放Agent/子弹在列表中的下标）
+        self._agent_index: Optional[SpatialHash] = None
+        self._bullet_index: Optional[SpatialHash] = None
+        # 本回合行动前编码的全部Agent特征矩阵（未设置编码器时为 None）
+        self.observation_encoder = observation_encoder
+        self.observation_features = None
+        # step_batch 的底层实现 -> 使用它的Agent在列表中的下标（每回合一次批量决策）。
+        # 按实现而不是按类分组：每个参赛者目录都会定义自己的子类（如继承 AsyncPromptAgent），
+        # 共用同一个 step_batch 的子类应在一次调用中并发决策
+        self._batch_groups: Dict[Callable, List[int]] = {}
+        for i, agent in enumerate(agents):
+            step_batch = getattr(type(agent), 'step_batch', None)
+            if callable(step_batch):
+                self._batch_groups.setdefault(getattr(step_batch, '__func__', step_batch), []).append(i)
+        # Agent下标 -> 执行中的多回合动作计划（见 ActionPlan）
+        self._plans: Dict[int, _QueuedPlan] = {}
+        self.decision_calls = 0  # step() 实际被调用的次数
+        if event_sink is not None:
+            for supply in self.state.supplies:
+                self._emit(SPAWN, detail=supply['type'])
         self.view_distance = 30.0  # 视野距离
         # 供应生成参数
-        self.supply_spawn_chance = 0.03  # 每回合生成概率（提高以确保有足够补给）
-        self.max_supplies = 12  # 增加最大补给数量
+        self.supply_spawn_chance = self.ruleset.supply_spawn_chance  # 每回合生成概率
+        self.max_supplies = self.ruleset.max_supplies  # 最大补给数量
+    
+    def _emit(self, kind: str, actor: Optional[str] = None, target: Optional[str] = None,
+              detail: Optional[str] = None, amount: int = 0):
+        """向事件接收器发出一个事件（调用方应先确认 event_sink 不为 None）"""
+        self.event_sink.emit(GameEvent(self.state.turn, kind, actor, target, detail, amount))
     
-    def step(self) -> Dict[str, Any]:
+    def step(self, actions: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         执行一个游戏回合
         
+        Args:
+            actions: 按 Agent 顺序给定的本回合动作（回放重演用，不运行Agent代码）；
+                None 表示由各Agent根据观察自行决策
+        
         Returns:
             游戏状态信息字典
         """
@@ -239,59 +427,50 @@ class GameEngine:
             if agent.shoot_cooldown > 0:
                 agent.shoot_cooldown -= 1
         
+        codes = None
+        if self.action_log is not None:
+            codes = bytearray([NO_ACTION]) * len(self.state.agents)
+        
         # 每个Agent执行一步
         self._maybe_spawn_supply()
-        for agent in self.state.agents:
+        if self.arena is not None:
+            self._index_agents()
+            self._bullet_index = SpatialHash(self.arena.chunk_size)
+            for j, bullet in enumerate(self.state.bullets):
+                self._bullet_index.insert(j, bullet.x, bullet.y)
+        batched: Dict[int, str] = {}
+        if actions is None:
+            if self.observation_encoder is not None:
+                self.observation_features = self.observation_encoder.encode_all(self)
+            if self._batch_groups:
+                batched = self._decide_batched()
+        for i, agent in enumerate(self.state.agents):
             if agent.health <= 0:
                 continue
             
-            # 构建观察
-            observation = self._build_observation(agent)
-            
-            # Agent决策（带超时保护）
-            try:
-                start_time = time.time()
-                # 设置超时限制：如果Agent执行超过3秒，强制返回idle
-                action = None
-                try:
-                    action = agent.step(observation)
-                except Exception as e:
-                    print(f"Agent {agent.name} step() 方法抛出异常 (回合 {self.state.turn}): {e}")
-                    import traceback
-                    traceback.print_exc()
-                    action = "idle"
-                
-                elapsed = time.time() - start_time
-                
-                # 如果执行时间过长，警告并强制使用idle
-                if elapsed > 3.0:  # 超过3秒，认为卡住
-                    print(f"警告: Agent {agent.name} 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}，强制使用 'idle'")
-                    action = "idle"
-                elif elapsed > 1.0:  # 超过1秒，警告
-                    print(f"警告: Agent {agent.name} 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}")
-                
-                # 验证动作有效性
-                valid_actions = ["move_up", "move_down", "move_left", "move_right",
-                               "turn_left", "turn_right", "shoot", "idle"]
-                if action is None or action not in valid_actions:
-                    print(f"警告: Agent {agent.name} 返回了无效动作 '{action}'，使用 'idle'")
-                    action = "idle"
-            except Exception as e:
-                print(f"Agent {agent.name} 执行出错 (回合 {self.state.turn}): {e}")
-                import traceback
-                traceback.print_exc()
-                action = "idle"
+            if actions is not None:
+                action = actions[i]
+            elif i in batched:
+                action = batched[i]
+            else:
+                action = self._decide_action(agent, i)
+            if codes is not None:
+                codes[i] = ACTION_CODES[action]
             
             # 执行动作
             self._execute_action(agent, action)
         
+        if codes is not None:
+            self.action_log += codes
+        
         # 更新子弹
-        for bullet in self.state.bullets[:]:
+        for bullet in self.state.bullets:
             bullet.update(self.state.map_width, self.state.map_height)
-            if not bullet.active:
-                self.state.bullets.remove(bullet)
+        self.state.bullets = [b for b in self.state.bullets if b.active]
         
         # 检测碰撞
+        if self.arena is not None:
+            self._index_agents()
         self._check_collisions()
         # 处理拾取
         self._check_pickups()
@@ -301,9 +480,9 @@ class GameEngine:
         # 返回状态
         return {
             'turn': self.state.turn,
-            'alive_count': len(self.state.get_alive_agents()),
-            'winner': (winner.name if (winner := self.state.get_winner(allow_score_judge=False)) else None),
-            'winning_team': self._get_winning_team(),
+            'alive_count': self.state.alive_count,
+            'winner': (winner.name if (winner := self.state.winner) else None),
+            'winning_team': self.state.winning_team,
             'agents': [
                 {
                     'name': a.name,
@@ -339,11 +518,151 @@ class GameEngine:
             ]
         }
     
+    def _index_agents(self):
+        """大地图模式：按区块索引存活Agent"""
+        index = SpatialHash(self.arena.chunk_size)
+        for i, agent in enumerate(self.state.agents):
+            if agent.health > 0:
+                index.insert(i, agent.position[0], agent.position[1])
+        self._agent_index = index
+    
+    def _decide_action(self, agent: Agent, index: int) -> str:
+        """构建观察并调用Agent决策（带超时保护与动作校验）；有未中断的动作计划时直接取下一个动作"""
+        # 构建观察
+        observation = self._build_observation(agent)
+        if self.observation_features is not None:
+            observation.features = self.observation_features[index]
+        
+        # Agent决策（带超时保护）
+        try:
+            queued = self._plans.get(index)
+            if queued is not None:
+                if queued.actions and not queued.interrupted(agent, observation):
+                    return queued.actions.popleft()
+                del self._plans[index]
+            
+            self.decision_calls += 1
+            start_time = time.time()
+            # 设置超时限制：如果Agent执行超过3秒，强制返回idle
+            action = None
+            try:
+                action = agent.step(observation)
+            except Exception as e:
+                print(f"Agent {agent.name} step() 方法抛出异常 (回合 {self.state.turn}): {e}")
+                import traceback
+                traceback.print_exc()
+                action = "idle"
+            
+            elapsed = time.time() - start_time
+            
+            # 如果执行时间过长，警告并强制使用idle
+            if elapsed > 3.0:  # 超过3秒，认为卡住
+                print(f"警告: Agent {agent.name} 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}，强制使用 'idle'")
+                action = "idle"
+            elif elapsed > 1.0:  # 超过1秒，警告
+                print(f"警告: Agent {agent.name} 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}")
+            
+            if isinstance(action, (list, tuple)):
+                action = ActionPlan(action)
+            if isinstance(action, ActionPlan):
+                action = self._start_plan(agent, index, observation, action)
+            
+            # 验证动作有效性
+            if action is None or action not in ACTION_CODES:
+                print(f"警告: Agent {agent.name} 返回了无效动作 '{action}'，使用 'idle'")
+                action = "idle"
+        except Exception as e:
+            print(f"Agent {agent.name} 执行出错 (回合 {self.state.turn}): {e}")
+            import traceback
+            traceback.print_exc()
+            action = "idle"
+        return action
+    
+    def _start_plan(self, agent: Agent, index: int, observation: Observation, plan: ActionPlan) -> str:
+        """
+        校验动作计划并排队剩余动作
+
+        Returns:
+            本回合执行的第一个动作（计划为空或含无效动作时为 idle）
+        """
+        if not plan.actions or any(a not in ACTION_CODES for a in plan.actions):
+            print(f"警告: Agent {agent.name} 返回了无效动作计划 {plan.actions}，使用 'idle'")
+            return "idle"
+        if len(plan.actions) > MAX_PLAN_LENGTH:
+            print(f"警告: Agent {agent.name} 的动作计划超过 {MAX_PLAN_LENGTH} 回合，已截断")
+            plan.actions = plan.actions[:MAX_PLAN_LENGTH]
+        if len(plan.actions) > 1:
+            self._plans[index] = _QueuedPlan(plan, observation, agent.health)
+        return plan.actions[0]
+    
+    def _decide_batched(self) -> Dict[int, str]:
+        """
+        对实现了 step_batch 的Agent，每个 step_batch 实现每回合只调用一次（共用实现的子类合为一批）
+
+        同一批的存活Agent在本回合任何Agent行动之前一起构建观察，动作按顺序映射回各Agent；
+        超时、异常或返回值数量不符时该批全部使用 idle，单个无效动作（包括非字符串，如动作计划列表）替换为 idle。
+
+        Returns:
+            {Agent下标: 动作}
+        """
+        agents = self.state.agents
+        decided: Dict[int, str] = {}
+        for step_batch, indices in self._batch_groups.items():
+            alive = [i for i in indices if agents[i].health > 0]
+            if not alive:
+                continue
+            members = [agents[i] for i in alive]
+            observations = []
+            for i, agent in zip(alive, members):
+                observation = self._build_observation(agent)
+                if self.observation_features is not None:
+                    observation.features = self.observation_features[i]
+                observations.append(observation)
+            
+            start_time = time.time()
+            try:
+                results = list(type(members[0]).step_batch(members, observations))
+            except Exception as e:
+                print(f"{step_batch.__qualname__}() 抛出异常 (回合 {self.state.turn}): {e}")
+                import traceback
+                traceback.print_exc()
+                results = None
+            elapsed = time.time() - start_time
+            
+            if elapsed > 3.0:
+                print(f"警告: {step_batch.__qualname__}() 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}，强制使用 'idle'")
+                results = None
+            elif elapsed > 1.0:
+                print(f"警告: {step_batch.__qualname__}() 执行时间过长 ({elapsed:.2f}秒)，回合 {self.state.turn}")
+            if results is not None and len(results) != len(members):
+                print(f"警告: {step_batch.__qualname__}() 返回 {len(results)} 个动作，应为 {len(members)} 个，使用 'idle'")
+                results = None
+            if results is None:
+                results = ["idle"] * len(members)
+            
+            for i, agent, action in zip(alive, members, results):
+                if not isinstance(action, str) or action not in ACTION_CODES:
+                    print(f"警告: Agent {agent.name} 返回了无效动作 {action!r}，使用 'idle'")
+                    action = "idle"
+                decided[i] = action
+        return decided
+    
     def _build_observation(self, agent: Agent) -> Observation:
-        """为Agent构建观察"""
+        """为Agent构建观察（大地图模式只检查视野附近区块中的对象）"""
+        agents = self.state.agents
+        bullets = self.state.bullets
+        obstacles = self.state.obstacles
+        if self.arena is not None:
+            x, y = agent.position
+            # 区块索引建于本回合行动前，期间Agent最多移动一步，查询范围留出余量
+            radius = self.view_distance + 4.0
+            agents = [agents[i] for i in self._agent_index.query(x, y, radius)]
+            bullets = [bullets[i] for i in self._bullet_index.query(x, y, radius)]
+            obstacles = [obstacles[i] for i in self.state.obstacle_index.query(x, y, self.view_distance + 2.0)]
+        
         # 视野内的敌人
         enemies_in_view = []
-        for other in self.state.agents:
+        for other in agents:
             if other == agent or other.health <= 0:
                 continue
             # 同队不视为敌人
@@ -362,7 +681,7 @@ class GameEngine:
         
         # 视野内的子弹
         bullets_in_view = []
-        for bullet in self.state.bullets:
+        for bullet in bullets:
             if bullet.owner == agent.name:
                 continue
             dist = agent.distance_to(bullet.get_position())
@@ -375,7 +694,7 @@ class GameEngine:
         
         # 视野内的障碍物（矩形墙体）
         obstacles_in_view = []
-        for obs in self.state.obstacles:
+        for obs in obstacles:
             rx, ry, rw, rh = obs['rect']
             # 点到矩形的最近点
             cx = min(max(agent.position[0], rx), rx + rw)
@@ -416,14 +735,7 @@ class GameEngine:
     
     def _blocked_by_obstacle(self, new_pos: Tuple[float, float]) -> bool:
         """点是否被任何矩形障碍阻挡，考虑角色半径膨胀"""
-        radius = 2.0
-        x, y = new_pos
-        for obs in self.state.obstacles:
-            rx, ry, rw, rh = obs['rect']
-            # 将矩形外扩 radius，判断点是否在外扩矩形内
-            if (rx - radius) <= x <= (rx + rw + radius) and (ry - radius) <= y <= (ry + rh + radius):
-                return True
-        return False
+        return self.state.is_blocked(new_pos)
 
     def _execute_action(self, agent: Agent, action: str):
         """执行Agent的动作"""
@@ -473,112 +785,139 @@ class GameEngine:
         - 在对战过程中，只在“只剩一个队伍存活”时结束战斗
         - 超时后的平局判定与按比分选队伍，在调用方（如 GUI / 示例）里单独处理
         """
-        alive = self.state.get_alive_agents()
-        if not alive:
-            return None
-
-        team_ids = {agent.team_id for agent in alive if hasattr(agent, 'team_id') and agent.team_id is not None}
-        if len(team_ids) == 1:
-            return list(team_ids)[0]
-        return None
+        return self.state.winning_team
     
     def _resolve_agent_collisions(self):
-        """简单的角色-角色分离，避免靠近后停滞/重叠"""
+        """
+        角色-角色分离，避免靠近后停滞/重叠
+
+        先把存活角色放进边长为 min_dist 的均匀网格，只检查同格与相邻格的角色对（粗筛），
+        人群分散时代价接近线性。候选对按 (i, j) 顺序依次推开，处理顺序和随机数消耗
+        只取决于Agent列表顺序，同一种子下结果可复现。
+        """
         min_dist = 5.0
-        for i in range(len(self.state.agents)):
-            a = self.state.agents[i]
-            if a.health <= 0:
-                continue
-            for j in range(i + 1, len(self.state.agents)):
-                b = self.state.agents[j]
-                if b.health <= 0:
-                    continue
-                dx = b.position[0] - a.position[0]
-                dy = b.position[1] - a.position[1]
-                dist = math.sqrt(dx*dx + dy*dy)
-                if dist < 1e-5:
-                    # 重合，随机一个小方向
-                    ang = random.uniform(0, 2*math.pi)
-                    dx, dy = math.cos(ang), math.sin(ang)
-                    dist = 1.0
-                if dist < min_dist:
-                    overlap = (min_dist - dist) / 2.0
-                    nx = dx / dist
-                    ny = dy / dist
-                    ax = a.position[0] - nx * overlap
-                    ay = a.position[1] - ny * overlap
-                    bx = b.position[0] + nx * overlap
-                    by = b.position[1] + ny * overlap
-                    # 约束在边界内，并避免推进进障碍
-                    ax = max(0, min(self.state.map_width - 1, ax))
-                    ay = max(0, min(self.state.map_height - 1, ay))
-                    bx = max(0, min(self.state.map_width - 1, bx))
-                    by = max(0, min(self.state.map_height - 1, by))
-                    if not self._blocked_by_obstacle((ax, ay)):
-                        a.position = (ax, ay)
-                    if not self._blocked_by_obstacle((bx, by)):
-                        b.position = (bx, by)
+        agents = self.state.agents
+        alive = [i for i, a in enumerate(agents) if a.health > 0]
+        if len(alive) < 2:
+            return
+
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for i in alive:
+            x, y = agents[i].position
+            grid.setdefault((int(x // min_dist), int(y // min_dist)), []).append(i)
+
+        # 每个无序对只会在 i < j 的一侧被收集一次
+        pairs = []
+        for (cx, cy), members in grid.items():
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    others = grid.get((cx + ox, cy + oy))
+                    if not others:
+                        continue
+                    for i in members:
+                        for j in others:
+                            if i < j:
+                                pairs.append((i, j))
+        if not pairs:
+            return
+        pairs.sort()
+
+        max_x = self.state.map_width - 1
+        max_y = self.state.map_height - 1
+        for i, j in pairs:
+            a = agents[i]
+            b = agents[j]
+            dx = b.position[0] - a.position[0]
+            dy = b.position[1] - a.position[1]
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist < 1e-5:
+                # 重合，用引擎随机数取一个分离方向
+                ang = self.rng.uniform(0, 2*math.pi)
+                dx, dy = math.cos(ang), math.sin(ang)
+                dist = 1.0
+            if dist < min_dist:
+                overlap = (min_dist - dist) / 2.0
+                nx = dx / dist
+                ny = dy / dist
+                # 约束在边界内，并避免推进进障碍
+                ax = max(0, min(max_x, a.position[0] - nx * overlap))
+                ay = max(0, min(max_y, a.position[1] - ny * overlap))
+                bx = max(0, min(max_x, b.position[0] + nx * overlap))
+                by = max(0, min(max_y, b.position[1] + ny * overlap))
+                if not self._blocked_by_obstacle((ax, ay)):
+                    a.position = (ax, ay)
+                if not self._blocked_by_obstacle((bx, by)):
+                    b.position = (bx, by)
     
     def _fire_weapon(self, agent: Agent):
-        """根据当前武器发射子弹并处理冷却与弹药"""
+        """按规则集中当前武器的参数发射子弹并处理冷却与弹药（无弹药时按默认武器射击）"""
+        weapons = self.ruleset.weapons
+        spec = weapons.get(agent.weapon)
+        if spec is None or (spec.uses_ammo and agent.ammo.get(spec.name, 0) <= 0):
+            spec = weapons[self.ruleset.default_weapon]
+        elif spec.uses_ammo:
+            agent.ammo[spec.name] -= 1
+
         wx, wy = agent.position
         dx, dy = agent.direction
-        weapon = agent.weapon
-
-        def add_bullet(dx, dy, damage=10, speed=5.0, kind='normal', splash=0.0):
-            self.state.bullets.append(Bullet(wx, wy, dx, dy, agent.name, damage=damage, speed=speed, kind=kind, splash_radius=splash))
-
-        if weapon == 'normal':
-            add_bullet(dx, dy, damage=10, speed=5.0, kind='normal')
-            agent.shoot_cooldown = 20
-        elif weapon == 'shotgun' and agent.ammo['shotgun'] > 0:
-            # 三发散射
-            base_angle = math.atan2(dy, dx)
-            spreads = [-0.2, 0.0, 0.2]
-            for s in spreads:
-                ang = base_angle + s
-                add_bullet(math.cos(ang), math.sin(ang), damage=8, speed=4.5, kind='shotgun')
-            agent.ammo['shotgun'] -= 1
-            agent.shoot_cooldown = 25
-        elif weapon == 'sniper' and agent.ammo['sniper'] > 0:
-            add_bullet(dx, dy, damage=25, speed=8.0, kind='sniper')
-            agent.ammo['sniper'] -= 1
-            agent.shoot_cooldown = 35
-        elif weapon == 'rocket' and agent.ammo['rocket'] > 0:
-            add_bullet(dx, dy, damage=20, speed=3.5, kind='rocket', splash=8.0)
-            agent.ammo['rocket'] -= 1
-            agent.shoot_cooldown = 40
+        bullets = self.state.bullets
+        first = len(bullets)
+        if len(spec.directions) == 1 and spec.directions[0] == 0.0:
+            bullets.append(Bullet(wx, wy, dx, dy, agent.name, damage=spec.damage, speed=spec.speed,
+                                  kind=spec.name, splash_radius=spec.splash))
         else:
-            # 无弹药时按普通射击
-            add_bullet(dx, dy, damage=10, speed=5.0, kind='normal')
-            agent.shoot_cooldown = 20
+            # 散射：以当前朝向为基准逐发偏转
+            base_angle = math.atan2(dy, dx)
+            for offset in spec.directions:
+                ang = base_angle + offset
+                bullets.append(Bullet(wx, wy, math.cos(ang), math.sin(ang), agent.name, damage=spec.damage,
+                                      speed=spec.speed, kind=spec.name, splash_radius=spec.splash))
+        agent.shoot_cooldown = spec.cooldown
+        if self._bullet_index is not None:
+            for j in range(first, len(bullets)):
+                self._bullet_index.insert(j, wx, wy)
+
+        if self.event_sink is not None:
+            self._emit(FIRE, agent.name, detail=spec.name, amount=len(spec.directions))
 
     def _check_collisions(self):
-        """检测碰撞"""
+        """检测碰撞（大地图模式只检查子弹所在区块附近的障碍与Agent）"""
+        agents = self.state.agents
+        obstacles = self.state.obstacles
+        obstacle_index = self.state.obstacle_index
+        agent_index = self._agent_index if self.arena is not None else None
+        by_name: Dict[str, Agent] = {}
+        for a in agents:
+            by_name.setdefault(a.name, a)
+        
         # 子弹与Agent/障碍碰撞
-        for bullet in self.state.bullets[:]:
+        for bullet in self.state.bullets:
             if not bullet.active:
                 continue
             # 子弹碰撞矩形障碍则失效（火箭产生溅射）
             hit_obstacle = False
-            for obs in self.state.obstacles:
+            candidates = obstacles
+            if obstacle_index is not None:
+                candidates = [obstacles[i] for i in obstacle_index.at(bullet.x, bullet.y)]
+            for obs in candidates:
                 rx, ry, rw, rh = obs['rect']
                 if (rx <= bullet.x <= rx + rw) and (ry <= bullet.y <= ry + rh):
                     hit_obstacle = True
                     break
             if hit_obstacle:
-                if bullet.kind == 'rocket' and bullet.splash_radius > 0:
+                if bullet.splash_radius > 0:
                     self._apply_splash_damage(bullet)
                 bullet.active = False
-                if bullet in self.state.bullets:
-                    self.state.bullets.remove(bullet)
                 continue
 
-            for agent in self.state.agents:
+            targets = agents
+            if agent_index is not None:
+                targets = [agents[i] for i in agent_index.query(bullet.x, bullet.y, 3.0)]
+            owner = by_name.get(bullet.owner)
+            for agent in targets:
                 if agent.name == bullet.owner or agent.health <= 0:
                     continue
                 # 友伤检查
-                owner = next((o for o in self.state.agents if o.name == bullet.owner), None)
                 if owner and owner.team_id is not None and agent.team_id is not None and owner.team_id == agent.team_id:
                     continue
                 dist = math.sqrt(
@@ -586,64 +925,71 @@ class GameEngine:
                     (bullet.y - agent.position[1]) ** 2
                 )
                 if dist < 3.0:  # 碰撞半径
-                    if bullet.kind == 'rocket' and bullet.splash_radius > 0:
-                        # 火箭弹溅射
+                    if bullet.splash_radius > 0:
+                        if self.event_sink is not None:
+                            self._emit(HIT, bullet.owner, agent.name, bullet.kind, 0)
+                        # 爆炸类子弹（如火箭弹）造成溅射（击杀在溅射中结算）
                         self._apply_splash_damage(bullet)
                     else:
-                        agent.health -= bullet.damage
+                        if self.event_sink is not None:
+                            self._emit(HIT, bullet.owner, agent.name, bullet.kind, bullet.damage)
+                        self._damage_agent(agent, bullet.damage, bullet.owner, bullet.kind)
                     bullet.active = False
-                    if agent.health <= 0:
-                        # 找到子弹所有者，增加击杀数
-                        for owner in self.state.agents:
-                            if owner.name == bullet.owner:
-                                owner.kills += 1
-                                agent.deaths += 1
-                                break
-                    if bullet in self.state.bullets:
-                        self.state.bullets.remove(bullet)
                     break
+        
+        self.state.bullets = [b for b in self.state.bullets if b.active]
 
     def _apply_splash_damage(self, bullet: Bullet):
         """对爆炸范围内的单位造成伤害"""
-        for agent in self.state.agents:
+        agents = self.state.agents
+        if self.arena is not None:
+            agents = [agents[i] for i in self._agent_index.query(bullet.x, bullet.y, bullet.splash_radius)]
+        for agent in agents:
             if agent.health <= 0:
                 continue
             dist = math.sqrt((bullet.x - agent.position[0]) ** 2 + (bullet.y - agent.position[1]) ** 2)
             if dist <= bullet.splash_radius:
                 dmg = max(0, int(bullet.damage * (1 - dist / bullet.splash_radius)))
                 if dmg > 0:
-                    agent.health -= dmg
-                    if agent.health <= 0:
-                        for owner in self.state.agents:
-                            if owner.name == bullet.owner:
-                                owner.kills += 1
-                                agent.deaths += 1
-                                break
+                    if self.event_sink is not None:
+                        self._emit(SPLASH, bullet.owner, agent.name, bullet.kind, dmg)
+                    self._damage_agent(agent, dmg, bullet.owner, bullet.kind)
+
+    def _damage_agent(self, agent: Agent, damage: int, owner_name: str, kind: str = 'normal'):
+        """对存活Agent造成伤害；致死时为子弹所有者记一次击杀并更新存活计数"""
+        agent.health -= damage
+        if agent.health <= 0:
+            if self.event_sink is not None:
+                self._emit(KILL, owner_name, agent.name, kind)
+            # 找到子弹所有者，增加击杀数
+            for owner in self.state.agents:
+                if owner.name == owner_name:
+                    owner.kills += 1
+                    agent.deaths += 1
+                    break
+            self.state.mark_dead(agent)
 
     def _maybe_spawn_supply(self):
-        """随机生成补给"""
+        """按规则集的生成概率与权重随机生成补给"""
         if len(self.state.supplies) >= self.max_supplies:
             return
-        if random.random() < self.supply_spawn_chance:
-            # 提高武器和弹药的比例，确保玩家能找到并使用特殊武器
-            kinds = [
-                'health',  # 血包
-                'ammo_shotgun', 'ammo_sniper', 'ammo_rocket',  # 弹药
-                'ammo_shotgun', 'ammo_sniper', 'ammo_rocket',  # 更多弹药
-                'weapon_shotgun', 'weapon_sniper', 'weapon_rocket',  # 武器
-                'weapon_shotgun', 'weapon_sniper', 'weapon_rocket',  # 更多武器
-            ]
-            k = random.choice(kinds)
+        spawn_table = self.ruleset.spawn_table
+        if spawn_table is not None and self.rng.random() < self.supply_spawn_chance:
+            k = spawn_table.sample(self.rng)
             # 生成在不与障碍重叠的位置
             for _ in range(20):
-                x = random.uniform(10, self.state.map_width - 10)
-                y = random.uniform(10, self.state.map_height - 10)
+                x = self.rng.uniform(10, self.state.map_width - 10)
+                y = self.rng.uniform(10, self.state.map_height - 10)
                 if not self._blocked_by_obstacle((x, y)):
                     self.state.supplies.append({'position': (x, y), 'type': k})
+                    if self.event_sink is not None:
+                        self._emit(SPAWN, detail=k)
                     break
 
     def _check_pickups(self):
-        """检测补给拾取"""
+        """检测补给拾取（效果查规则集的补给效果表）"""
+        effects = self.ruleset.supply_effects
+        max_health = self.ruleset.max_health
         for agent in self.state.agents:
             if agent.health <= 0:
                 continue
@@ -651,20 +997,15 @@ class GameEngine:
                 dist = agent.distance_to(s['position'])
                 if dist < 4.0:
                     t = s['type']
-                    if t == 'health':
-                        agent.health = min(100, agent.health + 25)
-                    elif t == 'ammo_shotgun':
-                        agent.ammo['shotgun'] += 5
-                    elif t == 'ammo_sniper':
-                        agent.ammo['sniper'] += 3
-                    elif t == 'ammo_rocket':
-                        agent.ammo['rocket'] += 2
-                    elif t == 'weapon_shotgun':
-                        agent.weapon = 'shotgun'
-                    elif t == 'weapon_sniper':
-                        agent.weapon = 'sniper'
-                    elif t == 'weapon_rocket':
-                        agent.weapon = 'rocket'
+                    if self.event_sink is not None:
+                        self._emit(PICKUP, agent.name, detail=t)
+                    effect = effects[t]
+                    if effect.heal:
+                        agent.health = min(max_health, agent.health + effect.heal)
+                    if effect.ammo is not None:
+                        agent.ammo[effect.ammo] = agent.ammo.get(effect.ammo, 0) + effect.amount
+                    if effect.weapon is not None:
+                        agent.weapon = effect.weapon
                     self.state.supplies.remove(s)
 
     
@@ -684,7 +1025,7 @@ class GameEngine:
         """
         last_progress_time = time.time()
         last_turn_time = time.time()
-        self._last_alive_count = len(self.state.get_alive_agents())
+        self._last_alive_count = self.state.alive_count
         consecutive_slow_steps = 0  # 连续慢速回合计数
         max_consecutive_slow = 10  # 连续10个回合都慢才判定为卡住
         
@@ -755,11 +1096,14 @@ class GameEngine:
                         return scored[0][0] if scored else None
                     return None
             
-            winner = self.state.get_winner(allow_score_judge=False)
+            winner = self.state.winner
             if winner:
                 if verbose:
                     print(f"游戏结束！获胜者: {winner.name} (击杀: {winner.kills}, 血量: {winner.health})")
                 return winner
+            if self.state.alive_count == 0:
+                # 全部阵亡，后续回合不会再有变化
+                break
         
         # 超时后按评分判定获胜者
         winner = self.state.get_winner(allow_score_judge=True)
@@ -0,0 +1,132 @@
+"""
+游戏事件流
+引擎在开火、命中、溅射、击杀、拾取、补给生成时发出紧凑的事件，写入环形缓冲区或文件，
+无需记录位置帧即可统计命中率、伤害、武器使用与击杀用时。
+"""
+import json
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, NamedTuple, Optional
+
+
+# 事件类型
+FIRE = 'fire'        # actor 开火，detail=子弹类型，amount=弹丸数
+HIT = 'hit'          # actor 的子弹直接命中 target，amount=直接伤害（火箭为 0，伤害见 splash）
+SPLASH = 'splash'    # actor 的火箭爆炸波及 target，amount=溅射伤害
+KILL = 'kill'        # actor 击杀 target，detail=致命子弹类型
+PICKUP = 'pickup'    # actor 拾取补给，detail=补给类型
+SPAWN = 'spawn'      # 生成补给，detail=补给类型
+
+EVENT_TYPES = (FIRE, HIT, SPLASH, KILL, PICKUP, SPAWN)
+
+
+class GameEvent(NamedTuple):
+    """单个游戏事件"""
+    turn: int
+    kind: str
+    actor: Optional[str] = None
+    target: Optional[str] = None
+    detail: Optional[str] = None
+    amount: int = 0
+
+
+class EventRingBuffer:
+    """内存环形缓冲区，只保留最近 capacity 个事件"""
+
+    def __init__(self, capacity: int = 100000):
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, event: GameEvent):
+        self.events.append(event)
+
+    def __iter__(self) -> Iterator[GameEvent]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def clear(self):
+        self.events.clear()
+
+
+class EventFileSink:
+    """文件事件流，每行一个 JSON 数组 [turn, kind, actor, target, detail, amount]"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def emit(self, event: GameEvent):
+        self._file.write(json.dumps(list(event), ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_events(path: str) -> Iterator[GameEvent]:
+    """读取 EventFileSink 写出的事件文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield GameEvent(*json.loads(line))
+
+
+def summarize_events(events: Iterable[GameEvent]) -> Dict[str, Dict[str, Any]]:
+    """
+    按选手汇总事件流
+
+    Args:
+        events: 事件序列（环形缓冲区、read_events() 结果等）
+
+    Returns:
+        {选手名: {'shots', 'hits', 'accuracy', 'damage_dealt', 'damage_taken', 'kills',
+                  'avg_time_to_kill', 'weapons': {子弹类型: 开火次数}, 'pickups': {补给类型: 次数}}}
+        其中 avg_time_to_kill 为从首次对目标造成伤害到击杀的平均回合数（无击杀为 None）
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    first_damage: Dict[tuple, int] = {}
+    kill_times: Dict[str, list] = {}
+
+    def entry(name: str) -> Dict[str, Any]:
+        if name not in stats:
+            stats[name] = {
+                'shots': 0, 'hits': 0, 'damage_dealt': 0, 'damage_taken': 0, 'kills': 0,
+                'weapons': Counter(), 'pickups': Counter()
+            }
+        return stats[name]
+
+    for event in events:
+        kind = event.kind
+        if kind == FIRE:
+            s = entry(event.actor)
+            s['shots'] += event.amount
+            s['weapons'][event.detail] += 1
+        elif kind == HIT or kind == SPLASH:
+            if kind == HIT:
+                entry(event.actor)['hits'] += 1
+            if event.amount > 0:
+                entry(event.actor)['damage_dealt'] += event.amount
+                entry(event.target)['damage_taken'] += event.amount
+                first_damage.setdefault((event.actor, event.target), event.turn)
+        elif kind == KILL:
+            entry(event.actor)['kills'] += 1
+            start = first_damage.get((event.actor, event.target), event.turn)
+            kill_times.setdefault(event.actor, []).append(event.turn - start)
+        elif kind == PICKUP:
+            entry(event.actor)['pickups'][event.detail] += 1
+
+    for name, s in stats.items():
+        s['accuracy'] = round(s['hits'] / s['shots'], 3) if s['shots'] > 0 else 0.0
+        times = kill_times.get(name)
+        s['avg_time_to_kill'] = round(sum(times) / len(times), 1) if times else None
+        s['weapons'] = dict(s['weapons'])
+        s['pickups'] = dict(s['pickups'])
+    return stats
@@ -0,0 +1,247 @@
+"""
+观察特征编码
+把全部Agent的观察一次性编码成定长 float32 特征矩阵（每行一个Agent），供神经网络策略批量推理。
+与字典形式的 Observation 并存：引擎开启编码后，observation.features 为本Agent对应的一行。
+"""
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .ruleset import Ruleset, default_ruleset
+
+
+class ObservationEncoder:
+    """
+    定长观察编码器
+
+    每行特征依次为（位置、距离均按视野距离归一，坐标为世界坐标系下的相对量）：
+    - self: 血量、x、y（按地图尺寸归一）、朝向 dx/dy、射击冷却、当前武器独热、当前武器弹药
+    - enemies: 最近 k_enemies 个视野内敌人，每个 [存在, 相对x, 相对y, 距离, 血量, 朝向dx, 朝向dy]
+    - bullets: 最近 k_bullets 颗视野内他人子弹，每个 [存在, 相对x, 相对y, 距离, 方向dx, 方向dy]
+    - supplies: 最近 k_supplies 个视野内补给，每个 [存在, 相对x, 相对y, 距离, 补给类型独热]
+    - rays: 以当前朝向为起点均匀分布的 n_rays 条射线到最近障碍或地图边界的距离（视野外记 1）
+    """
+
+    ENEMY_FIELDS = 7
+    BULLET_FIELDS = 6
+    SELF_FIELDS = 6
+
+    def __init__(self, k_enemies: int = 4, k_bullets: int = 8, k_supplies: int = 4,
+                 n_rays: int = 8, ruleset: Optional[Ruleset] = None, ray_cell: float = 120.0):
+        """
+        Args:
+            k_enemies: 编码的最近敌人数
+            k_bullets: 编码的最近子弹数
+            k_supplies: 编码的最近补给数
+            n_rays: 障碍探测射线数
+            ruleset: 决定武器与补给类型独热编码的规则集（应与引擎一致），None 为默认规则
+            ray_cell: 射线求交时的分块边长：同一块内的Agent一起计算，只与块附近的障碍求交
+        """
+        ruleset = ruleset or default_ruleset()
+        self.k_enemies = k_enemies
+        self.k_bullets = k_bullets
+        self.k_supplies = k_supplies
+        self.n_rays = n_rays
+        self.ray_cell = ray_cell
+        self.weapon_names: List[str] = list(ruleset.weapons)
+        self.weapon_uses_ammo = {name: spec.uses_ammo for name, spec in ruleset.weapons.items()}
+        self.supply_types: List[str] = list(ruleset.supply_effects)
+        self.supply_fields = 4 + len(self.supply_types)
+
+        sizes = [
+            ('self', self.SELF_FIELDS + len(self.weapon_names) + 1),
+            ('enemies', k_enemies * self.ENEMY_FIELDS),
+            ('bullets', k_bullets * self.BULLET_FIELDS),
+            ('supplies', k_supplies * self.supply_fields),
+            ('rays', n_rays),
+        ]
+        self.layout: Dict[str, slice] = {}
+        offset = 0
+        for name, size in sizes:
+            self.layout[name] = slice(offset, offset + size)
+            offset += size
+        self.feature_size = offset
+
+    def encode_all(self, engine) -> np.ndarray:
+        """
+        编码全部Agent的观察
+
+        Args:
+            engine: 游戏引擎（读取其状态与视野距离）
+
+        Returns:
+            形状为 (Agent数, feature_size) 的 float32 矩阵，阵亡Agent对应的行全为 0
+        """
+        state = engine.state
+        agents = state.agents
+        n = len(agents)
+        out = np.zeros((n, self.feature_size), dtype=np.float32)
+        if n == 0:
+            return out
+        view = float(engine.view_distance)
+
+        pos = np.array([a.position for a in agents], dtype=np.float64)
+        health = np.array([a.health for a in agents], dtype=np.float64)
+        alive = health > 0
+
+        self._encode_self(out, agents, pos, health, state.map_width, state.map_height)
+        self._encode_enemies(out, agents, pos, health, alive, view)
+        self._encode_bullets(out, agents, pos, state.bullets, view)
+        self._encode_supplies(out, pos, state.supplies, view)
+        self._encode_rays(out, agents, pos, state, view)
+
+        out[~alive] = 0.0
+        return out
+
+    def _encode_self(self, out, agents, pos, health, width, height):
+        block = out[:, self.layout['self']]
+        block[:, 0] = health / 100.0
+        block[:, 1] = pos[:, 0] / width
+        block[:, 2] = pos[:, 1] / height
+        block[:, 3:5] = np.array([a.direction for a in agents], dtype=np.float64)
+        block[:, 5] = np.array([a.shoot_cooldown for a in agents], dtype=np.float64) / 40.0
+        weapon_index = {name: i for i, name in enumerate(self.weapon_names)}
+        for row, agent in enumerate(agents):
+            w = weapon_index.get(agent.weapon)
+            if w is not None:
+                block[row, self.SELF_FIELDS + w] = 1.0
+            if self.weapon_uses_ammo.get(agent.weapon):
+                block[row, -1] = agent.ammo.get(agent.weapon, 0) / 10.0
+
+    def _nearest(self, pos: np.ndarray, targets: np.ndarray, valid: np.ndarray, k: int, view: float):
+        """
+        按距离为每个Agent取最近的 k 个候选
+
+        Args:
+            pos: (n, 2) Agent位置
+            targets: (m, 2) 候选位置
+            valid: (n, m) 候选是否可作为该Agent的观察对象
+
+        Returns:
+            (order, present, rel_sel, dist_sel)，形状分别为 (n, k')、(n, k')、(n, k', 2)、(n, k')，k' = min(k, m)
+        """
+        dx = targets[None, :, 0] - pos[:, None, 0]
+        dy = targets[None, :, 1] - pos[:, None, 1]
+        dist2 = dx * dx + dy * dy
+        dist2 = np.where(valid & (dist2 <= view * view), dist2, np.inf)
+        m = dist2.shape[1]
+        kk = min(k, m)
+        if kk < m:
+            # 先用 argpartition 取出最近的 kk 个，再只对这 kk 个排序（同距离时下标小者在前）
+            order = np.argpartition(dist2, kk - 1, axis=1)[:, :kk]
+            part = np.take_along_axis(dist2, order, axis=1)
+            order = np.take_along_axis(order, np.lexsort((order, part), axis=1), axis=1)
+        else:
+            order = np.argsort(dist2, axis=1, kind='stable')
+        present = np.isfinite(np.take_along_axis(dist2, order, axis=1))
+        rel_sel = targets[order] - pos[:, None, :]
+        dist_sel = np.where(present, np.hypot(rel_sel[..., 0], rel_sel[..., 1]) / view, 0.0)
+        rel_sel = np.where(present[..., None], rel_sel / view, 0.0)
+        return order, present, rel_sel, dist_sel
+
+    def _encode_enemies(self, out, agents, pos, health, alive, view):
+        n = len(agents)
+        teams: Dict[object, int] = {}
+        team = np.array([-1 if a.team_id is None else teams.setdefault(a.team_id, len(teams))
+                         for a in agents])
+        same_team = (team[:, None] == team[None, :]) & (team[:, None] >= 0)
+        valid = alive[None, :] & ~np.eye(n, dtype=bool) & ~same_team
+        order, present, rel_sel, dist_sel = self._nearest(pos, pos, valid, self.k_enemies, view)
+
+        direction = np.array([a.direction for a in agents], dtype=np.float64)
+        kk = order.shape[1]
+        block = np.zeros((n, self.k_enemies, self.ENEMY_FIELDS))
+        block[:, :kk, 0] = present
+        block[:, :kk, 1:3] = rel_sel
+        block[:, :kk, 3] = dist_sel
+        block[:, :kk, 4] = np.where(present, health[order] / 100.0, 0.0)
+        block[:, :kk, 5:7] = np.where(present[..., None], direction[order], 0.0)
+        out[:, self.layout['enemies']] = block.reshape(n, -1)
+
+    def _encode_bullets(self, out, agents, pos, bullets, view):
+        n = len(agents)
+        if not bullets or self.k_bullets == 0:
+            return
+        bpos = np.array([(b.x, b.y) for b in bullets], dtype=np.float64)
+        bdir = np.array([(b.dx, b.dy) for b in bullets], dtype=np.float64)
+        names = np.array([a.name for a in agents], dtype=object)
+        owners = np.array([b.owner for b in bullets], dtype=object)
+        valid = names[:, None] != owners[None, :]
+        order, present, rel_sel, dist_sel = self._nearest(pos, bpos, valid, self.k_bullets, view)
+
+        kk = order.shape[1]
+        block = np.zeros((n, self.k_bullets, self.BULLET_FIELDS))
+        block[:, :kk, 0] = present
+        block[:, :kk, 1:3] = rel_sel
+        block[:, :kk, 3] = dist_sel
+        block[:, :kk, 4:6] = np.where(present[..., None], bdir[order], 0.0)
+        out[:, self.layout['bullets']] = block.reshape(n, -1)
+
+    def _encode_supplies(self, out, pos, supplies, view):
+        n = pos.shape[0]
+        if not supplies or self.k_supplies == 0:
+            return
+        spos = np.array([s['position'] for s in supplies], dtype=np.float64)
+        type_index = {t: i for i, t in enumerate(self.supply_types)}
+        onehot = np.zeros((len(supplies), len(self.supply_types)))
+        for i, s in enumerate(supplies):
+            t = type_index.get(s['type'])
+            if t is not None:
+                onehot[i, t] = 1.0
+        order, present, rel_sel, dist_sel = self._nearest(pos, spos, np.ones((n, len(supplies)), dtype=bool),
+                                                          self.k_supplies, view)
+
+        kk = order.shape[1]
+        block = np.zeros((n, self.k_supplies, self.supply_fields))
+        block[:, :kk, 0] = present
+        block[:, :kk, 1:3] = rel_sel
+        block[:, :kk, 3] = dist_sel
+        block[:, :kk, 4:] = np.where(present[..., None], onehot[order], 0.0)
+        out[:, self.layout['supplies']] = block.reshape(n, -1)
+
+    def _encode_rays(self, out, agents, pos, state, view):
+        if self.n_rays == 0:
+            return
+        n = len(agents)
+        heading = np.array([math.atan2(a.direction[1], a.direction[0]) for a in agents])
+        angles = heading[:, None] + np.arange(self.n_rays) * (2 * math.pi / self.n_rays)
+        ray = np.stack([np.cos(angles), np.sin(angles)], axis=-1)  # (n, r, 2)
+
+        rects = np.array([o['rect'] for o in state.obstacles], dtype=np.float64).reshape(-1, 4)
+        lo = rects[:, :2]
+        hi = rects[:, :2] + rects[:, 2:]
+        bounds = np.array([state.map_width, state.map_height], dtype=np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv = 1.0 / ray
+            # 地图边界：沿各轴到达边界所需的距离
+            to_edge = np.where(ray > 0, (bounds - pos[:, None, :]) * inv,
+                               np.where(ray < 0, -pos[:, None, :] * inv, np.inf))
+            hit = np.minimum(to_edge[..., 0], to_edge[..., 1])
+            # 障碍：按空间分块，每块内的Agent只与块范围外扩视野距离内的障碍用 slab 法求交
+            if len(rects):
+                cell = self.ray_cell
+                keys = np.floor(pos / cell).astype(np.int64)
+                keys = keys[:, 0] * (int(bounds[1] // cell) + 2) + keys[:, 1]
+                for key in np.unique(keys):
+                    rows = np.nonzero(keys == key)[0]
+                    box_lo = pos[rows].min(axis=0) - view
+                    box_hi = pos[rows].max(axis=0) + view
+                    near = np.all((hi >= box_lo) & (lo <= box_hi), axis=1)
+                    if not near.any():
+                        continue
+                    origin = pos[rows, None, None, :]                  # (b, 1, 1, 2)
+                    inv_b = inv[rows, :, None, :]                      # (b, r, 1, 2)
+                    t1 = (lo[near][None, None] - origin) * inv_b       # (b, r, o, 2)
+                    t2 = (hi[near][None, None] - origin) * inv_b
+                    t_near = np.fmax.reduce(np.fmin(t1, t2), axis=-1)
+                    t_far = np.fmin.reduce(np.fmax(t1, t2), axis=-1)
+                    t_near = np.maximum(t_near, 0.0)
+                    t_obs = np.where(t_far >= t_near, t_near, np.inf).min(axis=-1)
+                    hit[rows] = np.minimum(hit[rows], t_obs)
+        out[:, self.layout['rays']] = np.minimum(hit, view) / view
+
+    def split(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """按 layout 拆分特征（便于调试或分组输入网络），支持单行或整批"""
+        return {name: features[..., s] for name, s in self.layout.items()}
@@ -0,0 +1,254 @@
+"""
+统一的比赛运行器
+各种赛制与在线服务器共用的单场比赛循环：重置Agent、逐回合推进引擎、记录回放、
+超时按评分判定、汇总统计。回放记录、超时策略与统计汇总均可插拔。
+"""
+import time
+from typing import List, Dict, Any, Optional, Callable
+
+from .engine import GameEngine
+from .agent import Agent
+from .replay import build_replay
+
+
+class ReplayRecorder:
+    """
+    回放记录器：把比赛帧写入可视化器（如 WebVisualizer）
+
+    每 frame_interval 回合记录一帧；决出胜者后再推进 tail_frames 回合并全部记录，
+    超时结束时补录最后一帧并写入评分判定的胜者。
+    """
+
+    def __init__(self, visualizer, frame_interval: int = 2, tail_frames: int = 10):
+        """
+        Args:
+            visualizer: 提供 record_frame / set_winner / replay_data 的可视化器
+            frame_interval: 记录间隔（回合）
+            tail_frames: 决出胜者后额外记录的帧数
+        """
+        self.visualizer = visualizer
+        self.frame_interval = frame_interval
+        self.tail_frames = tail_frames
+
+    def on_step(self, turn: int, state_info: Dict[str, Any]):
+        """每回合结束后调用"""
+        if turn % self.frame_interval == 0:
+            self.visualizer.record_frame(state_info)
+
+    def on_finish(self, engine: GameEngine, last_state_info: Optional[Dict[str, Any]],
+                  winner: Optional[Agent], decided: bool):
+        """
+        比赛结束后调用
+
+        Args:
+            engine: 游戏引擎
+            last_state_info: 最后一回合的状态
+            winner: 获胜者
+            decided: 是否在回合上限前分出胜负（否则为超时判定）
+        """
+        if decided:
+            # 记录最后几帧
+            for _ in range(self.tail_frames):
+                try:
+                    self.visualizer.record_frame(engine.step())
+                except Exception as e:
+                    print(f"错误: 记录最后帧时出错: {e}")
+                    break
+            return
+
+        # 确保记录最后一帧（如果最后一帧的回合数不同，说明需要记录新帧）
+        replay_data = self.visualizer.replay_data
+        if last_state_info and (not replay_data or replay_data[-1]['turn'] != last_state_info['turn']):
+            self.visualizer.record_frame(last_state_info)
+        if winner:
+            self.visualizer.set_winner(winner.name)
+
+
+class StallTimeoutPolicy:
+    """
+    超时策略：总时长超限、或长时间存活人数无变化时提前结束比赛
+
+    用于在线服务器等需要防止单场比赛卡住的场景。
+    """
+
+    def __init__(self, max_match_seconds: float = 120.0, stall_turns: int = 100,
+                 stall_seconds: float = 30.0, slow_step_seconds: float = 2.0):
+        """
+        Args:
+            max_match_seconds: 单场比赛最大时长（秒）
+            stall_turns: 连续多少回合存活人数不变才检查是否卡住
+            stall_seconds: 存活人数多久不变判定为卡住（秒）
+            slow_step_seconds: 单回合耗时超过此值时打印警告
+        """
+        self.max_match_seconds = max_match_seconds
+        self.stall_turns = stall_turns
+        self.stall_seconds = stall_seconds
+        self.slow_step_seconds = slow_step_seconds
+
+    def start(self, engine: GameEngine):
+        """比赛开始时调用"""
+        now = time.time()
+        self._start_time = now
+        self._last_progress_time = now
+        self._last_alive_count = engine.state.alive_count
+        self._no_progress_turns = 0
+
+    def check(self, engine: GameEngine, state_info: Dict[str, Any], step_elapsed: float) -> Optional[str]:
+        """
+        每回合结束后调用
+
+        Returns:
+            需要结束比赛时返回原因，否则返回 None
+        """
+        now = time.time()
+        if step_elapsed > self.slow_step_seconds:
+            print(f"警告: 回合 {engine.state.turn} 执行时间过长 ({step_elapsed:.2f}秒)")
+
+        if now - self._start_time > self.max_match_seconds:
+            return f"超过最大时间限制 ({self.max_match_seconds}秒)"
+
+        alive_count = state_info['alive_count']
+        if alive_count != self._last_alive_count:
+            self._last_alive_count = alive_count
+            self._last_progress_time = now
+            self._no_progress_turns = 0
+        else:
+            self._no_progress_turns += 1
+            if (self._no_progress_turns >= self.stall_turns
+                    and now - self._last_progress_time > self.stall_seconds):
+                return f"连续 {self._no_progress_turns} 回合没有进展，可能卡住"
+        return None
+
+
+StatsSink = Callable[[List[Agent], Optional[Agent]], None]
+
+
+def results_table_sink(results: Dict[str, Dict[str, Any]], win_points: int = 3) -> StatsSink:
+    """
+    创建更新赛事积分表的统计回调
+
+    Args:
+        results: {agent_name: {'wins', 'losses', 'kills', 'deaths', 'points', ...}}
+        win_points: 每场胜利积分
+
+    Returns:
+        sink(agents, winner) 回调
+    """
+    def sink(agents: List[Agent], winner: Optional[Agent]):
+        for agent in agents:
+            stats = results[agent.name]
+            stats['kills'] += agent.kills
+            stats['deaths'] += agent.deaths
+
+            if winner and agent == winner:
+                stats['wins'] += 1
+                stats['points'] += win_points
+            else:
+                stats['losses'] += 1
+    return sink
+
+
+class MatchRunner:
+    """单场比赛运行器"""
+
+    def __init__(self, map_width: int = 100, map_height: int = 100, max_turns: int = 500,
+                 timeout_policy=None, stats_sinks: Optional[List[StatsSink]] = None,
+                 catch_step_errors: bool = False, record_actions: bool = False, ruleset=None,
+                 arena=None):
+        """
+        Args:
+            map_width: 地图宽度
+            map_height: 地图高度
+            max_turns: 最大回合数
+            timeout_policy: 超时策略（如 StallTimeoutPolicy），None 表示只受回合上限约束
+            stats_sinks: 比赛结束后依次调用的统计回调 sink(agents, winner)
+            catch_step_errors: 回合执行出错时结束比赛而不是抛出异常
+            record_actions: 是否生成基于种子的紧凑回放（见 game.replay）
+            ruleset: 规则集（见 game.ruleset），None 表示默认规则
+            arena: 大地图模式参数（见 game.arena.LargeArena），None 表示默认地图
+        """
+        self.map_width = map_width
+        self.map_height = map_height
+        self.max_turns = max_turns
+        self.timeout_policy = timeout_policy
+        self.stats_sinks = stats_sinks or []
+        self.catch_step_errors = catch_step_errors
+        self.record_actions = record_actions
+        self.ruleset = ruleset
+        self.arena = arena
+
+    def run(self, agents: List[Agent], recorder: Optional[ReplayRecorder] = None,
+            seed: Optional[int] = None, event_sink=None) -> Dict[str, Any]:
+        """
+        运行一场比赛
+
+        只剩一名存活者时立即结束（0 名存活为平局）；到达回合上限或被超时策略终止时
+        按评分判定获胜者。
+
+        Args:
+            agents: 参赛Agent列表
+            recorder: 回放记录器，None 表示不记录
+            seed: 引擎随机种子
+            event_sink: 引擎事件接收器（见 game.events），None 表示不记录事件
+
+        Returns:
+            {'winner': Agent或None, 'turns': 回合数, 'decided': 是否提前分出胜负,
+             'stop_reason': 超时策略或出错终止的原因, 'replay': 紧凑回放（未开启 record_actions 时为 None）}
+        """
+        # 重置所有Agent状态
+        for agent in agents:
+            agent.reset()
+
+        engine = GameEngine(agents, self.map_width, self.map_height, seed=seed,
+                            event_sink=event_sink, record_actions=self.record_actions,
+                            ruleset=self.ruleset, arena=self.arena)
+        policy = self.timeout_policy
+        if policy:
+            policy.start(engine)
+
+        state = engine.state
+        max_turns = self.max_turns
+        last_state_info = None
+        stop_reason = None
+        decided = False
+
+        while state.turn < max_turns:
+            step_start = time.time()
+            try:
+                state_info = engine.step()
+            except Exception as e:
+                if not self.catch_step_errors:
+                    raise
+                print(f"错误: 回合 {state.turn} 执行出错: {e}")
+                stop_reason = str(e)
+                break
+            last_state_info = state_info
+
+            if recorder:
+                recorder.on_step(state.turn, state_info)
+
+            # 引擎增量维护存活计数，只剩一人（或全灭）即可结束
+            if state.alive_count <= 1:
+                decided = state.winner is not None
+                break
+
+            if policy:
+                stop_reason = policy.check(engine, state_info, time.time() - step_start)
+                if stop_reason:
+                    break
+
+        winner = state.get_winner(allow_score_judge=not decided)
+
+        if recorder:
+            recorder.on_finish(engine, last_state_info, winner, decided)
+
+        for sink in self.stats_sinks:
+            sink(agents, winner)
+
+        return {
+            'winner': winner,
+            'turns': state.turn,
+            'decided': decided,
+            'stop_reason': stop_reason,
+            'replay': build_replay(engine, winner.name if winner else None) if self.record_actions else None
+        }
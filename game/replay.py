@@ -0,0 +1,126 @@
+"""
+基于种子的紧凑回放
+只保存随机种子、引擎版本、地图参数和每个Agent每回合的动作（1 字节），
+回看时用记录的动作重演引擎即可按需生成帧，不需要运行Agent代码。
+"""
+import base64
+import json
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+
+from .engine import GameEngine, ENGINE_VERSION, VALID_ACTIONS, NO_ACTION
+from .agent import Agent, Observation
+from .ruleset import Ruleset
+from .arena import LargeArena
+
+
+REPLAY_FORMAT = 'seed-replay'
+
+
+class ReplayAgent(Agent):
+    """回放重演用的占位Agent（动作由回放提供，自身不做决策）"""
+
+    def step(self, observation: Observation) -> str:
+        return "idle"
+
+
+def build_replay(engine: GameEngine, winner: Optional[str] = None) -> Dict[str, Any]:
+    """
+    从开启了 record_actions 的引擎生成回放
+
+    Args:
+        engine: 比赛结束后的游戏引擎
+        winner: 获胜者名称（仅作展示信息）
+
+    Returns:
+        可 JSON 序列化的回放字典
+    """
+    if engine.action_log is None:
+        raise ValueError("引擎未开启 record_actions，无法生成回放")
+    state = engine.state
+    return {
+        'format': REPLAY_FORMAT,
+        'engine_version': ENGINE_VERSION,
+        'seed': engine.seed,
+        'map_width': state.map_width,
+        'map_height': state.map_height,
+        'agents': [{'name': a.name, 'team_id': a.team_id} for a in state.agents],
+        # 默认规则不保存规则内容，变体规则整份写入以便重演
+        'ruleset': None if engine.ruleset.is_default else engine.ruleset.to_dict(),
+        'arena': engine.arena.to_dict() if engine.arena is not None else None,
+        'turns': state.turn,
+        'actions': base64.b64encode(zlib.compress(bytes(engine.action_log), 9)).decode('ascii'),
+        'winner': winner
+    }
+
+
+def save_replay(replay: Dict[str, Any], path: str):
+    """保存回放文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(replay, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_replay(path: str) -> Dict[str, Any]:
+    """读取回放文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ReplaySimulator:
+    """回放重演器：用记录的动作驱动引擎，逐回合生成与原比赛一致的帧"""
+
+    def __init__(self, replay: Dict[str, Any]):
+        """
+        Args:
+            replay: build_replay() / load_replay() 得到的回放字典
+
+        Raises:
+            ValueError: 回放格式不符或引擎版本不一致（规则已变化，无法精确重演）
+        """
+        if replay.get('format') != REPLAY_FORMAT:
+            raise ValueError(f"不支持的回放格式: {replay.get('format')}")
+        if replay['engine_version'] != ENGINE_VERSION:
+            raise ValueError(f"回放引擎版本 {replay['engine_version']} 与当前版本 {ENGINE_VERSION} 不一致")
+        self.replay = replay
+        self.actions = zlib.decompress(base64.b64decode(replay['actions']))
+        self.num_agents = len(replay['agents'])
+        self.ruleset = Ruleset(replay['ruleset']) if replay.get('ruleset') else None
+        self.arena = LargeArena(**replay['arena']) if replay.get('arena') else None
+
+    def frames(self) -> Iterator[Dict[str, Any]]:
+        """逐回合生成状态帧（与 GameEngine.step() 返回值格式相同）"""
+        agents: List[Agent] = []
+        for info in self.replay['agents']:
+            agent = ReplayAgent(info['name'])
+            agent.team_id = info.get('team_id')
+            agents.append(agent)
+
+        engine = GameEngine(agents, self.replay['map_width'], self.replay['map_height'],
+                            seed=self.replay['seed'], ruleset=self.ruleset, arena=self.arena)
+        n = self.num_agents
+        for turn in range(self.replay['turns']):
+            codes = self.actions[turn * n:(turn + 1) * n]
+            actions = [VALID_ACTIONS[c] if c != NO_ACTION else "idle" for c in codes]
+            yield engine.step(actions)
+
+    def to_visualizer(self, visualizer, frame_interval: int = 1):
+        """
+        将重演的帧写入可视化器（如 WebVisualizer）
+
+        Args:
+            visualizer: 提供 record_frame / set_winner 的可视化器
+            frame_interval: 记录间隔（回合），最后一帧总会记录
+        """
+        last = None
+        for state_info in self.frames():
+            last = state_info
+            if state_info['turn'] % frame_interval == 0:
+                visualizer.record_frame(state_info)
+        if last and last['turn'] % frame_interval != 0:
+            visualizer.record_frame(last)
+        if self.replay.get('winner'):
+            visualizer.set_winner(self.replay['winner'])
+        return visualizer
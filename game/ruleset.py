@@ -0,0 +1,215 @@
+"""
+游戏规则集
+武器参数、补给效果与补给生成权重集中定义在规则文件（JSON）中，载入时校验一次并编译成
+查找表与别名采样表，引擎开火/拾取/生成补给时只做表查找，无需改代码即可运行变体玩法。
+"""
+import json
+import math
+import random
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# 默认规则（与原先写死在引擎中的数值一致）
+DEFAULT_RULES: Dict[str, Any] = {
+    'name': 'default',
+    'default_weapon': 'normal',
+    'weapons': {
+        'normal': {'damage': 10, 'speed': 5.0, 'cooldown': 20},
+        'shotgun': {'damage': 8, 'speed': 4.5, 'cooldown': 25, 'spread': [-0.2, 0.0, 0.2], 'uses_ammo': True},
+        'sniper': {'damage': 25, 'speed': 8.0, 'cooldown': 35, 'uses_ammo': True},
+        'rocket': {'damage': 20, 'speed': 3.5, 'cooldown': 40, 'splash': 8.0, 'uses_ammo': True},
+    },
+    'supplies': {
+        'health': {'heal': 25},
+        'ammo_shotgun': {'ammo': 'shotgun', 'amount': 5},
+        'ammo_sniper': {'ammo': 'sniper', 'amount': 3},
+        'ammo_rocket': {'ammo': 'rocket', 'amount': 2},
+        'weapon_shotgun': {'weapon': 'shotgun'},
+        'weapon_sniper': {'weapon': 'sniper'},
+        'weapon_rocket': {'weapon': 'rocket'},
+    },
+    'spawn_weights': {
+        'health': 1,
+        'ammo_shotgun': 2, 'ammo_sniper': 2, 'ammo_rocket': 2,
+        'weapon_shotgun': 2, 'weapon_sniper': 2, 'weapon_rocket': 2,
+    },
+    # 开局放置的武器（附带同类弹药），从中随机抽取 starting_weapon_count 个
+    'starting_weapons': ['rocket', 'sniper', 'shotgun'],
+    'starting_weapon_count': [2, 3],
+    'supply_spawn_chance': 0.03,
+    'max_supplies': 12,
+    'max_health': 100,
+}
+
+
+class WeaponSpec(NamedTuple):
+    """编译后的武器参数"""
+    name: str
+    damage: int
+    speed: float
+    cooldown: int
+    directions: Tuple[float, ...]  # 散射角度偏移（弧度），单发武器为 (0.0,)
+    splash: float
+    uses_ammo: bool
+
+
+class SupplyEffect(NamedTuple):
+    """编译后的补给效果"""
+    heal: int
+    ammo: Optional[str]
+    amount: int
+    weapon: Optional[str]
+
+
+class AliasTable:
+    """Walker/Vose 别名表：O(1) 按权重抽样"""
+
+    def __init__(self, items: Sequence[str], weights: Sequence[float]):
+        """
+        Args:
+            items: 候选项
+            weights: 对应的非负权重（总和须大于 0）
+        """
+        n = len(items)
+        total = float(sum(weights))
+        self.items = list(items)
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> str:
+        """用给定随机源抽取一项"""
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+
+class Ruleset:
+    """校验并编译后的规则集（创建后只读，可在多场比赛、多个进程间共享）"""
+
+    def __init__(self, rules: Dict[str, Any]):
+        """
+        Args:
+            rules: 规则字典，未给出的顶层字段使用 DEFAULT_RULES 中的值
+
+        Raises:
+            ValueError: 规则不合法
+        """
+        merged = dict(DEFAULT_RULES)
+        merged.update(rules)
+        self.rules = merged
+        self.name: str = merged['name']
+
+        self.weapons: Dict[str, WeaponSpec] = {
+            name: _compile_weapon(name, spec) for name, spec in merged['weapons'].items()
+        }
+        self.default_weapon: str = merged['default_weapon']
+        if self.default_weapon not in self.weapons:
+            raise ValueError(f"默认武器 {self.default_weapon} 未在 weapons 中定义")
+        if self.weapons[self.default_weapon].uses_ammo:
+            raise ValueError(f"默认武器 {self.default_weapon} 不能消耗弹药")
+
+        self.supply_effects: Dict[str, SupplyEffect] = {
+            kind: self._compile_supply(kind, spec) for kind, spec in merged['supplies'].items()
+        }
+
+        weights = merged['spawn_weights']
+        for kind, weight in weights.items():
+            if kind not in self.supply_effects:
+                raise ValueError(f"spawn_weights 中的补给 {kind} 未在 supplies 中定义")
+            if weight < 0:
+                raise ValueError(f"补给 {kind} 的生成权重不能为负")
+        spawnable = [kind for kind, weight in weights.items() if weight > 0]
+        self.spawn_table: Optional[AliasTable] = (
+            AliasTable(spawnable, [weights[k] for k in spawnable]) if spawnable else None
+        )
+
+        # 开局武器：(武器补给类型, 弹药补给类型或 None)
+        self.starting_supplies: List[Tuple[str, Optional[str]]] = []
+        for weapon in merged['starting_weapons']:
+            weapon_kind = self._supply_for(lambda e: e.weapon == weapon)
+            if weapon_kind is None:
+                raise ValueError(f"开局武器 {weapon} 没有对应的武器补给")
+            self.starting_supplies.append((weapon_kind, self._supply_for(lambda e: e.ammo == weapon)))
+        low, high = merged['starting_weapon_count']
+        if not 0 <= low <= high <= len(self.starting_supplies):
+            raise ValueError(f"starting_weapon_count 不合法: {merged['starting_weapon_count']}")
+        self.starting_weapon_count: Tuple[int, int] = (low, high)
+
+        self.supply_spawn_chance = float(merged['supply_spawn_chance'])
+        self.max_supplies = int(merged['max_supplies'])
+        self.max_health = int(merged['max_health'])
+
+    def _compile_supply(self, kind: str, spec: Dict[str, Any]) -> SupplyEffect:
+        ammo = spec.get('ammo')
+        weapon = spec.get('weapon')
+        for ref in (ammo, weapon):
+            if ref is not None and ref not in self.weapons:
+                raise ValueError(f"补给 {kind} 引用了未定义的武器 {ref}")
+        if ammo is not None and not self.weapons[ammo].uses_ammo:
+            raise ValueError(f"补给 {kind}: 武器 {ammo} 不消耗弹药")
+        return SupplyEffect(int(spec.get('heal', 0)), ammo, int(spec.get('amount', 0)), weapon)
+
+    def _supply_for(self, predicate) -> Optional[str]:
+        return next((kind for kind, effect in self.supply_effects.items() if predicate(effect)), None)
+
+    @property
+    def is_default(self) -> bool:
+        """是否为默认规则（回放中无需保存规则内容）"""
+        return self.rules == DEFAULT_RULES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出完整规则字典（可用 Ruleset(...) 重建）"""
+        return json.loads(json.dumps(self.rules))
+
+
+def _compile_weapon(name: str, spec: Dict[str, Any]) -> WeaponSpec:
+    try:
+        damage = int(spec['damage'])
+        speed = float(spec['speed'])
+        cooldown = int(spec['cooldown'])
+    except KeyError as e:
+        raise ValueError(f"武器 {name} 缺少字段 {e}")
+    spread = tuple(float(s) for s in spec.get('spread', [0.0]))
+    splash = float(spec.get('splash', 0.0))
+    if damage < 0 or speed <= 0 or cooldown < 0 or splash < 0 or not spread:
+        raise ValueError(f"武器 {name} 参数不合法: {spec}")
+    if any(not math.isfinite(s) for s in spread):
+        raise ValueError(f"武器 {name} 的散射角不合法: {spec['spread']}")
+    return WeaponSpec(name, damage, speed, cooldown, spread, splash, bool(spec.get('uses_ammo', False)))
+
+
+_default_ruleset: Optional[Ruleset] = None
+
+
+def default_ruleset() -> Ruleset:
+    """默认规则集（进程内只编译一次）"""
+    global _default_ruleset
+    if _default_ruleset is None:
+        _default_ruleset = Ruleset(DEFAULT_RULES)
+    return _default_ruleset
+
+
+def load_ruleset(path: str) -> Ruleset:
+    """
+    从 JSON 文件载入规则集
+
+    Args:
+        path: 规则文件路径（只需写出与默认规则不同的顶层字段）
+
+    Raises:
+        ValueError: 规则不合法
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return Ruleset(json.load(f))
@@ -1,8 +1,11 @@
 """
 图形界面模块
 """
+from utils.lazy import lazy_exports
 
-from .tournament_gui import TournamentGUI
-
-__all__ = ['TournamentGUI']
+_EXPORTS = {
+    'TournamentGUI': '.tournament_gui',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
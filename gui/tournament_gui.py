@@ -1,10 +1,16 @@
 """
 比赛管理图形界面
 使用tkinter创建图形界面来选择和管理比赛
+
+比赛在独立的工作进程中运行（见 gui.worker），进度与日志事件经进程队列发回，
+界面线程用 after() 定时取出并批量更新，比赛期间界面保持响应。
 """
+import multiprocessing
+import os
+import queue
+import signal
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import threading
 from pathlib import Path
 import sys
 
@@ -13,10 +19,13 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from utils.agent_loader import AgentLoader
-from tournament.tournament import RoundRobinTournament, EliminationTournament
-from tournament.group_tournament import GroupTournament
-from game.engine import GameEngine
-from visualizer.web_visualizer import WebVisualizer
+from tournament.progress import format_eta
+from gui.worker import worker_main
+
+
+POLL_INTERVAL_MS = 50       # 事件队列轮询间隔
+MAX_EVENTS_PER_POLL = 500   # 每次轮询最多处理的事件数，避免日志洪峰阻塞界面
+MAX_LOG_LINES = 5000        # 输出区保留的最大行数
 
 
 class TournamentGUI:
@@ -27,11 +36,14 @@ class TournamentGUI:
         self.root.title("AI竞技平台 - 比赛管理系统")
         self.root.geometry("900x700")
         
-        self.agents = []
-        self.tournament_thread = None
+        self.agents = []            # AgentLoader.discover_agents 的结果（界面进程不实例化Agent）
+        self.team_assignments = {}  # {Agent名称: 队伍编号}
+        self.worker = None          # 运行比赛的工作进程
+        self.events = None          # 工作进程发回事件的队列
         
         self._create_widgets()
         self._load_agents()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
     
     def _create_widgets(self):
         """创建界面组件"""
@@ -97,6 +109,12 @@ class TournamentGUI:
                                   textvariable=self.advance_var, width=5)
         advance_spin.pack(side=tk.LEFT, padx=5)
         
+        tk.Label(self.group_frame, text="并行进程:").pack(side=tk.LEFT, padx=5)
+        self.workers_var = tk.IntVar(value=min(4, os.cpu_count() or 1))
+        workers_spin = tk.Spinbox(self.group_frame, from_=1, to=os.cpu_count() or 1,
+                                  textvariable=self.workers_var, width=5)
+        workers_spin.pack(side=tk.LEFT, padx=5)
+        
         # 组队设置（仅组队对战显示）
         self.team_frame = tk.Frame(settings_frame)
         
@@ -144,6 +162,14 @@ class TournamentGUI:
                                   width=15, height=2)
         self.stop_btn.pack(side=tk.LEFT, padx=5)
         
+        # 进度区域
+        progress_frame = tk.Frame(self.root)
+        progress_frame.pack(fill=tk.X, padx=10)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.status_var = tk.StringVar(value="就绪")
+        tk.Label(progress_frame, textvariable=self.status_var, width=45, anchor=tk.W).pack(side=tk.LEFT, padx=5)
+        
         # 输出区域
         output_frame = tk.LabelFrame(self.root, text="比赛输出", padx=10, pady=10)
         output_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -194,9 +220,9 @@ class TournamentGUI:
             team_size = agents_per_team + (1 if team_id <= remainder else 0)
             team_agents = selected_agents[idx:idx + team_size]
             for agent in team_agents:
-                agent.team_id = team_id
-                team_assignments[agent.name] = team_id
+                team_assignments[agent['name']] = team_id
             idx += team_size
+        self.team_assignments = team_assignments
         
         # 显示分配结果
         self.team_assignment_text.delete(1.0, tk.END)
@@ -207,31 +233,33 @@ class TournamentGUI:
         messagebox.showinfo("成功", f"已为 {len(selected_agents)} 个Agent分配到 {num_teams} 个队伍")
     
     def _load_agents(self):
-        """加载Agent列表"""
-        self.output_text.insert(tk.END, "正在加载参赛者Agent...\n")
-        self.root.update()
+        """加载Agent列表（只读取清单中的类名，不实例化Agent）"""
+        self._log("正在加载参赛者Agent...")
         
         try:
             loader = AgentLoader(participants_dir="participants")
-            self.agents = loader.create_agent_instances()
+            self.agents = loader.discover_agents()
+            self.team_assignments = {}
             
             # 更新列表
             self.agent_listbox.delete(0, tk.END)
             for agent in self.agents:
-                self.agent_listbox.insert(tk.END, f"{agent.name} ({agent.__class__.__name__})")
+                self.agent_listbox.insert(tk.END, f"{agent['name']} ({agent['class_name']})")
             
-            self.output_text.insert(tk.END, f"成功加载 {len(self.agents)} 个Agent\n\n")
+            self._log(f"成功加载 {len(self.agents)} 个Agent\n")
         except Exception as e:
             messagebox.showerror("错误", f"加载Agent失败: {e}")
-            self.output_text.insert(tk.END, f"加载失败: {e}\n")
-        
-        self.root.update()
+            self._log(f"加载失败: {e}")
     
-    def _log(self, message):
-        """输出日志"""
-        self.output_text.insert(tk.END, message + "\n")
+    def _log(self, *lines: str):
+        """追加日志（只在界面线程调用；多行一次插入，超出上限时删除最早的行）"""
+        if not lines:
+            return
+        self.output_text.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(self.output_text.index('end-1c').split('.')[0]) - MAX_LOG_LINES
+        if excess > 0:
+            self.output_text.delete('1.0', f'{excess + 1}.0')
         self.output_text.see(tk.END)
-        self.root.update()
     
     def _start_tournament(self):
         """开始比赛"""
@@ -256,173 +284,112 @@ class TournamentGUI:
         
         # 清空输出
         self.output_text.delete(1.0, tk.END)
-        
-        # 在新线程中运行比赛
-        mode = self.mode_var.get()
-        self.tournament_thread = threading.Thread(
-            target=self._run_tournament,
-            args=(selected_agents, mode),
-            daemon=True
-        )
-        self.tournament_thread.start()
+        self.progress_bar.config(value=0, maximum=1)
+        self.status_var.set("正在启动工作进程...")
+        
+        # 在工作进程中运行比赛；spawn 方式启动，子进程不继承 Tk 的状态
+        config = {
+            'mode': self.mode_var.get(),
+            'agents': [a['name'] for a in selected_agents],
+            'participants_dir': "participants",
+            'max_turns': self.max_turns_var.get(),
+            'group_size': self.group_size_var.get(),
+            'advance': self.advance_var.get(),
+            'workers': self.workers_var.get(),
+            'teams': self.team_assignments,
+            'replay_dir': "replays",
+            'save_replay': True
+        }
+        context = multiprocessing.get_context('spawn')
+        self.events = context.Queue()
+        # 非守护进程：分组赛需要在其中再创建小组赛工作进程
+        self.worker = context.Process(target=worker_main, args=(config, self.events))
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_events)
     
-    def _run_tournament(self, agents, mode):
-        """运行比赛（在后台线程中）"""
-        try:
-            self._log(f"开始比赛，共 {len(agents)} 个Agent")
-            self._log(f"比赛模式: {mode}\n")
-            
-            max_turns = self.max_turns_var.get()
-            self._log(f"最大轮次: {max_turns}\n")
-            
-            if mode == "group":
-                group_size = self.group_size_var.get()
-                advance = self.advance_var.get()
-                self._log(f"分组设置: 每组 {group_size} 人，每组出线 {advance} 人\n")
-                
-                tournament = GroupTournament(agents, group_size=group_size, 
-                                           advance_per_group=advance,
-                                           save_replay=True, replay_dir="replays",
-                                           max_turns=max_turns)
-                result = tournament.run(verbose=False)
-                
-                # 输出结果
-                self._log("\n" + "="*60)
-                self._log("比赛完成！")
-                self._log("="*60)
-                self._log(f"冠军: {result['champion'].name}")
-                self._log(f"小组数: {result['groups']}")
-                self._log(f"出线人数: {result['advanced']}\n")
-                
-                tournament.print_results()
-                
-            elif mode == "round_robin":
-                tournament = RoundRobinTournament(agents, save_replay=True, replay_dir="replays",
-                                                 max_turns=max_turns)
-                tournament.run(verbose=False)
-                self._log("\n比赛完成！回放文件已保存到 replays/ 目录")
-                tournament.print_results()
-                
-            elif mode == "elimination":
-                tournament = EliminationTournament(agents, save_replay=True, replay_dir="replays",
-                                                  max_turns=max_turns)
-                champion = tournament.run(verbose=False)
-                self._log(f"\n比赛完成！冠军: {champion.name}")
-                self._log("回放文件已保存到 replays/ 目录")
-                tournament.print_results()
-                
-            elif mode == "team_battle":
-                # 检查是否有队伍分配
-                team_agents = [a for a in agents if hasattr(a, 'team_id') and a.team_id is not None]
-                if len(team_agents) < 2:
-                    self._log("错误: 请先选择Agent并点击'分配队伍'按钮")
-                    return
-                
-                # 显示队伍信息
-                teams = {}
-                for agent in team_agents:
-                    tid = agent.team_id
-                    if tid not in teams:
-                        teams[tid] = []
-                    teams[tid].append(agent.name)
-                
-                self._log("队伍配置:")
-                for tid, members in sorted(teams.items()):
-                    self._log(f"  队伍 {tid}: {', '.join(members)}")
-                self._log("")
-                
-                # 运行组队对战
-                engine = GameEngine(team_agents, map_width=100, map_height=100)
-                visualizer = WebVisualizer(100, 100)
-                
-                frame_interval = 2
-                # 固定跑满 max_turns，再按评分判定队伍胜负
-                while engine.state.turn < max_turns:
-                    state = engine.step()
-                    if engine.state.turn % frame_interval == 0:
-                        visualizer.record_frame(state)
-                
-                # 按队伍评分：存活人数 > 总击杀数 > 总血量
-                winning_team = None
-                alive = engine.state.get_alive_agents()
-                team_scores = {}
-                for agent in alive:
-                    if getattr(agent, "team_id", None) is None:
-                        continue
-                    tid = agent.team_id
-                    if tid not in team_scores:
-                        team_scores[tid] = {"alive": 0, "kills": 0, "health": 0}
-                    team_scores[tid]["alive"] += 1
-                    team_scores[tid]["kills"] += agent.kills
-                    team_scores[tid]["health"] += agent.health
-                if team_scores:
-                    scored = [
-                        (
-                            tid,
-                            s["alive"] * 1000000 + s["kills"] * 10000 + s["health"],
-                        )
-                        for tid, s in team_scores.items()
-                    ]
-                    scored.sort(key=lambda x: x[1], reverse=True)
-                    if len(scored) == 1 or scored[0][1] > scored[1][1]:
-                        winning_team = scored[0][0]
-                
-                # 输出结果
-                self._log("\n" + "="*60)
-                self._log("组队对战完成！")
-                self._log("="*60)
-                if winning_team:
-                    self._log(f"胜利队伍: 队伍 {winning_team}")
-                    self._log(f"队伍成员: {', '.join(teams[winning_team])}")
-                    # 显示队伍统计
-                    alive = engine.state.get_alive_agents()
-                    team_alive = [a for a in alive if hasattr(a, 'team_id') and a.team_id == winning_team]
-                    team_kills = sum(a.kills for a in team_alive)
-                    team_health = sum(a.health for a in team_alive)
-                    self._log(f"队伍统计: 存活 {len(team_alive)} 人, 总击杀 {team_kills}, 总血量 {team_health}")
-                else:
-                    self._log("完全平局，无队伍获胜")
-                    alive = engine.state.get_alive_agents()
-                    if alive:
-                        self._log(f"剩余存活: {len(alive)} 人")
-                        # 按队伍分组显示
-                        by_team = {}
-                        for a in alive:
-                            tid = a.team_id if hasattr(a, 'team_id') and a.team_id is not None else '无队伍'
-                            if tid not in by_team:
-                                by_team[tid] = []
-                            by_team[tid].append(a)
-                        for tid, members in sorted(by_team.items()):
-                            total_kills = sum(a.kills for a in members)
-                            total_health = sum(a.health for a in members)
-                            self._log(f"  队伍 {tid}: {len(members)} 人, 总击杀 {total_kills}, 总血量 {total_health}")
-                            for a in members:
-                                self._log(f"    - {a.name}: 击杀={a.kills}, 血量={a.health}")
-                
-                # 保存回放
-                from pathlib import Path
-                replay_dir = Path("replays")
-                replay_dir.mkdir(exist_ok=True)
-                team_names = "_vs_".join([f"Team{tid}" for tid in sorted(teams.keys())])
-                replay_file = replay_dir / f"team_battle_{team_names}.html"
-                visualizer.generate_html(str(replay_file), auto_play=True, fps=15)
-                self._log(f"\n回放文件已保存: {replay_file}")
-            
-            self._log("\n比赛结束！")
-            
-        except Exception as e:
-            self._log(f"\n错误: {e}")
-            import traceback
-            self._log(traceback.format_exc())
-        finally:
-            # 恢复按钮状态
-            self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.stop_btn.config(state=tk.DISABLED))
+    def _poll_events(self):
+        """取出工作进程发回的事件并批量更新界面（由 after() 定时调用）"""
+        if self.events is None:
+            return
+        lines = []
+        finished = False
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            finished = self._handle_event(event, lines) or finished
+        self._log(*lines)
+        
+        if not finished and self.worker is not None and not self.worker.is_alive() and self.events.empty():
+            # 工作进程意外退出（未发出 done / error）
+            self._log(f"\n错误: 工作进程已退出（退出码 {self.worker.exitcode}）")
+            finished = True
+        
+        if finished:
+            self._on_tournament_finished()
+        else:
+            self.root.after(POLL_INTERVAL_MS, self._poll_events)
+    
+    def _handle_event(self, event, lines) -> bool:
+        """
+        处理一个事件，日志行追加到 lines
+        
+        Returns:
+            比赛是否已结束
+        """
+        etype = event['type']
+        if etype == 'log':
+            lines.extend(event['lines'])
+        elif etype == 'tournament_started':
+            self.progress_bar.config(value=0, maximum=max(1, event['total']))
+            self.status_var.set(f"{event['label']}：共 {event['total']} 场")
+        elif etype == 'match_started':
+            self.status_var.set(f"比赛 {event['index']}/{event['total']}: {' vs '.join(event['agents'])}")
+        elif etype == 'match_finished':
+            self.progress_bar.config(value=event['done'], maximum=max(1, event['total']))
+            self.status_var.set(f"已完成 {event['done']}/{event['total']} 场 · 预计剩余 {format_eta(event['eta'])}")
+            lines.append(f"[{event['done']}/{event['total']}] {' vs '.join(event['agents'])} → "
+                         f"{event['winner'] or '平局'}")
+        elif etype == 'done':
+            lines.append("\n比赛结束！")
+            self.status_var.set("比赛结束")
+            return True
+        elif etype == 'error':
+            lines.append(f"\n错误: {event['message']}")
+            lines.extend(event['traceback'].splitlines())
+            self.status_var.set("比赛出错")
+            return True
+        return False
+    
+    def _on_tournament_finished(self):
+        """恢复按钮状态并回收工作进程"""
+        if self.worker is not None:
+            self.worker.join(timeout=1)
+        self.worker = None
+        self.events = None
+        self.start_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
     
     def _stop_tournament(self):
-        """停止比赛"""
-        # 注意：由于比赛在后台线程运行，这里只能提示
-        messagebox.showinfo("提示", "比赛正在运行中，请等待完成")
+        """停止比赛（终止工作进程；小组赛的子进程随之退出）"""
+        if self.worker is None or not self.worker.is_alive():
+            return
+        try:
+            # 工作进程是自己进程组的组长，连同小组赛工作进程一起终止
+            os.killpg(self.worker.pid, signal.SIGTERM)
+        except (AttributeError, ProcessLookupError):
+            # 不支持进程组（Windows）或工作进程尚未建立进程组
+            self.worker.terminate()
+        self._log("\n比赛已停止")
+        self.status_var.set("已停止")
+        self._on_tournament_finished()
+
+
+    def _on_close(self):
+        """关闭窗口时停止仍在运行的比赛"""
+        self._stop_tournament()
+        self.root.destroy()
 
 
 def main():
@@ -0,0 +1,221 @@
+"""
+比赛工作进程
+GUI 把比赛配置交给独立进程运行，进程通过队列发回事件，界面线程用 after() 轮询，
+因此比赛不与 Tk 争用 GIL，分组赛还可以再用多个进程并行小组赛。本模块不导入 tkinter。
+
+除 tournament.progress 中的进度事件外，还会发出：
+    {'type': 'log', 'lines': [...]}          日志行（比赛内的 print 输出也转为日志）
+    {'type': 'done', 'summary': {...}}       比赛正常结束
+    {'type': 'error', 'message', 'traceback'} 比赛出错
+"""
+import io
+import os
+import traceback
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+class _QueueWriter(io.TextIOBase):
+    """把 print 输出按整行转为 log 事件（一次 write 中的多行合并为一个事件）"""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self._partial = ""
+
+    def write(self, text: str) -> int:
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if lines:
+            self.emit({'type': 'log', 'lines': lines})
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self.emit({'type': 'log', 'lines': [self._partial]})
+            self._partial = ""
+
+
+def create_agents(participants_dir: str, names: List[str]) -> List:
+    """按名称（参赛者目录名）只创建选中的Agent"""
+    from utils.agent_loader import AgentLoader
+    loader = AgentLoader(participants_dir=participants_dir)
+    infos = {info['name']: info for info in loader.discover_agents()}
+    agents = []
+    for name in names:
+        if name not in infos:
+            print(f"警告: 找不到参赛者 {name}")
+            continue
+        agents.append(loader.load_agent_class(infos[name])(name))
+    return agents
+
+
+def run_tournament_job(config: Dict[str, Any], events):
+    """
+    工作进程入口：按配置运行一次比赛，所有输出与进度通过 events 队列发回
+
+    Args:
+        config: {'mode', 'agents'(名称列表), 'participants_dir', 'max_turns', 'group_size',
+                 'advance', 'workers', 'teams'({名称: 队伍编号}), 'replay_dir', 'save_replay'}
+        events: 支持 put() 的队列（multiprocessing.Queue 或测试用的 queue.Queue）
+    """
+    from tournament.progress import ProgressTracker
+
+    emit = events.put
+    writer = _QueueWriter(emit)
+    try:
+        with redirect_stdout(writer):
+            summary = _run(config, ProgressTracker(emit))
+        writer.flush()
+        emit({'type': 'done', 'summary': summary})
+    except Exception as e:
+        writer.flush()
+        emit({'type': 'error', 'message': str(e), 'traceback': traceback.format_exc()})
+
+
+def worker_main(config: Dict[str, Any], events):
+    """GUI 启动的工作进程入口：先成为进程组组长，界面停止比赛时可连同小组赛工作进程一起终止"""
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    run_tournament_job(config, events)
+
+
+def _run(config: Dict[str, Any], progress) -> Dict[str, Any]:
+    """在工作进程中运行比赛（print 输出已重定向为日志事件）"""
+    mode = config['mode']
+    participants_dir = config.get('participants_dir', "participants")
+    max_turns = config.get('max_turns', 500)
+    replay_dir = config.get('replay_dir', "replays")
+    save_replay = config.get('save_replay', True)
+
+    agents = create_agents(participants_dir, config['agents'])
+    print(f"开始比赛，共 {len(agents)} 个Agent")
+    print(f"比赛模式: {mode}\n")
+    print(f"最大轮次: {max_turns}\n")
+
+    if mode == "group":
+        from tournament.group_tournament import GroupTournament
+        group_size = config.get('group_size', 4)
+        advance = config.get('advance', 2)
+        workers = config.get('workers', 1)
+        print(f"分组设置: 每组 {group_size} 人，每组出线 {advance} 人，{workers} 个进程\n")
+
+        tournament = GroupTournament(agents, group_size=group_size, advance_per_group=advance,
+                                     save_replay=save_replay, replay_dir=replay_dir,
+                                     max_turns=max_turns, progress=progress,
+                                     workers=workers, participants_dir=participants_dir)
+        result = tournament.run(verbose=False)
+
+        print("\n" + "="*60)
+        print("比赛完成！")
+        print("="*60)
+        print(f"冠军: {result['champion'].name}")
+        print(f"小组数: {result['groups']}")
+        print(f"出线人数: {result['advanced']}\n")
+        tournament.print_results()
+        return {'champion': result['champion'].name}
+
+    if mode == "round_robin":
+        from tournament.tournament import RoundRobinTournament
+        tournament = RoundRobinTournament(agents, save_replay=save_replay, replay_dir=replay_dir,
+                                          max_turns=max_turns, progress=progress)
+        rankings = tournament.run(verbose=False)
+        print(f"\n比赛完成！回放文件已保存到 {replay_dir}/ 目录")
+        return {'champion': rankings[0][0] if rankings else None}
+
+    if mode == "elimination":
+        from tournament.tournament import EliminationTournament
+        tournament = EliminationTournament(agents, save_replay=save_replay, replay_dir=replay_dir,
+                                           max_turns=max_turns, progress=progress)
+        champion = tournament.run(verbose=False)
+        print(f"\n比赛完成！冠军: {champion.name}")
+        print(f"回放文件已保存到 {replay_dir}/ 目录")
+        return {'champion': champion.name}
+
+    if mode == "team_battle":
+        return _run_team_battle(agents, config.get('teams', {}), max_turns, replay_dir, progress)
+
+    raise ValueError(f"未知的比赛模式: {mode}")
+
+
+def _run_team_battle(agents: List, team_map: Dict[str, int], max_turns: int,
+                     replay_dir: str, progress) -> Dict[str, Any]:
+    """组队对战：固定跑满 max_turns，再按 存活人数 > 总击杀数 > 总血量 判定队伍胜负"""
+    from game.engine import GameEngine
+    from visualizer.web_visualizer import WebVisualizer
+
+    for agent in agents:
+        agent.team_id = team_map.get(agent.name)
+    team_agents = [a for a in agents if a.team_id is not None]
+    if len(team_agents) < 2:
+        print("错误: 请先选择Agent并点击'分配队伍'按钮")
+        return {'champion': None}
+
+    # 显示队伍信息
+    teams: Dict[int, List[str]] = {}
+    for agent in team_agents:
+        teams.setdefault(agent.team_id, []).append(agent.name)
+    print("队伍配置:")
+    for tid, members in sorted(teams.items()):
+        print(f"  队伍 {tid}: {', '.join(members)}")
+    print("")
+
+    progress.start(1, "组队对战")
+    names = [a.name for a in team_agents]
+    progress.match_started(names, "team_battle")
+
+    engine = GameEngine(team_agents, map_width=100, map_height=100)
+    visualizer = WebVisualizer(100, 100)
+    frame_interval = 2
+    while engine.state.turn < max_turns:
+        state = engine.step()
+        if engine.state.turn % frame_interval == 0:
+            visualizer.record_frame(state)
+
+    alive = engine.state.get_alive_agents()
+    team_scores: Dict[int, Dict[str, int]] = {}
+    for agent in alive:
+        if getattr(agent, "team_id", None) is None:
+            continue
+        s = team_scores.setdefault(agent.team_id, {"alive": 0, "kills": 0, "health": 0})
+        s["alive"] += 1
+        s["kills"] += agent.kills
+        s["health"] += agent.health
+    winning_team = None
+    if team_scores:
+        scored = sorted(((tid, s["alive"] * 1000000 + s["kills"] * 10000 + s["health"])
+                         for tid, s in team_scores.items()), key=lambda x: x[1], reverse=True)
+        if len(scored) == 1 or scored[0][1] > scored[1][1]:
+            winning_team = scored[0][0]
+    progress.match_finished(names, f"队伍 {winning_team}" if winning_team else None, "team_battle")
+
+    print("\n" + "="*60)
+    print("组队对战完成！")
+    print("="*60)
+    if winning_team:
+        team_alive = [a for a in alive if a.team_id == winning_team]
+        print(f"胜利队伍: 队伍 {winning_team}")
+        print(f"队伍成员: {', '.join(teams[winning_team])}")
+        print(f"队伍统计: 存活 {len(team_alive)} 人, 总击杀 {sum(a.kills for a in team_alive)}, "
+              f"总血量 {sum(a.health for a in team_alive)}")
+    else:
+        print("完全平局，无队伍获胜")
+        if alive:
+            print(f"剩余存活: {len(alive)} 人")
+            by_team: Dict[Any, List] = {}
+            for a in alive:
+                by_team.setdefault(a.team_id if a.team_id is not None else '无队伍', []).append(a)
+            for tid, members in sorted(by_team.items(), key=lambda item: str(item[0])):
+                print(f"  队伍 {tid}: {len(members)} 人, 总击杀 {sum(a.kills for a in members)}, "
+                      f"总血量 {sum(a.health for a in members)}")
+                for a in members:
+                    print(f"    - {a.name}: 击杀={a.kills}, 血量={a.health}")
+
+    # 保存回放
+    replay_path = Path(replay_dir)
+    replay_path.mkdir(exist_ok=True)
+    team_names = "_vs_".join([f"Team{tid}" for tid in sorted(teams.keys())])
+    replay_file = replay_path / f"team_battle_{team_names}.html"
+    visualizer.generate_html(str(replay_file), auto_play=True, fps=15)
+    print(f"\n回放文件已保存: {replay_file}")
+    return {'champion': f"队伍 {winning_team}" if winning_team else None}
@@ -16,7 +16,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from utils.agent_loader import AgentLoader
-from game.engine import GameEngine
+from game.match_runner import MatchRunner, ReplayRecorder, StallTimeoutPolicy
 from visualizer.web_visualizer import WebVisualizer
 from online.database import Database
 
@@ -53,91 +53,15 @@ def run_match(player1_name: str, player2_name: str, match_id: str, max_turns: in
             }
             return
         
-        # 重置Agent状态
-        agent1.reset()
-        agent2.reset()
-        
-        # 创建可视化器
+        # 运行游戏（超时保护：总时长超过120秒或长时间没有进展则强制结束）
         visualizer = WebVisualizer(map_width=100, map_height=100)
-        
-        # 创建游戏引擎
-        engine = GameEngine([agent1, agent2], map_width=100, map_height=100)
-        
-        # 运行游戏
-        import time as time_module
-        frame_interval = 2
-        winner = None
-        last_state_info = None
-        
-        # 超时保护：防止游戏卡住
-        match_start_time = time_module.time()
-        max_match_time = 120.0  # 最大对战时间120秒
-        last_progress_time = match_start_time
-        last_alive_count = len([a for a in engine.state.agents if a.health > 0])
-        consecutive_no_progress = 0
-        max_no_progress_turns = 100  # 连续100回合没有进展则判定为卡住
-        
-        while engine.state.turn < max_turns:
-            # 检查总超时
-            elapsed_time = time_module.time() - match_start_time
-            if elapsed_time > max_match_time:
-                print(f"警告: 对战 {match_id} 超过最大时间限制 ({max_match_time}秒)，强制结束")
-                break
-            
-            # 执行一步
-            step_start_time = time_module.time()
-            try:
-                state_info = engine.step()
-                step_elapsed = time_module.time() - step_start_time
-                
-                # 如果单步执行时间过长，警告
-                if step_elapsed > 2.0:
-                    print(f"警告: 回合 {engine.state.turn} 执行时间过长 ({step_elapsed:.2f}秒)")
-            except Exception as e:
-                print(f"错误: 回合 {engine.state.turn} 执行出错: {e}")
-                import traceback
-                traceback.print_exc()
-                break
-            
-            last_state_info = state_info
-            
-            # 检查是否有进展（存活人数变化或回合数增加）
-            current_alive_count = state_info.get('alive_count', 0)
-            if current_alive_count != last_alive_count:
-                last_progress_time = time_module.time()
-                consecutive_no_progress = 0
-                last_alive_count = current_alive_count
-            else:
-                consecutive_no_progress += 1
-                # 如果连续很多回合没有进展，可能卡住了
-                if consecutive_no_progress >= max_no_progress_turns:
-                    time_since_progress = time_module.time() - last_progress_time
-                    if time_since_progress > 30.0:  # 30秒没有进展
-                        print(f"警告: 对战 {match_id} 连续 {consecutive_no_progress} 回合没有进展，可能卡住，强制结束")
-                        break
-            
-            if engine.state.turn % frame_interval == 0:
-                visualizer.record_frame(state_info)
-            
-            winner = engine.state.get_winner(allow_score_judge=False)
-            if winner:
-                for _ in range(10):
-                    try:
-                        state_info = engine.step()
-                        visualizer.record_frame(state_info)
-                    except Exception as e:
-                        print(f"错误: 记录最后帧时出错: {e}")
-                        break
-                break
-        
-        # 超时后按评分判定
-        if winner is None:
-            if last_state_info:
-                if not visualizer.replay_data or visualizer.replay_data[-1]['turn'] != last_state_info['turn']:
-                    visualizer.record_frame(last_state_info)
-            winner = engine.state.get_winner(allow_score_judge=True)
-            if winner and visualizer.replay_data:
-                visualizer.set_winner(winner.name)
+        runner = MatchRunner(map_width=100, map_height=100, max_turns=max_turns,
+                             timeout_policy=StallTimeoutPolicy(max_match_seconds=120.0),
+                             catch_step_errors=True)
+        result = runner.run([agent1, agent2], ReplayRecorder(visualizer))
+        if result['stop_reason']:
+            print(f"警告: 对战 {match_id} 提前结束: {result['stop_reason']}")
+        winner = result['winner']
         
         # 保存回放
         replay_dir = project_root / "online" / "replays"
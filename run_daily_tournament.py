@@ -6,38 +6,129 @@
     python run_daily_tournament.py              # 运行今日赛事
     python run_daily_tournament.py --date 2026-03-30  # 指定日期
     python run_daily_tournament.py --dry-run    # 模拟运行（不实际比赛）
+    python run_daily_tournament.py --workers 4  # 多进程并行比赛
+    python run_daily_tournament.py --seed 42    # 固定随机种子（赛程与比赛结果可复现）
+    python run_daily_tournament.py --ruleset rules.json  # 使用变体规则（武器/补给参数）
+    python run_daily_tournament.py --recompute-ratings  # 从全部比赛记录重算等级分
 """
 import argparse
+import random
 import sys
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
 from game.engine import GameEngine
-from utils.database import get_database
+from game.events import EventRingBuffer, summarize_events
+from game.replay import build_replay, save_replay
+from game.ruleset import Ruleset, load_ruleset
+from utils.database import get_database, iso_week
 from utils.participant_manager import ParticipantManager
 from tournament.scheduler import MatchScheduler
 from tournament.ranking import RankingManager
+from tournament.rating import EloRating, match_score
 from tournament.reporting import DailyReportGenerator
+from tournament.publish import LeaderboardPublisher
+
+
+# 工作进程内的选手管理器（每个进程独立加载并缓存 Agent 类）
+_worker_manager: Optional[ParticipantManager] = None
+# 工作进程内的规则集（进程初始化时传入一次）
+_worker_ruleset: Optional[Ruleset] = None
+
+
+def _init_match_worker(participants_dir: str, ruleset: Optional[Ruleset] = None):
+    """工作进程初始化：创建进程内独立的选手管理器"""
+    global _worker_manager, _worker_ruleset
+    _worker_manager = ParticipantManager(participants_dir=participants_dir)
+    _worker_ruleset = ruleset
+
+
+def play_scheduled_match(player_ids: List[str], seed: int, max_turns: int = 500,
+                         manager: Optional[ParticipantManager] = None,
+                         ruleset: Optional[Ruleset] = None) -> Dict[str, Any]:
+    """
+    运行赛程中的一场比赛（主进程与工作进程共用）
+    
+    开赛前用 seed 同时重置全局 random（Agent 策略使用）和引擎随机源，
+    因此同一场比赛无论串行还是在工作进程中运行，结果都相同。
+    
+    Args:
+        player_ids: 参赛选手ID列表
+        seed: 本场比赛的随机种子
+        max_turns: 最大回合数
+        manager: 选手管理器，None 时使用工作进程内的管理器
+        ruleset: 规则集，None 时使用工作进程内的规则集（均未设置则为默认规则）
+        
+    Returns:
+        比赛结果字典：status、winner_id 以及每名选手的 kills/deaths/health
+        和由事件流统计的 shots/hits/damage_dealt，以及基于种子的紧凑回放 replay；
+        出错时为 {'status': 'error', 'error': ...}
+    """
+    manager = manager or _worker_manager
+    ruleset = ruleset or _worker_ruleset
+    try:
+        random.seed(seed)
+        agents = [manager.create_agent_instance(pid) for pid in player_ids]
+        
+        events = EventRingBuffer()
+        engine = GameEngine(agents, map_width=100, map_height=100, seed=seed,
+                            event_sink=events, record_actions=True, ruleset=ruleset)
+        winner = engine.run(max_turns=max_turns)
+        analytics = summarize_events(events)
+        
+        agent_results = []
+        for pid, agent in zip(player_ids, agents):
+            a = analytics.get(agent.name, {})
+            agent_results.append({
+                'id': pid, 'name': agent.name, 'kills': agent.kills,
+                'deaths': agent.deaths, 'health': agent.health,
+                'shots': a.get('shots', 0), 'hits': a.get('hits', 0),
+                'damage_dealt': a.get('damage_dealt', 0)
+            })
+        
+        return {
+            'status': 'completed',
+            'winner_id': winner.name if winner else None,
+            'agents': agent_results,
+            'replay': build_replay(engine, winner.name if winner else None)
+        }
+    except Exception as e:
+        return {'status': 'error', 'error': str(e)}
 
 
 class DailyTournament:
     """每日赛事管理器"""
     
-    def __init__(self, date: str = None, dry_run: bool = False):
+    def __init__(self, date: str = None, dry_run: bool = False,
+                 workers: int = 1, seed: Optional[int] = None,
+                 ruleset: Optional[Ruleset] = None):
+        """
+        Args:
+            date: 比赛日期，默认今天
+            dry_run: 模拟运行（不执行实际比赛）
+            workers: 比赛工作进程数，大于1时并行运行比赛
+            seed: 随机种子，固定后赛程与比赛结果可复现
+            ruleset: 规则集，None 表示默认规则
+        """
         self.date = date or datetime.now().strftime('%Y-%m-%d')
         self.dry_run = dry_run
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.ruleset = ruleset
         self.results = []
+        self.participant_types: Dict[str, str] = {}
         
         # 初始化组件
         self.db = get_database()
-        self.participant_manager = ParticipantManager()
+        self.participant_manager = ParticipantManager(database=self.db)
         self.scheduler = None
         self.ranking_manager = RankingManager()
+        self.rating = EloRating()
         
         # 数据目录
         self.data_dir = Path("data")
@@ -55,13 +146,18 @@ class DailyTournament:
         
         # 1. 加载选手
         print("📋 步骤1: 加载选手...")
-        participants = self.participant_manager.load_from_data_file()
+        participants = self.participant_manager.load_participants()
         print(f"   已加载 {len(participants)} 名选手")
         
         # 2. 生成赛程
         print("\n📅 步骤2: 生成赛程...")
-        self.scheduler = MatchScheduler(participants, matches_per_day=3)
+        if self.seed is not None:
+            random.seed(self.seed)
+        self.rating.load(self.db.get_ratings())
+        self.scheduler = MatchScheduler(participants, matches_per_day=3,
+                                        ratings=self.rating.ratings)
         schedule = self.scheduler.generate_daily_schedule(self.date)
+        self._assign_match_seeds(schedule)
         print(f"   已生成 {len(schedule)} 场比赛")
         
         # 3. 运行比赛
@@ -98,67 +194,159 @@ class DailyTournament:
         
         return report
     
+    def _assign_match_seeds(self, schedule: List[Dict]):
+        """为每场比赛分配随机种子（随赛程保存，便于复现）"""
+        rng = random.Random(self.seed)
+        for match in schedule:
+            match['seed'] = rng.randrange(2 ** 31)
+    
     def _run_matches(self, schedule: List[Dict], participants: List[Dict]):
         """运行所有比赛"""
-        participant_map = {p['id']: p for p in participants}
-        
+        self.participant_types = {p['id']: p.get('type', 'ai') for p in participants}
+        if self.workers > 1:
+            self._run_matches_parallel(schedule)
+        else:
+            self._run_matches_serial(schedule)
+    
+    def _run_matches_serial(self, schedule: List[Dict]):
+        """逐场运行比赛，每场结束后立即写库（每场一个事务）"""
         for i, match in enumerate(schedule):
             print(f"   比赛 {i+1}/{len(schedule)}: ", end="")
             
-            player_ids = match['players']
-            
-            # 创建 Agent 实例
-            try:
-                agents = []
-                for pid in player_ids:
-                    agent = self.participant_manager.create_agent_instance(pid)
-                    agents.append(agent)
-                
-                # 运行比赛
-                engine = GameEngine(agents, map_width=100, map_height=100)
-                winner = engine.run(max_turns=500)
-                
-                # 记录结果
-                match['status'] = 'completed'
-                match['winner_id'] = winner.name if winner else None
-                
-                # 更新数据库
-                for agent in agents:
-                    is_win = (winner and agent.name == winner.name)
-                    points = 3 if is_win else 0
-                    if is_win:
-                        points += 1 if agent.kills > 3 else 0
-                    
-                    # 更新选手统计
-                    self.db.update_participant_stats(
-                        agent.name, 
-                        points=points,
-                        kills=agent.kills,
-                        is_win=is_win
-                    )
-                    
-                    # 记录积分历史
-                    if points > 0:
-                        self.db.record_point_history(
-                            agent.name, 
-                            self.date, 
-                            points,
-                            reason=f"match_win" if is_win else "participation"
-                        )
-                
-                print(f"胜者: {match['winner_id']}")
-                
-            except Exception as e:
-                print(f"错误: {e}")
-                match['status'] = 'error'
-                match['error'] = str(e)
+            result = play_scheduled_match(match['players'], match['seed'],
+                                          manager=self.participant_manager,
+                                          ruleset=self.ruleset)
+            self._record_match_result(match, result)
+            with self.db.transaction():
+                match_records, point_history = [], []
+                if match['status'] == 'completed':
+                    self._apply_match_stats(match, result, match_records, point_history)
+                self._record_match_summary(match)
+                self.db.record_matches(match_records)
+                self.db.record_point_history_batch(point_history)
             
             self.results.append(match)
+        
+        self.db.save_ratings(self.rating.ratings, self.rating.games)
+    
+    def _run_matches_parallel(self, schedule: List[Dict]):
+        """多进程并行运行比赛，全部结束后在一个事务中统一写库"""
+        print(f"   使用 {self.workers} 个工作进程")
+        
+        from concurrent.futures import ProcessPoolExecutor  # 串行运行时无需加载多进程模块
+        
+        participants_dir = str(self.participant_manager.participants_dir)
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_match_worker,
+                                 initargs=(participants_dir, self.ruleset)) as pool:
+            futures = [pool.submit(play_scheduled_match, match['players'], match['seed'])
+                       for match in schedule]
+            
+            results = []
+            for i, (match, future) in enumerate(zip(schedule, futures)):
+                print(f"   比赛 {i+1}/{len(schedule)}: ", end="")
+                result = future.result()
+                self._record_match_result(match, result)
+                results.append(result)
+        
+        # 按赛程顺序一次性提交所有统计、积分变动与等级分
+        with self.db.transaction():
+            match_records, point_history = [], []
+            for match, result in zip(schedule, results):
+                if match['status'] == 'completed':
+                    self._apply_match_stats(match, result, match_records, point_history)
+                self._record_match_summary(match)
+            self.db.record_matches(match_records)
+            self.db.record_point_history_batch(point_history)
+            self.db.save_ratings(self.rating.ratings, self.rating.games)
+        
+        self.results.extend(schedule)
+    
+    def _record_match_result(self, match: Dict, result: Dict[str, Any]):
+        """将比赛结果写回赛程条目"""
+        if result['status'] == 'completed':
+            match['status'] = 'completed'
+            match['winner_id'] = result['winner_id']
+            # 选手本场数据（含命中率等事件统计），随赛程保存供报告分析
+            match['agent_stats'] = result['agents']
+            print(f"胜者: {match['winner_id']}")
+        else:
+            match['status'] = 'error'
+            match['error'] = result['error']
+            print(f"错误: {result['error']}")
+    
+    def _apply_match_stats(self, match: Dict, result: Dict[str, Any],
+                           match_records: List[Dict], point_history: List[tuple]):
+        """
+        根据比赛结果更新选手统计与等级分
+        
+        比赛记录与积分历史追加到 match_records / point_history，由调用方批量写入。
+        """
+        winner_id = result['winner_id']
+        scores = {}
+        for agent in result['agents']:
+            is_win = bool(winner_id and agent['name'] == winner_id)
+            points = 3 if is_win else 0
+            if is_win:
+                points += 1 if agent['kills'] > 3 else 0
+            
+            # 更新选手统计
+            self.db.update_participant_stats(
+                agent['name'],
+                points=points,
+                kills=agent['kills'],
+                is_win=is_win
+            )
+            
+            self.db.record_daily_stats(
+                agent['name'],
+                self.date,
+                points=points,
+                kills=agent['kills'],
+                deaths=agent['deaths'],
+                is_win=is_win
+            )
+            
+            # 记录积分历史
+            if points > 0:
+                point_history.append((agent['name'], self.date, points, None,
+                                      "match_win" if is_win else "participation"))
+            
+            scores[agent['name']] = match_score(agent['kills'], agent['health'], is_win)
+        
+        # 记录比赛（表现分用于重算等级分）并增量更新等级分
+        replay_path = self.replays_dir / f"match_{match['match_index']:04d}.replay.json"
+        save_replay(result['replay'], str(replay_path))
+        
+        match_record = {
+            'date': self.date,
+            'match_index': match['match_index'],
+            'winner_id': winner_id,
+            'replay_path': str(replay_path)
+        }
+        for i, (pid, score) in enumerate(scores.items(), 1):
+            match_record[f'agent{i}_id'] = pid
+            match_record[f'agent{i}_score'] = score
+        match_records.append(match_record)
+        self.rating.update_match(scores)
+    
+    def _record_match_summary(self, match: Dict):
+        """累加当日赛事汇总（完成/错误场次与胜者类型）"""
+        completed = match['status'] == 'completed'
+        winner_type = self.participant_types.get(match.get('winner_id')) if completed else None
+        self.db.record_match_summary(self.date, completed, winner_type)
     
     def _update_rankings(self):
-        """更新排行榜"""
-        self.ranking_manager.generate_daily_rankings(self.date)
-        self.ranking_manager.generate_leaderboard_snapshot()
+        """更新排行榜，并发布静态排行榜分片（见 tournament.publish）"""
+        with self.db.transaction():
+            # 当日 / 当周汇总行的名次，供走势与名次变化查询
+            self.db.update_daily_ranks(self.date)
+            self.db.update_weekly_ranks(iso_week(self.date))
+        rankings = self.ranking_manager.generate_daily_rankings(self.date)
+        snapshot = self.ranking_manager.generate_leaderboard_snapshot()
+        latest = LeaderboardPublisher(self.data_dir / "site").publish(rankings, snapshot['ai_vs_human'])
+        print(f"   已发布静态排行榜 {latest['version']}")
+        self.participant_manager.save_to_data_file()  # 选手导出文件随统计更新
     
     def _generate_report(self, schedule: List[Dict]) -> Dict[str, Any]:
         """生成每日报告"""
@@ -261,10 +449,21 @@ def main():
     parser = argparse.ArgumentParser(description='AI竞技平台 - 每日赛事')
     parser.add_argument('--date', type=str, help='指定日期 (YYYY-MM-DD)')
     parser.add_argument('--dry-run', action='store_true', help='模拟运行（不执行实际比赛）')
+    parser.add_argument('--workers', type=int, default=1, help='并行比赛的工作进程数（默认1，串行）')
+    parser.add_argument('--seed', type=int, help='随机种子（固定后赛程与比赛结果可复现）')
+    parser.add_argument('--ruleset', type=str, help='规则文件路径（JSON，武器/补给/生成权重）')
+    parser.add_argument('--recompute-ratings', action='store_true', help='从全部比赛记录重算等级分后退出')
     
     args = parser.parse_args()
     
-    tournament = DailyTournament(date=args.date, dry_run=args.dry_run)
+    if args.recompute_ratings:
+        ratings = RankingManager().recompute_ratings()
+        print(f"✅ 已重算 {len(ratings)} 名选手的等级分")
+        return
+    
+    ruleset = load_ruleset(args.ruleset) if args.ruleset else None
+    tournament = DailyTournament(date=args.date, dry_run=args.dry_run,
+                                 workers=args.workers, seed=args.seed, ruleset=ruleset)
     report = tournament.run()
     
     print("\n📊 报告预览:")
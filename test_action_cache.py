@@ -0,0 +1,100 @@
+"""
+决策缓存测试
+"""
+from types import SimpleNamespace
+
+from game.agent import Observation
+from game.engine import GameEngine
+from agents.action_cache import ActionCache
+from agents.code_agent import DefensiveAgent
+from agents.prompt_agent import PromptAgent
+
+
+def make_observation(position, health=100, enemies=(), cooldown=0):
+    return Observation({
+        'my_position': list(position), 'my_direction': [1, 0], 'my_health': health,
+        'shoot_cooldown': cooldown, 'enemies_in_view': list(enemies),
+    })
+
+
+def test_key_quantization():
+    """相近观察得到同一个键，关键差异得到不同的键"""
+    print("测试观察量化...")
+    cache = ActionCache()
+    enemy = {'name': 'e', 'position': [32, 20], 'health': 50, 'distance': 12.0}
+    base = cache.key(make_observation((20, 20), enemies=[enemy]))
+
+    assert cache.key(make_observation((21.5, 23), enemies=[dict(enemy, distance=13.5)])) == base
+    assert cache.key(make_observation((20, 20), enemies=[enemy], cooldown=5)) != base
+    assert cache.key(make_observation((20, 20), health=30, enemies=[enemy])) != base
+    assert cache.key(make_observation((20, 20))) != base
+    behind = dict(enemy, position=[8, 20])
+    assert cache.key(make_observation((20, 20), enemies=[behind])) != base
+
+    print("✓ 测试通过！")
+
+
+def test_lru_and_ttl():
+    """容量超限淘汰最久未使用的条目，超过 TTL 的条目失效"""
+    print("测试淘汰策略...")
+    cache = ActionCache(max_size=2, ttl=3)
+    cache.put('a', 'shoot')
+    cache.put('b', 'idle')
+    assert cache.get('a') == 'shoot'
+    cache.put('c', 'move_up')  # 淘汰 b
+    assert cache.get('b') is None
+    assert cache.get('c') == 'move_up'
+
+    for _ in range(3):
+        cache.get('x')
+    assert cache.get('c') is None  # 已过期
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 5
+    assert abs(cache.hit_rate - 2 / 7) < 1e-9
+
+    print("✓ 测试通过！")
+
+
+class CountingClient:
+    """代替 OpenAI 客户端，统计调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content="move_up" if self.calls % 2 else "turn_left")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_prompt_agent_skips_redundant_calls():
+    """比赛中相近局面不再重复调用模型"""
+    print("测试 PromptAgent 缓存...")
+    agent = PromptAgent("llm", api_key="test")
+    agent.client = CountingClient()
+    engine = GameEngine([agent, DefensiveAgent("d")], seed=5)
+
+    turns = 100
+    for _ in range(turns):
+        engine.step()
+        if engine.state.alive_count <= 1:
+            break
+
+    stats = agent.cache_stats()
+    print(f"  {engine.state.turn} 回合调用模型 {agent.client.calls} 次，命中率 {stats['hit_rate']:.0%}")
+    assert agent.client.calls == stats['misses']
+    assert stats['hits'] + stats['misses'] == engine.state.turn
+    assert stats['hit_rate'] > 0.5
+
+    uncached = PromptAgent("raw", api_key="test", cache_size=0)
+    assert uncached.action_cache is None and uncached.cache_stats() == {}
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_key_quantization()
+    test_lru_and_ttl()
+    test_prompt_agent_skips_redundant_calls()
@@ -0,0 +1,111 @@
+"""
+多回合动作计划测试
+"""
+from game.agent import Agent, ActionPlan, Observation
+from game.engine import GameEngine
+
+
+class PlannerAgent(Agent):
+    """每次决策给出 10 回合的左右往返计划"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.calls = 0
+
+    def step(self, observation: Observation) -> str:
+        self.calls += 1
+        return ActionPlan(["turn_left"] * 5 + ["turn_right"] * 5)
+
+
+class IdleAgent(Agent):
+    def step(self, observation: Observation) -> str:
+        return "idle"
+
+
+def make_engine():
+    planner, other = PlannerAgent("planner"), IdleAgent("other")
+    engine = GameEngine([planner, other], seed=1, record_actions=True)
+    engine.state.obstacles = []
+    engine.state.supplies = []
+    engine.supply_spawn_chance = 0.0
+    planner.position = (20.0, 20.0)
+    other.position = (80.0, 80.0)
+    return engine, planner, other
+
+
+def test_plan_replayed_without_calls():
+    """计划中的动作逐回合执行，期间不调用 step()"""
+    print("测试动作计划...")
+    engine, planner, _ = make_engine()
+    for _ in range(30):
+        engine.step()
+
+    assert planner.calls == 3
+    assert engine.decision_calls == 3 + 30  # 另一名Agent每回合决策
+    # 回放记录的是实际执行的动作
+    planner_codes = engine.action_log[0::2]
+    assert list(planner_codes[:10]) == [4] * 5 + [5] * 5
+
+    print("✓ 测试通过！")
+
+
+def test_interrupts():
+    """受伤或视野出现新敌人时丢弃剩余动作并重新决策"""
+    print("测试计划中断...")
+    engine, planner, other = make_engine()
+    engine.step()
+    engine.step()
+    assert planner.calls == 1
+
+    planner.health -= 10
+    engine.step()
+    assert planner.calls == 2
+
+    engine.step()
+    assert planner.calls == 2
+    other.position = (30.0, 20.0)
+    engine.step()
+    assert planner.calls == 3
+
+    print("✓ 测试通过！")
+
+
+def test_invalid_plan():
+    """含无效动作的计划整体替换为 idle，不排队"""
+    print("测试无效计划...")
+    engine, planner, _ = make_engine()
+    planner.step = lambda observation: ["turn_left", "fly"]
+    direction = planner.direction
+    engine.step()
+    engine.step()
+    assert planner.direction == direction
+    assert engine.decision_calls == 4
+
+    print("✓ 测试通过！")
+
+
+def test_raising_interrupt():
+    """自定义中断条件抛出异常时视为中断，Agent 下一回合重新决策"""
+    print("测试中断条件异常...")
+    engine, planner, _ = make_engine()
+
+    def broken(observation):
+        raise RuntimeError("中断条件出错")
+
+    def step(observation):
+        planner.calls += 1
+        return ActionPlan(["turn_left"] * 5, interrupt_on=(broken,))
+
+    planner.step = step
+    for _ in range(40):
+        engine.step()
+    assert planner.calls == 40  # 每回合中断并重新决策，而不是永远停在出错的计划上
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_plan_replayed_without_calls()
+    test_interrupts()
+    test_invalid_plan()
+    test_raising_interrupt()
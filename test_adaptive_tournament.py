@@ -0,0 +1,44 @@
+"""
+自适应循环赛测试
+"""
+from tournament import AdaptiveRoundRobinTournament
+from agents.code_agent import RandomAgent, DefensiveAgent
+
+
+def test_settled_pairs_stop_early():
+    """实力悬殊的对阵在最少场数后即停止，预算留给胶着对阵"""
+    print("测试自适应循环赛提前停止...")
+    agents = [DefensiveAgent('def'), RandomAgent('rnd'), RandomAgent('rnd2')]
+    tournament = AdaptiveRoundRobinTournament(
+        agents, save_replay=False, max_turns=500,
+        min_matches_per_pair=4, max_matches_per_pair=12, seed=1
+    )
+    rankings = tournament.run()
+
+    assert rankings[0][0] == 'def'
+    for pair in [('def', 'rnd'), ('def', 'rnd2')]:
+        assert tournament._pair_games(pair) == 4
+        low, high = tournament.pair_confidence_interval(pair)
+        assert low > 0.5 and high <= 1.0
+    assert tournament._pair_games(('rnd', 'rnd2')) == 12
+
+    print("✓ 测试通过！")
+
+
+def test_min_matches_must_be_positive():
+    """每个对阵至少一场，否则未比赛的对阵无法计算不确定度"""
+    print("测试最少场数校验...")
+    try:
+        AdaptiveRoundRobinTournament([DefensiveAgent('def'), RandomAgent('rnd')],
+                                     save_replay=False, min_matches_per_pair=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("min_matches_per_pair=0 应抛出 ValueError")
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_settled_pairs_stop_early()
+    test_min_matches_must_be_positive()
@@ -0,0 +1,111 @@
+"""
+角色分离（网格粗筛）测试
+"""
+import math
+import random
+
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+from game.engine import GameEngine
+
+
+def _make_agents(n):
+    return [(AggressiveAgent if i % 2 else DefensiveAgent)(f"p{i}") for i in range(n)]
+
+
+def _all_pairs_separation(engine):
+    """改用网格粗筛之前的 O(n²) 分离（重合时同样使用引擎随机数），作为对照"""
+    min_dist = 5.0
+    agents = engine.state.agents
+    max_x = engine.state.map_width - 1
+    max_y = engine.state.map_height - 1
+    for i in range(len(agents)):
+        a = agents[i]
+        if a.health <= 0:
+            continue
+        for j in range(i + 1, len(agents)):
+            b = agents[j]
+            if b.health <= 0:
+                continue
+            dx = b.position[0] - a.position[0]
+            dy = b.position[1] - a.position[1]
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist < 1e-5:
+                ang = engine.rng.uniform(0, 2*math.pi)
+                dx, dy = math.cos(ang), math.sin(ang)
+                dist = 1.0
+            if dist < min_dist:
+                overlap = (min_dist - dist) / 2.0
+                nx = dx / dist
+                ny = dy / dist
+                ax = max(0, min(max_x, a.position[0] - nx * overlap))
+                ay = max(0, min(max_y, a.position[1] - ny * overlap))
+                bx = max(0, min(max_x, b.position[0] + nx * overlap))
+                by = max(0, min(max_y, b.position[1] + ny * overlap))
+                if not engine._blocked_by_obstacle((ax, ay)):
+                    a.position = (ax, ay)
+                if not engine._blocked_by_obstacle((bx, by)):
+                    b.position = (bx, by)
+
+
+def _crowded_engine(seed):
+    """
+    200x200 地图上的拥挤布局：4×4 个簇，每簇 4 名Agent挤在半径 2 以内（含重合与阵亡者）
+
+    簇间距 40，一次分离中的推动不会让不同簇的Agent进入分离距离，因此网格粗筛
+    与逐对检查应得到完全相同的结果。
+    """
+    agents = _make_agents(64)
+    engine = GameEngine(agents, 200, 200, seed=seed)
+    engine.state.obstacles = []
+    rng = random.Random(seed)
+    for k, agent in enumerate(agents):
+        cluster = k // 4
+        cx, cy = 40 + (cluster % 4) * 40, 40 + (cluster // 4) * 40
+        agent.position = (cx + rng.uniform(-2, 2), cy + rng.uniform(-2, 2))
+        if k % 4 == 3:
+            agent.position = agents[k - 1].position  # 与同簇的上一名Agent重合
+    agents[10].health = 0
+    engine.state.recount_alive()
+    return engine
+
+
+def test_broadphase_matches_all_pairs():
+    """拥挤布局下网格粗筛与 O(n²) 分离的位置和随机数消耗完全一致"""
+    print("测试网格粗筛与逐对分离一致...")
+    for seed in range(10):
+        grid_engine = _crowded_engine(seed)
+        reference = _crowded_engine(seed)
+        for _ in range(3):
+            grid_engine._resolve_agent_collisions()
+            _all_pairs_separation(reference)
+            assert ([a.position for a in grid_engine.state.agents]
+                    == [a.position for a in reference.state.agents]), seed
+        assert grid_engine.rng.random() == reference.rng.random()
+
+        # 重合的Agent已被推开
+        positions = [a.position for a in grid_engine.state.agents]
+        assert all(positions[k] != positions[k - 1] for k in range(3, 64, 4))
+
+    print("✓ 测试通过！")
+
+
+def test_same_seed_same_positions():
+    """同一种子运行两次，每回合的位置完全相同"""
+    print("测试分离结果可复现...")
+    runs = []
+    for _ in range(2):
+        random.seed(7)  # Agent 策略使用全局 random
+        engine = _crowded_engine(7)
+        trace = []
+        for _ in range(30):
+            engine.step()
+            trace.append([a.position for a in engine.state.agents])
+        runs.append(trace)
+    assert runs[0] == runs[1]
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_broadphase_matches_all_pairs()
+    test_same_seed_same_positions()
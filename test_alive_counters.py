@@ -0,0 +1,78 @@
+"""
+存活计数与终局判定测试
+"""
+import random
+
+from game.engine import GameEngine
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+
+
+def _brute_force(state):
+    alive = [a for a in state.agents if a.health > 0]
+    teams = {a.team_id for a in alive if a.team_id is not None}
+    solo = sum(1 for a in alive if a.team_id is None)
+    return {
+        'alive_count': len(alive),
+        'winner': alive[0] if len(alive) == 1 else None,
+        'winning_team': next(iter(teams)) if len(teams) == 1 else None,
+        'is_decided': len(teams) + solo <= 1,
+    }
+
+
+def test_counters_match_alive_list():
+    """每回合的增量计数与重建存活列表的结果一致（含组队）"""
+    print("测试存活计数...")
+    total_deaths = 0
+    for seed in range(6):
+        random.seed(seed)
+        agents = [AggressiveAgent(f'agg{i}') for i in range(3)] + [DefensiveAgent('def')]
+        if seed % 2:
+            for i, agent in enumerate(agents):
+                agent.team_id = i % 2 + 1
+        engine = GameEngine(agents, seed=seed)
+        state = engine.state
+
+        decided_seen = False
+        while state.turn < 400 and state.alive_count > 1:
+            engine.step()
+            expected = _brute_force(state)
+            actual = {
+                'alive_count': state.alive_count,
+                'winner': state.winner,
+                'winning_team': state.winning_team,
+                'is_decided': state.is_decided,
+            }
+            assert actual == expected, (seed, state.turn, actual, expected)
+            if state.is_decided and not decided_seen:
+                decided_seen = True
+                assert state.decided_turn == state.turn
+        total_deaths += sum(a.deaths for a in agents)
+    assert total_deaths > 0
+
+    print("✓ 测试通过！")
+
+
+def test_winner_after_teammate_death():
+    """组队比赛先分出结果，之后队友阵亡只剩一人时 winner 为该存活者"""
+    print("测试队友阵亡后的获胜者...")
+    agents = [AggressiveAgent('red1'), AggressiveAgent('red2'), DefensiveAgent('blue')]
+    agents[0].team_id = agents[1].team_id = 1
+    agents[2].team_id = 2
+    engine = GameEngine(agents, seed=0)
+    state = engine.state
+
+    for victim in (agents[2], agents[1]):  # 先击杀唯一的敌人，再击杀一名队友（如友军溅射）
+        victim.health = 0
+        state.mark_dead(victim)
+        if victim is agents[2]:
+            assert state.is_decided and state.winning_team == 1
+            assert state.winner is None
+    assert state.winner is agents[0]
+    assert state.get_winner() is agents[0]
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_counters_match_alive_list()
+    test_winner_after_teammate_death()
@@ -0,0 +1,135 @@
+"""
+并发 PromptAgent 测试
+用本地桩 HTTP 服务代替 OpenAI 接口：模型名决定响应延迟，统计收到的请求数。
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from game.agent import Observation
+from game.engine import GameEngine
+from agents.async_prompt_agent import AsyncPromptAgent
+
+# 模型名 -> 响应延迟（秒）
+DELAYS = {"fast-model": 0.3, "slow-model": 2.0}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """模拟 /v1/chat/completions，总是回复 shoot"""
+
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubHandler.requests += 1
+        time.sleep(DELAYS.get(body['model'], 0.0))
+        data = json.dumps({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": body['model'],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "Shoot"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # 客户端已取消请求
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server() -> str:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+BASE_URL = start_stub_server()
+
+
+# 每个参赛者目录都会定义自己的子类
+class AlphaAgent(AsyncPromptAgent):
+    pass
+
+
+class BetaAgent(AsyncPromptAgent):
+    pass
+
+
+def make_agents(model: str, count: int):
+    return [AsyncPromptAgent(f"llm{i}", api_key="test", model=model, base_url=BASE_URL)
+            for i in range(count)]
+
+
+def test_concurrent_turn():
+    """一回合内多个LLM Agent（含不同子类）的请求并发发出，耗时约为一次往返"""
+    print("测试并发请求...")
+    agents = [cls(f"llm{i}", api_key="test", model="fast-model", base_url=BASE_URL)
+              for i, cls in enumerate([AsyncPromptAgent, AsyncPromptAgent, AlphaAgent, BetaAgent])]
+    engine = GameEngine(agents, seed=1)
+    assert len(engine._batch_groups) == 1
+    StubHandler.requests = 0
+
+    start = time.perf_counter()
+    engine.step()
+    elapsed = time.perf_counter() - start
+
+    assert StubHandler.requests == 4
+    assert elapsed < 2 * DELAYS["fast-model"], elapsed  # 按类分组时需要 3 次往返
+    assert all(a.last_action == "shoot" for a in agents)
+    assert all(a.fallback_count == 0 for a in agents)
+    print(f"  4 个Agent一回合耗时 {elapsed:.2f}秒")
+
+    print("✓ 测试通过！")
+
+
+def test_identical_prompts_coalesced():
+    """Prompt 相同的请求合并为一次调用"""
+    print("测试请求合并...")
+    agents = make_agents("fast-model", 3)
+    observation = Observation({'my_position': [10, 10]})
+    StubHandler.requests = 0
+
+    actions = AsyncPromptAgent.step_batch(agents, [observation] * 3)
+
+    assert actions == ["shoot"] * 3
+    assert StubHandler.requests == 1
+
+    print("✓ 测试通过！")
+
+
+def test_deadline_fallback():
+    """超过截止时间的请求被取消，使用上一回合动作或脚本动作"""
+    print("测试截止时间...")
+    agents = make_agents("slow-model", 2)
+    agents[0].last_action = "turn_left"
+    observations = [
+        Observation({'my_position': [10, 10]}),
+        Observation({'my_position': [50, 50], 'shoot_cooldown': 0,
+                     'enemies_in_view': [{'name': 'x', 'position': [55, 50], 'health': 100, 'distance': 5.0}]}),
+    ]
+
+    class QuickDeadline(AsyncPromptAgent):
+        turn_deadline = 0.3
+
+    start = time.perf_counter()
+    actions = QuickDeadline.step_batch(agents, observations)
+    elapsed = time.perf_counter() - start
+
+    assert actions == ["turn_left", "shoot"], actions
+    assert elapsed < 1.0, elapsed
+    assert all(a.fallback_count == 1 for a in agents)
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_concurrent_turn()
+    test_identical_prompts_coalesced()
+    test_deadline_fallback()
@@ -0,0 +1,88 @@
+"""
+批量决策协议测试
+"""
+from typing import List
+
+from game.agent import Agent, Observation
+from game.engine import GameEngine
+from agents.code_agent import DefensiveAgent
+
+
+class BatchAgent(Agent):
+    """一次为全部实例决策：第一个实例向上移动，其余原地左转"""
+
+    calls: List[int] = []
+
+    def step(self, observation: Observation) -> str:
+        raise AssertionError("实现了 step_batch 的Agent不应被逐个调用")
+
+    @classmethod
+    def step_batch(cls, agents: List[Agent], observations: List[Observation]) -> List[str]:
+        cls.calls.append(len(agents))
+        assert all(obs.my_position == tuple(a.position) for a, obs in zip(agents, observations))
+        return ["move_up" if a.name == "b0" else "turn_left" for a in agents]
+
+
+class BrokenBatchAgent(Agent):
+    """返回数量不符的动作列表"""
+
+    def step(self, observation: Observation) -> str:
+        return "shoot"
+
+    @classmethod
+    def step_batch(cls, agents, observations):
+        return ["move_up"]
+
+
+class PlanBatchAgent(Agent):
+    """在 step_batch 中返回动作计划列表（step_batch 只支持单个动作）"""
+
+    def step(self, observation: Observation) -> str:
+        return "shoot"
+
+    @classmethod
+    def step_batch(cls, agents, observations):
+        return [["shoot", "idle"] for _ in agents]
+
+
+def test_one_call_per_turn():
+    """同类实例每回合只调用一次，动作按顺序映射回各实例"""
+    print("测试批量决策...")
+    BatchAgent.calls = []
+    agents = [BatchAgent("b0"), BatchAgent("b1"), DefensiveAgent("d"), BatchAgent("b2")]
+    engine = GameEngine(agents, seed=3)
+    engine.state.obstacles = []
+    y0 = agents[0].position[1]
+    directions = [a.direction for a in agents]
+
+    for _ in range(5):
+        engine.step()
+
+    assert BatchAgent.calls == [3] * 5
+    assert agents[0].position[1] < y0
+    assert agents[1].direction != directions[1] and agents[3].direction != directions[3]
+
+    print("✓ 测试通过！")
+
+
+def test_bad_batch_falls_back_to_idle():
+    """返回数量不符时整类使用 idle，非字符串结果替换为 idle"""
+    print("测试批量决策容错...")
+    agents = [BrokenBatchAgent("x0"), BrokenBatchAgent("x1")]
+    engine = GameEngine(agents, seed=4, record_actions=True)
+    before = [a.position for a in agents]
+    engine.step()
+    assert [a.position for a in agents] == before
+    assert not engine.state.bullets
+
+    agents = [PlanBatchAgent("p0"), PlanBatchAgent("p1")]
+    engine = GameEngine(agents, seed=4)
+    engine.step()  # 非字符串结果逐个替换为 idle，不应抛出 TypeError
+    assert not engine.state.bullets
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_one_call_per_turn()
+    test_bad_batch_falls_back_to_idle()
@@ -0,0 +1,62 @@
+"""
+控制台差量渲染测试
+"""
+import io
+import random
+import sys
+
+from game.engine import GameEngine
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+from visualizer.console_visualizer import ConsoleVisualizer, CLEAR_SCREEN
+
+
+def _render_frames(visualizer, engine, turns):
+    """渲染若干回合，返回每帧写出的字节数与全部输出"""
+    buf = io.StringIO()
+    old_stdout = sys.stdout
+    sys.stdout = buf
+    sizes = []
+    try:
+        for _ in range(turns):
+            state_info = engine.step()
+            start = buf.tell()
+            visualizer.render(state_info, clear=True)
+            sizes.append(buf.tell() - start)
+        visualizer.close()
+    finally:
+        sys.stdout = old_stdout
+    return sizes, buf.getvalue()
+
+
+def test_diff_render():
+    """只在首帧清屏，之后每帧只输出变化部分"""
+    print("测试控制台差量渲染...")
+    random.seed(1)
+    engine = GameEngine([AggressiveAgent("alpha"), DefensiveAgent("beta")], seed=1)
+    visualizer = ConsoleVisualizer(max_fps=0)
+
+    sizes, output = _render_frames(visualizer, engine, 30)
+    assert output.count(CLEAR_SCREEN) == 1
+    assert max(sizes[1:]) < sizes[0] / 4, sizes
+    print(f"  首帧 {sizes[0]} 字符，后续平均 {sum(sizes[1:]) / len(sizes[1:]):.0f} 字符")
+
+    print("✓ 测试通过！")
+
+
+def test_frame_limit():
+    """超过帧率上限的帧被跳过"""
+    print("测试帧率限制...")
+    random.seed(1)
+    engine = GameEngine([AggressiveAgent("alpha"), DefensiveAgent("beta")], seed=1)
+    visualizer = ConsoleVisualizer(max_fps=1)
+
+    sizes, _ = _render_frames(visualizer, engine, 10)
+    assert sizes[0] > 0
+    assert all(size == 0 for size in sizes[1:]), sizes
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_diff_render()
+    test_frame_limit()
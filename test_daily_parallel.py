@@ -0,0 +1,39 @@
+"""
+每日赛事并行执行测试
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from run_daily_tournament import play_scheduled_match, _init_match_worker
+from utils.participant_manager import ParticipantManager
+
+
+MATCHES = [
+    (['aggressive_player', 'example_player'], 11),
+    (['survival_player', 'test_player', 'aggressive_player', 'example_player'], 22),
+    (['tactical_player', 'weapon_hunter'], 33),
+]
+
+
+def test_parallel_matches_match_serial():
+    """相同种子下，工作进程中的比赛结果与主进程串行结果一致"""
+    print("测试并行比赛结果与串行一致...")
+
+    manager = ParticipantManager(participants_dir="participants")
+    serial = [play_scheduled_match(players, seed, max_turns=200, manager=manager)
+              for players, seed in MATCHES]
+
+    with ProcessPoolExecutor(max_workers=2, initializer=_init_match_worker,
+                             initargs=("participants",)) as pool:
+        futures = [pool.submit(play_scheduled_match, players, seed, 200)
+                   for players, seed in MATCHES]
+        parallel = [f.result() for f in futures]
+
+    for s, p in zip(serial, parallel):
+        assert s['status'] == 'completed', s
+        assert s == p, (s, p)
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_parallel_matches_match_serial()
@@ -0,0 +1,113 @@
+"""
+数据库工作单元、WAL 与线程连接测试
+"""
+import gc
+import os
+import sqlite3
+import tempfile
+import threading
+
+from utils.database import Database
+
+
+def match(i: int) -> dict:
+    return {'date': '2026-03-30', 'match_index': i, 'agent1_id': 'a', 'agent2_id': 'b',
+            'winner_id': 'a', 'agent1_score': 10, 'agent2_score': 2}
+
+
+def test_unit_of_work():
+    """嵌套事务只在最外层提交，异常时整体回滚"""
+    print("测试工作单元...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "test.db"))
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        db.add_participant({'id': 'a', 'name': 'A', 'type': 'ai'})
+
+        try:
+            with db.transaction():
+                db.record_matches([match(0), match(1)])
+                with db.transaction():
+                    db.update_participant_stats('a', points=3, is_win=True)
+                raise RuntimeError("中断")
+        except RuntimeError:
+            pass
+        assert db.get_daily_matches('2026-03-30') == []
+        assert db.get_participant('a')['total_points'] == 0
+
+        with db.transaction():
+            assert db.record_matches([match(0), match(1)]) == 2
+            db.record_point_history_batch([('a', '2026-03-30', 3, None, 'match_win'),
+                                           ('a', '2026-03-30', 1, None, 'participation')])
+            db.update_participant_stats('a', points=4, is_win=True)
+        other = Database(os.path.join(tmp, "test.db"))  # 另一个连接看到已提交的数据
+        assert [m['match_index'] for m in other.get_daily_matches('2026-03-30')] == [0, 1]
+        assert other.conn.execute("SELECT SUM(points_earned) FROM point_history").fetchone()[0] == 4
+        other.close()
+        db.close()
+
+    print("✓ 测试通过！")
+
+
+def test_per_thread_connections():
+    """每个线程使用自己的连接，并发写事务排队执行"""
+    print("测试线程连接...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "test.db"))
+        connections = []
+
+        def worker(offset: int):
+            connections.append(db.conn)
+            for i in range(20):
+                with db.transaction():
+                    db.record_matches([match(offset + i)])
+                    db.record_point_history('a', '2026-03-30', 1)
+
+        threads = [threading.Thread(target=worker, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(conn) for conn in connections}) == 4
+        assert db.conn not in connections
+        assert len(db.get_daily_matches('2026-03-30')) == 80
+        assert db.conn.execute("SELECT COUNT(*) FROM point_history").fetchone()[0] == 80
+        db.close()
+
+    print("✓ 测试通过！")
+
+
+def test_thread_connections_released():
+    """线程结束后它的连接被关闭并移出登记表，短生命周期线程不会累积文件句柄"""
+    print("测试线程结束释放连接...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "test.db"))
+        connections = []
+
+        def worker():
+            connections.append(db.conn)
+            db.record_point_history('a', '2026-03-30', 1)
+
+        for _ in range(20):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        assert len(db._connections) == 1  # 只剩主线程的连接
+        for conn in connections:
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.ProgrammingError:
+                continue
+            raise AssertionError("已结束线程的连接没有关闭")
+        assert db.conn.execute("SELECT COUNT(*) FROM point_history").fetchone()[0] == 20
+        db.close()
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_unit_of_work()
+    test_per_thread_connections()
+    test_thread_connections_released()
@@ -0,0 +1,46 @@
+"""
+引擎事件流测试
+"""
+import os
+import random
+import tempfile
+
+from game.engine import GameEngine
+from game.events import EventRingBuffer, EventFileSink, read_events, summarize_events, FIRE, KILL
+from agents.code_agent import AggressiveAgent
+
+
+def test_event_stream_matches_engine_stats():
+    """事件流汇总的击杀数与引擎统计一致，文件接收器可原样读回"""
+    print("测试事件流...")
+    random.seed(2)
+    agents = [AggressiveAgent(f'agg{i}') for i in range(4)]
+    events = EventRingBuffer()
+    GameEngine(agents, seed=2, event_sink=events).run(max_turns=500)
+
+    stats = summarize_events(events)
+    for agent in agents:
+        s = stats.get(agent.name, {'kills': 0})
+        assert s['kills'] == agent.kills, (agent.name, s, agent.kills)
+    assert any(e.kind == FIRE for e in events)
+    assert sum(1 for e in events if e.kind == KILL) == sum(a.deaths for a in agents)
+    shooter = max(stats.values(), key=lambda s: s['shots'])
+    assert 0 <= shooter['accuracy'] <= 1 and shooter['weapons']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'events.jsonl')
+        with EventFileSink(path) as sink:
+            for event in events:
+                sink.emit(event)
+        assert list(read_events(path)) == list(events)
+
+    small = EventRingBuffer(capacity=10)
+    for event in events:
+        small.emit(event)
+    assert len(small) == min(10, len(events))
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_event_stream_matches_engine_stats()
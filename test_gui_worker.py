@@ -0,0 +1,86 @@
+"""
+GUI 工作进程与进度事件测试（不需要显示器，不导入 tkinter）
+"""
+import multiprocessing
+import queue
+import tempfile
+
+from gui.worker import run_tournament_job, worker_main
+from tournament.progress import ProgressTracker, format_eta
+
+
+PLAYERS = ['example_player', 'aggressive_player', 'survival_player', 'weapon_hunter']
+
+
+def drain(events) -> list:
+    result = []
+    while True:
+        try:
+            result.append(events.get(timeout=60))
+        except queue.Empty:
+            raise AssertionError("工作进程没有发出结束事件")
+        if result[-1]['type'] in ('done', 'error'):
+            return result
+
+
+def test_progress_tracker_eta():
+    """预计剩余时间按已完成比赛的平均墙钟耗时估算"""
+    print("测试进度跟踪...")
+    now = [0.0]
+    events = []
+    tracker = ProgressTracker(events.append, clock=lambda: now[0])
+    tracker.start(4, "循环赛")
+    tracker.match_started(['a', 'b'], 'm1')
+    now[0] = 2.0
+    tracker.match_finished(['a', 'b'], 'a', 'm1')
+    tracker.match_finished(['c', 'd'], None, 'm2', seconds=1.5)  # 在其他进程中运行的比赛
+    assert [e['type'] for e in events] == ['tournament_started', 'match_started',
+                                           'match_finished', 'match_finished']
+    assert events[2]['seconds'] == 2.0 and events[2]['eta'] == 6.0
+    assert events[3]['done'] == 2 and events[3]['eta'] == 2.0 and events[3]['winner'] is None
+    assert format_eta(None) == "--:--" and format_eta(65) == "1:05" and format_eta(3725) == "1:02:05"
+    print("✓ 测试通过！")
+
+
+def test_worker_job_streams_events():
+    """工作进程发出每场比赛的进度事件，print 输出转为日志事件"""
+    print("测试工作进程事件...")
+    with tempfile.TemporaryDirectory() as tmp:
+        events = queue.Queue()
+        run_tournament_job({'mode': 'round_robin', 'agents': PLAYERS[:3], 'max_turns': 100,
+                            'save_replay': False, 'replay_dir': tmp}, events)
+        received = drain(events)
+    assert received[-1]['type'] == 'done', received[-1]
+    finished = [e for e in received if e['type'] == 'match_finished']
+    assert [e['done'] for e in finished] == [1, 2, 3] and finished[-1]['total'] == 3
+    assert finished[-1]['eta'] == 0
+    log = [line for e in received if e['type'] == 'log' for line in e['lines']]
+    assert any("比赛结果" in line for line in log)
+    print("✓ 测试通过！")
+
+
+def test_group_tournament_in_spawned_process():
+    """GUI 的运行方式：spawn 启动工作进程，小组赛再用多个进程并行"""
+    print("测试分组赛工作进程...")
+    with tempfile.TemporaryDirectory() as tmp:
+        context = multiprocessing.get_context('spawn')
+        events = context.Queue()
+        worker = context.Process(target=worker_main, args=({
+            'mode': 'group', 'agents': PLAYERS, 'group_size': 2, 'advance': 1, 'workers': 2,
+            'max_turns': 100, 'save_replay': True, 'replay_dir': tmp}, events))
+        worker.start()
+        received = drain(events)
+        worker.join(timeout=30)
+    assert received[-1]['type'] == 'done', received[-1]
+    started = next(e for e in received if e['type'] == 'tournament_started')
+    assert started['total'] == 3  # 两个小组各 1 场 + 决赛 1 场
+    finished = [e for e in received if e['type'] == 'match_finished']
+    assert len(finished) == 3 and finished[-1]['done'] == 3
+    assert received[-1]['summary']['champion'] in PLAYERS
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_progress_tracker_eta()
+    test_worker_job_streams_events()
+    test_group_tournament_in_spawned_process()
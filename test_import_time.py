@@ -0,0 +1,79 @@
+"""
+启动导入开销测试
+用 -X importtime 检查无界面批处理入口不会加载重量级依赖，并打印各入口的导入耗时摘要。
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# 无界面入口 -> 启动时不应加载的模块
+HEADLESS_ENTRIES = ["game", "agents", "tournament", "utils", "visualizer",
+                    "run_tournament", "run_tournament_with_participants", "run_daily_tournament"]
+HEAVY_MODULES = {"openai", "numpy", "flask", "tkinter", "asyncio", "colorama",
+                 "visualizer.web_visualizer", "concurrent.futures.process"}
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """
+    在子进程中导入模块
+
+    Returns:
+        [(模块名, 自身耗时微秒, 累计耗时微秒), ...]
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def test_headless_entries_stay_light():
+    """批处理入口与各包的 __init__ 不加载 LLM 客户端、NumPy、Web/GUI 框架等"""
+    print("测试启动导入...")
+    summary: Dict[str, float] = {}
+    for entry in HEADLESS_ENTRIES:
+        rows = import_times(entry)
+        loaded = {name for name, _, _ in rows}
+        heavy = loaded & HEAVY_MODULES
+        assert not heavy, f"导入 {entry} 时加载了 {sorted(heavy)}"
+        total = next(cumulative for name, _, cumulative in rows if name == entry)
+        summary[entry] = total / 1000
+        slowest = sorted(rows, key=lambda r: -r[1])[:3]
+        print(f"  {entry:<36} {total / 1000:>7.1f}ms  最慢: "
+              + ", ".join(f"{name} {self_us / 1000:.1f}ms" for name, self_us, _ in slowest))
+
+    print("✓ 测试通过！")
+
+
+def test_lazy_package_exports():
+    """包级名称首次访问时才导入对应子模块"""
+    print("测试延迟导出...")
+    code = (
+        "import sys, game, agents\n"
+        "assert 'game.engine' not in sys.modules and 'agents.code_agent' not in sys.modules\n"
+        "from game import GameEngine, ActionPlan\n"
+        "from agents import AggressiveAgent\n"
+        "assert GameEngine.__module__ == 'game.engine' and 'game.engine' in sys.modules\n"
+        "assert 'agents.prompt_agent' not in sys.modules\n"
+        "assert sorted(dir(game)) and 'GameEngine' in dir(game)\n"
+        "try:\n"
+        "    game.NoSuchThing\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise AssertionError\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_headless_entries_stay_light()
+    test_lazy_package_exports()
@@ -0,0 +1,70 @@
+"""
+大地图模式测试
+"""
+import math
+import random
+
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+from game.arena import LargeArena
+from game.engine import GameEngine
+from game.replay import ReplaySimulator, build_replay
+
+
+def _make_agents(n):
+    return [(AggressiveAgent if i % 2 else DefensiveAgent)(f"p{i}") for i in range(n)]
+
+
+def test_map_generation():
+    """出生点满足最小间距，障碍远离出生点"""
+    print("测试大地图生成...")
+    arena = LargeArena()
+    agents = _make_agents(500)
+    engine = GameEngine(agents, 2000, 2000, seed=3, arena=arena)
+
+    positions = [a.position for a in agents]
+    cell = {}
+    for i, (x, y) in enumerate(positions):
+        cell.setdefault((int(x // 50), int(y // 50)), []).append(i)
+    for i, (x, y) in enumerate(positions):
+        cx, cy = int(x // 50), int(y // 50)
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                for j in cell.get((cx + ox, cy + oy), []):
+                    if j != i:
+                        assert math.dist(positions[i], positions[j]) >= arena.spawn_spacing
+    assert len(engine.state.obstacles) > 100
+    assert not any(engine._blocked_by_obstacle(p) for p in positions)
+    print(f"  {len(agents)} 名Agent，{len(engine.state.obstacles)} 个障碍")
+
+    print("✓ 测试通过！")
+
+
+def test_interest_management_matches_full_scan():
+    """区块查询与全量扫描的比赛过程完全一致，回放可重演"""
+    print("测试区块兴趣管理...")
+    finals = []
+    for indexed in (True, False):
+        random.seed(5)
+        agents = _make_agents(200)
+        engine = GameEngine(agents, 600, 600, seed=5, arena=LargeArena(), record_actions=True)
+        if not indexed:
+            engine.arena = None
+        for _ in range(60):
+            state_info = engine.step()
+        finals.append([(a['health'], a['position']) for a in state_info['agents']])
+        if indexed:
+            replay = build_replay(engine)
+    assert finals[0] == finals[1]
+    assert any(health < 100 for health, _ in finals[0]), "应发生交火"
+
+    frame = None
+    for frame in ReplaySimulator(replay).frames():
+        pass
+    assert [(a['health'], a['position']) for a in frame['agents']] == finals[0]
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_map_generation()
+    test_interest_management_matches_full_scan()
@@ -0,0 +1,65 @@
+"""
+静态排行榜发布测试
+"""
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from tournament.publish import LeaderboardPublisher, player_shard_name
+
+
+def make_rankings(num_players: int, date: str = "2026-03-01"):
+    overall = []
+    for i in range(num_players):
+        kind = 'ai' if i % 3 else 'human'
+        overall.append({'rank': i + 1, 'id': f"p{i}", 'display_name': f"选手{i}", 'type': kind,
+                        'total_points': 1000 - i, 'total_matches': 10, 'win_rate': 50.0})
+    ai_only = [dict(p, rank=r) for r, p in enumerate((p for p in overall if p['type'] == 'ai'), 1)]
+    human_only = [dict(p, rank=r) for r, p in enumerate((p for p in overall if p['type'] == 'human'), 1)]
+    return {'date': date, 'overall': overall, 'ai_only': ai_only, 'human_only': human_only,
+            'generated_at': f"{date}T09:00:00"}
+
+
+def test_publish_shards():
+    """写出前 N 名页面、每名选手分片及 gzip 版本，latest.json 指向当前版本"""
+    print("测试静态排行榜发布...")
+    with tempfile.TemporaryDirectory() as tmp:
+        publisher = LeaderboardPublisher(tmp, top_n=5)
+        latest = publisher.publish(make_rankings(12), {'ai_win_rate': 60.0, 'human_win_rate': 40.0})
+
+        root = Path(tmp)
+        assert json.loads((root / "latest.json").read_text(encoding='utf-8')) == latest
+        page_file = root / latest['leaderboard']
+        page = json.loads(page_file.read_text(encoding='utf-8'))
+        assert [p['rank'] for p in page['overall']] == [1, 2, 3, 4, 5]
+        assert page['total_participants'] == 12
+        assert gzip.decompress((root / (latest['leaderboard'] + '.gz')).read_bytes()) == page_file.read_bytes()
+
+        players = sorted((root / latest['players']).glob("*.json"))
+        assert len(players) == 12
+        shard = json.loads((root / latest['version'] / page['overall'][0]['shard']).read_text(encoding='utf-8'))
+        assert shard['player']['id'] == 'p0' and shard['category_rank'] == 1
+
+    print("✓ 测试通过！")
+
+
+def test_versions_and_pruning():
+    """相同内容不重写，新内容得到新版本，旧版本按保留数清理"""
+    print("测试版本管理...")
+    with tempfile.TemporaryDirectory() as tmp:
+        publisher = LeaderboardPublisher(tmp, keep_versions=2)
+        first = publisher.publish(make_rankings(4))
+        assert publisher.publish(make_rankings(4))['version'] == first['version']
+
+        versions = [publisher.publish(make_rankings(4, date=f"2026-03-0{d}"))['version'] for d in (2, 3, 4)]
+        on_disk = sorted(d.name for d in Path(tmp).iterdir() if d.is_dir())
+        assert on_disk == sorted(versions[-2:])
+
+    assert player_shard_name("a/b c") == "a_b_c.json"
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_publish_shards()
+    test_versions_and_pruning()
@@ -0,0 +1,93 @@
+"""
+参赛者清单缓存测试
+"""
+import tempfile
+from pathlib import Path
+
+from utils.agent_loader import AgentLoader
+from utils.participant_manager import ParticipantManager
+
+AGENT_SOURCE = '''
+from agents.code_agent import CodeAgent
+
+
+class {name}(CodeAgent):
+    """{doc}"""
+
+    def step(self, observation):
+        return "{action}"
+'''
+
+
+def write_agent(root: Path, pid: str, name: str = "Agent", doc: str = "测试选手", action: str = "idle"):
+    player_dir = root / pid
+    player_dir.mkdir(exist_ok=True)
+    (player_dir / "agent.py").write_text(AGENT_SOURCE.format(name=name, doc=doc, action=action),
+                                         encoding='utf-8')
+
+
+def test_unchanged_participants_not_imported():
+    """清单命中时不导入模块，修改过的文件重新导入"""
+    print("测试清单缓存...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_agent(root, "alpha")
+        write_agent(root, "beta", name="BetaBot", doc="第二名选手")
+
+        loader = AgentLoader(tmp)
+        first = loader.discover_agents()
+        assert loader.manifest.imports == 2
+        assert (root / ".manifest.json").exists()
+
+        loader = AgentLoader(tmp)
+        second = loader.discover_agents()
+        assert loader.manifest.imports == 0
+        assert sorted(i['class_name'] for i in second) == sorted(i['class_name'] for i in first) == ["Agent", "BetaBot"]
+
+        # 只在创建实例时才导入
+        instances = loader.create_agent_instances()
+        assert loader.manifest.imports == 2
+        assert sorted(a.step(None) for a in instances) == ["idle", "idle"]
+
+        write_agent(root, "beta", name="BetaBot", doc="第二名选手", action="shoot")
+        loader = AgentLoader(tmp)
+        loader.discover_agents()
+        assert loader.manifest.imports == 1
+
+    print("✓ 测试通过！")
+
+
+def test_participant_manager_uses_manifest():
+    """选手管理器的元数据也来自清单，删除的选手从清单中移除"""
+    print("测试选手管理器清单...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_agent(root, "smart_bot", doc="聪明的选手")
+        write_agent(root, "human_player", name="HumanPlayer")
+
+        manager = ParticipantManager(tmp, data_file=str(root / "participants.json"))
+        first = {p['id']: p for p in manager.scan_participants_directory()}
+        assert manager.manifest.imports == 2
+
+        manager = ParticipantManager(tmp, data_file=str(root / "participants.json"))
+        second = {p['id']: p for p in manager.scan_participants_directory()}
+        assert manager.manifest.imports == 0
+        assert second == first
+        assert second['smart_bot']['description'] == "聪明的选手"
+        assert second['human_player']['type'] == 'human'
+
+        agent = manager.create_agent_instance('smart_bot')
+        assert agent.name == 'smart_bot' and manager.manifest.imports == 1
+
+        (root / "human_player" / "agent.py").unlink()
+        (root / "human_player").rmdir()
+        manager = ParticipantManager(tmp, data_file=str(root / "participants.json"))
+        manager.scan_participants_directory()
+        assert set(manager.manifest.entries) == {'smart_bot'}
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_unchanged_participants_not_imported()
+    test_participant_manager_uses_manifest()
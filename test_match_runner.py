@@ -0,0 +1,50 @@
+"""
+统一比赛运行器测试
+"""
+import random
+
+from game.match_runner import MatchRunner, ReplayRecorder, StallTimeoutPolicy, results_table_sink
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+from visualizer.web_visualizer import WebVisualizer
+
+
+def test_runner_records_and_updates_stats():
+    """相同种子结果一致，回放与积分表由可插拔组件更新"""
+    print("测试比赛运行器...")
+    agents = [AggressiveAgent('agg'), DefensiveAgent('def')]
+    results = {a.name: {'wins': 0, 'losses': 0, 'kills': 0, 'deaths': 0, 'points': 0}
+               for a in agents}
+    runner = MatchRunner(max_turns=300, stats_sinks=[results_table_sink(results)])
+
+    outcomes = []
+    for _ in range(2):
+        random.seed(5)
+        visualizer = WebVisualizer(100, 100)
+        result = runner.run(agents, ReplayRecorder(visualizer), seed=5)
+        outcomes.append((result['winner'] and result['winner'].name, result['turns'],
+                         len(visualizer.replay_data)))
+
+    assert outcomes[0] == outcomes[1], outcomes
+    winner, turns, frames = outcomes[0]
+    assert frames >= turns // 2
+    assert sum(r['wins'] + r['losses'] for r in results.values()) == 4
+    if winner:
+        assert results[winner]['points'] == 6
+
+    print("✓ 测试通过！")
+
+
+def test_timeout_policy_stops_match():
+    """超时策略可提前结束比赛并按评分判定"""
+    print("测试超时策略...")
+    runner = MatchRunner(max_turns=500, timeout_policy=StallTimeoutPolicy(max_match_seconds=0.0))
+    result = runner.run([AggressiveAgent('agg'), DefensiveAgent('def')], seed=1)
+    assert result['turns'] == 1 and not result['decided']
+    assert result['stop_reason']
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_runner_records_and_updates_stats()
+    test_timeout_policy_stops_match()
@@ -0,0 +1,77 @@
+"""
+观察特征编码测试
+"""
+import random
+
+import numpy as np
+
+from game.agent import Agent, Observation
+from game.engine import GameEngine
+from game.features import ObservationEncoder
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+
+
+class RecordingAgent(Agent):
+    """记录收到的特征向量"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.seen = []
+
+    def step(self, observation: Observation) -> str:
+        self.seen.append(observation.features)
+        return "idle"
+
+
+def test_matches_dict_observation():
+    """特征中的最近敌人与字典观察一致，形状固定"""
+    print("测试特征与字典观察一致...")
+    random.seed(1)
+    encoder = ObservationEncoder()
+    agents = [AggressiveAgent(f"a{i}") for i in range(3)] + [DefensiveAgent("d")]
+    engine = GameEngine(agents, seed=1, observation_encoder=encoder)
+    for _ in range(40):
+        engine.step()
+
+    features = encoder.encode_all(engine)
+    assert features.shape == (4, encoder.feature_size) and features.dtype == np.float32
+    for i, agent in enumerate(agents):
+        if agent.health <= 0:
+            assert not features[i].any()
+            continue
+        parts = encoder.split(features[i])
+        enemies = parts['enemies'].reshape(encoder.k_enemies, encoder.ENEMY_FIELDS)
+        expected = sorted(e['distance'] for e in engine._build_observation(agent).enemies_in_view)
+        got = enemies[enemies[:, 0] > 0, 3] * engine.view_distance
+        assert np.allclose(got, expected[:encoder.k_enemies], atol=1e-3), (got, expected)
+        assert parts['self'][0] == agent.health / 100.0
+
+    print("✓ 测试通过！")
+
+
+def test_rays_and_engine_hook():
+    """射线距离正确；引擎把对应行附加到 observation.features"""
+    print("测试射线与引擎接入...")
+    encoder = ObservationEncoder(n_rays=4)
+    agents = [RecordingAgent("r0"), RecordingAgent("r1")]
+    engine = GameEngine(agents, seed=2, observation_encoder=encoder)
+    agents[0].position, agents[0].direction = (90.0, 50.0), (1.0, 0.0)
+    agents[1].position, agents[1].direction = (10.0, 10.0), (0.0, 1.0)
+    engine.state.obstacles = [{'rect': (5.0, 30.0, 10.0, 10.0)}]
+
+    rays = encoder.split(encoder.encode_all(engine))['rays'] * engine.view_distance
+    # r0 朝右距离右边界 10，朝左 30 以外
+    assert abs(rays[0, 0] - 10.0) < 1e-4 and abs(rays[0, 2] - 30.0) < 1e-4
+    # r1 朝下（+y）20 处遇到障碍
+    assert abs(rays[1, 0] - 20.0) < 1e-4
+
+    engine.step()
+    assert agents[0].seen[0].shape == (encoder.feature_size,)
+    assert np.array_equal(agents[1].seen[0], engine.observation_features[1])
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_matches_dict_observation()
+    test_rays_and_engine_hook()
@@ -0,0 +1,89 @@
+"""
+测试选手注册表：数据库是唯一数据源，participants.json 只是导出文件
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from utils.database import Database
+from utils.participant_manager import ParticipantManager
+
+
+AGENT_SOURCE = '''from agents.code_agent import CodeAgent
+
+
+class SmartAgent(CodeAgent):
+    """聪明的选手"""
+
+    def step(self, observation):
+        return "idle"
+'''
+
+
+def test_import_and_export():
+    """旧的导出文件只导入一次，统计按行更新后再导出"""
+    print("测试选手导入与导出...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        data_file = root / "participants.json"
+        data_file.write_text(json.dumps({"participants": [{
+            "id": "old_player", "name": "OldAgent", "display_name": "🤖 Old Player",
+            "type": "ai", "developer": "Code-based AI", "created_at": "2026-03-08",
+            "stats": {"total_matches": 4, "total_wins": 2, "total_kills": 5,
+                      "total_deaths": 1, "total_points": 30}
+        }]}), encoding='utf-8')
+
+        db = Database(str(root / "tournament.db"))
+        manager = ParticipantManager(str(root / "participants"), data_file=str(data_file), database=db)
+        participants = manager.load_participants()
+        assert [p['id'] for p in participants] == ['old_player']
+        assert participants[0]['stats']['total_points'] == 30
+        assert participants[0]['developer'] == "Code-based AI"
+        assert participants[0]['created_at'] == "2026-03-08"
+
+        # 数据库中已有选手时不再读取导出文件
+        data_file.write_text(json.dumps({"participants": []}), encoding='utf-8')
+        db.update_participant_stats('old_player', points=10, kills=1, is_win=True)
+        assert manager.load_participants()[0]['stats']['total_points'] == 40
+
+        manager.save_to_data_file()
+        exported = json.loads(data_file.read_text(encoding='utf-8'))['participants']
+        assert exported[0]['stats'] == {"total_matches": 5, "total_wins": 3, "total_kills": 6,
+                                        "total_deaths": 1, "total_points": 40}
+        db.close()
+
+    print("✓ 测试通过！")
+
+
+def test_sync_keeps_stats():
+    """重新同步只更新注册信息，已有统计保持不变"""
+    print("测试选手同步...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        agent_dir = root / "participants" / "smart_bot"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "agent.py").write_text(AGENT_SOURCE, encoding='utf-8')
+
+        db = Database(str(root / "tournament.db"))
+        manager = ParticipantManager(str(root / "participants"), data_file=str(root / "participants.json"),
+                                     manifest_file=str(root / "manifest.json"), database=db)
+        assert manager.sync_participants() == {'total': 1, 'ai_count': 1, 'human_count': 0}
+        db.update_participant_stats('smart_bot', points=7)
+
+        (agent_dir / "agent.py").write_text(AGENT_SOURCE.replace("聪明的选手", "更聪明的选手"), encoding='utf-8')
+        manager.sync_participants()
+        participant = manager.get_participant('smart_bot')
+        assert participant['description'] == "更聪明的选手"
+        assert participant['stats']['total_points'] == 7
+
+        assert manager.register_participant({"id": "human_one", "name": "HumanOne", "type": "human"})
+        assert manager.get_participant('human_one')['stats']['total_matches'] == 0
+        assert db.get_participant('smart_bot')['total_points'] == 7
+        db.close()
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_import_and_export()
+    test_sync_keeps_stats()
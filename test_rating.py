@@ -0,0 +1,52 @@
+"""
+等级分系统测试
+"""
+import random
+
+from tournament.rating import EloRating, match_score
+
+
+def test_incremental_update():
+    """2 人对战为标准 Elo，多人混战按名次两两结算且总分守恒"""
+    print("测试等级分增量更新...")
+    rating = EloRating(k_factor=32, provisional_games=0)
+
+    deltas = rating.update_match({'a': 1, 'b': 0})
+    assert abs(deltas['a'] - 16.0) < 1e-9
+    assert abs(deltas['a'] + deltas['b']) < 1e-9
+
+    deltas = rating.update_match({
+        'a': match_score(kills=0, health=40, is_win=True),
+        'b': match_score(kills=2, health=0, is_win=False),
+        'c': match_score(kills=0, health=0, is_win=False),
+        'd': match_score(kills=0, health=0, is_win=False),
+    })
+    assert deltas['a'] > 0 and deltas['b'] > deltas['c']
+    assert abs(deltas['c'] - deltas['d']) < 1e-9
+    assert abs(sum(deltas.values())) < 1e-9
+
+    print("✓ 测试通过！")
+
+
+def test_batch_recompute():
+    """批量重算的排序与真实强度一致"""
+    print("测试等级分批量重算...")
+    rng = random.Random(3)
+    strength = {f'p{i}': i * 100 for i in range(8)}
+    history = []
+    for _ in range(2000):
+        players = rng.sample(list(strength), 4)
+        history.append({p: strength[p] + rng.gauss(0, 150) for p in players})
+
+    rating = EloRating()
+    ratings = rating.recompute(history)
+    ordered = sorted(ratings, key=ratings.get)
+    assert ordered == sorted(strength, key=strength.get), ordered
+    assert sum(rating.games.values()) == 2000 * 4
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_incremental_update()
+    test_batch_recompute()
@@ -0,0 +1,112 @@
+"""
+日报 / 周报增量汇总测试
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import utils.database as database
+from utils.database import Database, iso_week
+from tournament.ranking import RankingManager
+from tournament.weekly_report import WeeklyReportGenerator
+
+
+def test_weekly_report_from_aggregates():
+    """周报与周榜直接读取比赛记录时累加的汇总行"""
+    print("测试周报增量汇总...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        db = Database(os.path.join(tmp, "test.db"))
+        database._db_instance = db
+        try:
+            db.add_participant({'id': 'a', 'name': 'A', 'type': 'ai'})
+            db.add_participant({'id': 'h', 'name': 'H', 'type': 'human'})
+
+            # 同一周的两天，另加一场下周的比赛
+            for date in ['2026-03-23', '2026-03-24']:
+                db.record_daily_stats('a', date, points=4, kills=5, is_win=True)
+                db.record_daily_stats('h', date, points=0, kills=1, deaths=1)
+                db.record_match_summary(date, completed=True, winner_type='ai')
+            db.record_match_summary('2026-03-24', completed=False)
+            db.record_daily_stats('h', '2026-03-30', points=3, is_win=True)
+            db.record_match_summary('2026-03-30', completed=True, winner_type='human')
+
+            week = iso_week('2026-03-24')
+            assert week == '2026-W13'
+            assert db.get_daily_summary('2026-03-24')['errors'] == 1
+
+            report = WeeklyReportGenerator().generate_weekly_report(week)
+            assert (report['start_date'], report['end_date']) == ('2026-03-23', '2026-03-29')
+            assert report['stats']['total_matches'] == 3
+            assert report['stats']['completed_matches'] == 2
+            assert report['stats']['ai_win_rate'] == 100.0
+            top = report['rankings'][0]
+            assert (top['id'], top['weekly_points'], top['weekly_wins'], top['weekly_kills']) == ('a', 8, 2, 10)
+
+            rankings = RankingManager().generate_weekly_rankings(week)
+            assert [r['id'] for r in rankings] == ['a', 'h']
+            assert rankings[1]['total_deaths'] == 2
+            assert RankingManager().generate_weekly_rankings('2026-W14')[0]['id'] == 'h'
+        finally:
+            database._db_instance = None
+            db.close()
+            os.chdir(cwd)
+
+    print("✓ 测试通过！")
+
+
+def test_weekly_trends():
+    """周汇总行的名次、选手走势、进步最快与名次变化"""
+    print("测试积分走势...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        db = Database(os.path.join(tmp, "test.db"))
+        database._db_instance = db
+        try:
+            for pid in ('a', 'b', 'c'):
+                db.add_participant({'id': pid, 'name': pid.upper(), 'type': 'ai'})
+
+            # 第12周 a > b > c，第13周 c 大幅进步，a 下滑
+            for date, points in (('2026-03-16', {'a': 9, 'b': 6, 'c': 1}),
+                                 ('2026-03-23', {'a': 2, 'b': 7, 'c': 12})):
+                for pid, pts in points.items():
+                    db.record_daily_stats(pid, date, points=pts, is_win=pts > 5)
+                db.record_match_summary(date, completed=True, winner_type='ai')
+                db.update_daily_ranks(date)
+                db.update_weekly_ranks(iso_week(date))
+
+            assert database.previous_week('2026-W13') == '2026-W12'
+            assert database.previous_week('2021-W01') == '2020-W53'
+            trend = db.get_participant_trend('c', weeks=4)
+            assert [(t['week'], t['points'], t['rank']) for t in trend] == [('2026-W12', 1, 3), ('2026-W13', 12, 1)]
+            assert [t['week'] for t in db.get_participant_trend('c', weeks=1)] == ['2026-W13']
+            assert [t['week'] for t in db.get_participant_trend('c', end_week='2026-W12')] == ['2026-W12']
+            assert db.get_daily_player_stats('2026-03-23')[0]['id'] == 'c'
+
+            improved = db.get_most_improved('2026-W13', limit=2)
+            assert [(p['id'], p['point_change']) for p in improved] == [('c', 11), ('b', 1)]
+
+            report = WeeklyReportGenerator().generate_weekly_report('2026-W13')
+            assert [p['id'] for p in report['most_improved']] == ['c', 'b', 'a']
+            changes = {r['id']: r['rank_change'] for r in report['rankings']}
+            assert changes == {'c': 2, 'b': 0, 'a': -2}
+
+            rankings = RankingManager().generate_weekly_rankings('2026-W13')
+            assert [(r['id'], r['previous_rank'], r['rank_change']) for r in rankings] == \
+                [('c', 3, 2), ('b', 2, 0), ('a', 1, -2)]
+            assert RankingManager().generate_weekly_rankings('2026-W12')[0]['rank_change'] is None
+        finally:
+            database._db_instance = None
+            db.close()
+            os.chdir(cwd)
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_weekly_report_from_aggregates()
+    test_weekly_trends()
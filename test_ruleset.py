@@ -0,0 +1,89 @@
+"""
+规则集测试
+"""
+import random
+from collections import Counter
+
+from game.engine import GameEngine
+from game.replay import ReplaySimulator
+from game.ruleset import AliasTable, Ruleset, default_ruleset, load_ruleset
+from agents.code_agent import AggressiveAgent, DefensiveAgent
+
+
+def test_default_weapons():
+    """默认规则与原有武器数值一致，无弹药时退回普通武器"""
+    print("测试默认武器表...")
+    agents = [AggressiveAgent("alpha"), DefensiveAgent("beta")]
+    engine = GameEngine(agents, seed=1)
+    shooter = agents[0]
+
+    shooter.weapon = 'shotgun'
+    shooter.ammo['shotgun'] = 1
+    engine._fire_weapon(shooter)
+    assert len(engine.state.bullets) == 3
+    assert all(b.kind == 'shotgun' and b.damage == 8 for b in engine.state.bullets)
+    assert shooter.ammo['shotgun'] == 0 and shooter.shoot_cooldown == 25
+
+    engine.state.bullets.clear()
+    engine._fire_weapon(shooter)
+    assert [b.kind for b in engine.state.bullets] == ['normal']
+    assert shooter.shoot_cooldown == 20
+
+    engine.state.bullets.clear()
+    shooter.weapon = 'rocket'
+    shooter.ammo['rocket'] = 2
+    engine._fire_weapon(shooter)
+    assert engine.state.bullets[0].splash_radius == 8.0
+
+    print("✓ 测试通过！")
+
+
+def test_alias_table():
+    """别名表抽样频率与权重一致"""
+    print("测试别名表抽样...")
+    table = AliasTable(['a', 'b', 'c'], [1, 2, 7])
+    rng = random.Random(5)
+    counts = Counter(table.sample(rng) for _ in range(100000))
+    for item, expected in (('a', 0.1), ('b', 0.2), ('c', 0.7)):
+        assert abs(counts[item] / 100000 - expected) < 0.01, counts
+
+    spawn = default_ruleset().spawn_table
+    counts = Counter(spawn.sample(rng) for _ in range(130000))
+    assert abs(counts['health'] / 130000 - 1 / 13) < 0.005, counts
+
+    print("✓ 测试通过！")
+
+
+def test_variant_ruleset():
+    """变体规则文件可载入、生效，并能从回放重演"""
+    print("测试变体规则...")
+    ruleset = load_ruleset('data/rulesets/rocket_arena.json')
+    assert not ruleset.is_default and default_ruleset().is_default
+
+    random.seed(2)
+    agents = [AggressiveAgent("alpha"), DefensiveAgent("beta")]
+    engine = GameEngine(agents, seed=2, record_actions=True, ruleset=ruleset)
+    assert {s['type'] for s in engine.state.supplies} <= {'weapon_rocket', 'ammo_rocket'}
+    winner = engine.run(max_turns=300)
+
+    from game.replay import build_replay
+    replay = build_replay(engine, winner.name if winner else None)
+    assert replay['ruleset']['name'] == 'rocket_arena'
+    final = None
+    for final in ReplaySimulator(replay).frames():
+        pass
+    assert [a['health'] for a in final['agents']] == [a.health for a in agents]
+
+    try:
+        Ruleset({'supplies': {'ammo_laser': {'ammo': 'laser', 'amount': 1}}})
+        assert False, "未定义武器应校验失败"
+    except ValueError as e:
+        print(f"  校验错误: {e}")
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_default_weapons()
+    test_alias_table()
+    test_variant_ruleset()
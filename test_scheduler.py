@@ -0,0 +1,53 @@
+"""
+赛程生成器测试
+"""
+import random
+from collections import Counter
+
+from tournament.scheduler import MatchScheduler, RatingIndex
+
+
+def test_rating_index_nearest():
+    """最近积分查找跳过已移除和排除的选手"""
+    print("测试积分索引最近查找...")
+    index = RatingIndex({'a': 0, 'b': 10, 'c': 20, 'd': 30, 'e': 40})
+
+    assert index.nearest(21, 2) == ['c', 'd']
+    index.remove('c')
+    assert 'c' not in index and len(index) == 4
+    assert index.nearest(21, 2) == ['d', 'b']
+    assert index.nearest(21, 2, exclude=['d']) == ['b', 'e']
+    assert index.nearest(100, 10) == ['e', 'd', 'b', 'a']
+
+    print("✓ 测试通过！")
+
+
+def test_daily_schedule_constraints():
+    """每场选手不重复，场次上限与同积分段匹配保持不变"""
+    print("测试每日赛程约束...")
+    random.seed(1)
+    participants = [
+        {'id': f'p{i}', 'stats': {'total_points': random.randint(0, 300)}}
+        for i in range(2000)
+    ]
+    scheduler = MatchScheduler(participants, matches_per_day=5, players_per_match=4)
+    schedule = scheduler.generate_daily_schedule('2026-03-30')
+
+    assert len(schedule) == 2000 * 5 // 4
+    assert all(len(set(m['players'])) == 4 for m in schedule)
+
+    counts = Counter(pid for m in schedule for pid in m['players'])
+    # 只有赛程末尾可选人数不足时才会超出每日场次
+    assert sum(1 for c in counts.values() if c > 5) <= 4
+
+    points = {p['id']: p['stats']['total_points'] for p in participants}
+    spreads = [max(points[p] for p in m['players']) - min(points[p] for p in m['players'])
+               for m in schedule]
+    assert sum(spreads) / len(spreads) < 10
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_rating_index_nearest()
+    test_daily_schedule_constraints()
@@ -0,0 +1,34 @@
+"""
+基于种子的回放测试
+"""
+import json
+import random
+
+from game.engine import GameEngine
+from game.replay import build_replay, ReplaySimulator
+from agents.code_agent import AggressiveAgent, DefensiveAgent, RandomAgent
+
+
+def test_resimulation_matches_original():
+    """只用种子与动作重演，每一帧都与原比赛一致，且回放只有几 KB"""
+    print("测试回放重演...")
+    random.seed(4)
+    agents = [AggressiveAgent('agg'), DefensiveAgent('def'), RandomAgent('rnd'), AggressiveAgent('agg2')]
+    engine = GameEngine(agents, seed=4, record_actions=True)
+    original = []
+    while engine.state.turn < 500 and engine.state.alive_count > 1:
+        original.append(engine.step())
+
+    replay = build_replay(engine, engine.state.winner and engine.state.winner.name)
+    replay = json.loads(json.dumps(replay))
+    assert len(json.dumps(replay)) < 4096
+
+    frames = list(ReplaySimulator(replay).frames())
+    assert frames == original
+    assert sum(a['kills'] for a in frames[-1]['agents']) > 0
+
+    print("✓ 测试通过！")
+
+
+if __name__ == "__main__":
+    test_resimulation_matches_original()
@@ -1,9 +1,15 @@
 """
 比赛系统
 """
+from utils.lazy import lazy_exports
 
-from .tournament import Tournament, RoundRobinTournament, EliminationTournament
-from .group_tournament import GroupTournament
-
-__all__ = ['Tournament', 'RoundRobinTournament', 'EliminationTournament', 'GroupTournament']
+_EXPORTS = {
+    'Tournament': '.tournament',
+    'RoundRobinTournament': '.tournament',
+    'AdaptiveRoundRobinTournament': '.tournament',
+    'EliminationTournament': '.tournament',
+    'GroupTournament': '.group_tournament',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
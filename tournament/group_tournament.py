@@ -4,12 +4,65 @@
 """
 import random
 import math
+import time
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-from game.engine import GameEngine
 from game.agent import Agent
+from game.match_runner import MatchRunner, ReplayRecorder, results_table_sink
 from tournament.tournament import Tournament
-from visualizer.web_visualizer import WebVisualizer
+
+
+# 工作进程内的选手管理器与比赛设置（进程初始化时创建一次）
+_worker_manager = None
+_worker_settings: Dict = {}
+
+
+def _init_group_worker(participants_dir: str, settings: Dict):
+    """工作进程初始化：创建进程内独立的选手管理器"""
+    global _worker_manager, _worker_settings
+    from utils.participant_manager import ParticipantManager
+    _worker_manager = ParticipantManager(participants_dir=participants_dir)
+    _worker_settings = settings
+
+
+def _play_group_in_worker(group_idx: int, names: List[str]) -> Dict:
+    """在工作进程中按名称创建Agent并进行一个小组的循环赛"""
+    group = [_worker_manager.create_agent_instance(name) for name in names]
+    group_tournament, matches = _play_group_round_robin(group, group_idx, **_worker_settings)
+    return {
+        'rankings': group_tournament.get_rankings(),
+        'match_replays': group_tournament.match_replays,
+        'matches': matches
+    }
+
+
+def _play_group_round_robin(group: List[Agent], group_idx: int, map_width: int, map_height: int,
+                            save_replay: bool, replay_dir: str, max_turns: int, ruleset=None,
+                            progress=None, verbose: bool = False) -> Tuple[Tournament, List[Dict]]:
+    """
+    小组内循环赛（主进程与工作进程共用）
+    
+    Returns:
+        (小组 Tournament, [{'agents', 'name', 'winner', 'seconds'}] 每场比赛记录)
+    """
+    total_matches = len(group) * (len(group) - 1) // 2
+    group_tournament = Tournament(group, map_width, map_height,
+                                  save_replay=save_replay, replay_dir=replay_dir,
+                                  max_turns=max_turns, ruleset=ruleset, progress=progress)
+    matches = []
+    for i in range(len(group)):
+        for j in range(i + 1, len(group)):
+            agent1 = group[i]
+            agent2 = group[j]
+            match_name = f"Group{group_idx}_{agent1.name}_vs_{agent2.name}"
+            if verbose and len(matches) % 10 == 9:
+                print(f"  进度: {len(matches) + 1}/{total_matches}")
+            start = time.monotonic()
+            winner = group_tournament.play_match([agent1, agent2], match_name=match_name, verbose=False)
+            matches.append({'agents': [agent1.name, agent2.name], 'name': match_name,
+                            'winner': winner.name if winner else None,
+                            'seconds': time.monotonic() - start})
+    return group_tournament, matches
 
 
 class GroupTournament:
@@ -22,7 +75,11 @@ class GroupTournament:
                  map_height: int = 100,
                  save_replay: bool = True,
                  replay_dir: str = "replays",
-                 max_turns: int = 500):
+                 max_turns: int = 500,
+                 ruleset=None,
+                 progress=None,
+                 workers: int = 1,
+                 participants_dir: Optional[str] = None):
         """
         初始化分组比赛
         
@@ -35,6 +92,10 @@ class GroupTournament:
             save_replay: 是否保存回放
             replay_dir: 回放文件目录
             max_turns: 最大轮次（默认500）
+            ruleset: 规则集（见 game.ruleset），None 表示默认规则
+            progress: 进度跟踪器（见 tournament.progress），None 表示不发出进度事件
+            workers: 小组赛并行的工作进程数（默认1，串行）
+            participants_dir: 参赛者目录；并行时工作进程按Agent名称（目录名）从这里重新创建Agent
         """
         self.agents = agents
         self.group_size = group_size
@@ -45,6 +106,10 @@ class GroupTournament:
         self.replay_dir = Path(replay_dir)
         self.replay_dir.mkdir(exist_ok=True)
         self.max_turns = max_turns
+        self.ruleset = ruleset
+        self.progress = progress
+        self.workers = max(1, workers)
+        self.participants_dir = participants_dir
         
         self.results: Dict[str, Dict[str, any]] = {}
         self.group_results: List[Dict] = []  # 小组赛结果
@@ -64,6 +129,12 @@ class GroupTournament:
                 'advanced': False,
                 'final_rank': None
             }
+        
+        self.runner = MatchRunner(map_width, map_height, max_turns=max_turns,
+                                  stats_sinks=[results_table_sink(self.results)],
+                                  ruleset=ruleset)
+        self.elimination_runner = MatchRunner(map_width, map_height, max_turns=max_turns,
+                                              ruleset=ruleset)
     
     def create_groups(self, shuffle: bool = True) -> List[List[Agent]]:
         """
@@ -106,65 +177,16 @@ class GroupTournament:
         Returns:
             比赛结果字典
         """
-        # 重置Agent状态
-        for agent in agents:
-            agent.reset()
-        
-        # 创建可视化器（如果需要保存回放）
+        # 创建回放记录器（如果需要保存回放）
         visualizer = None
+        recorder = None
         if self.save_replay:
+            from visualizer.web_visualizer import WebVisualizer  # 只有生成回放时需要
             visualizer = WebVisualizer(self.map_width, self.map_height)
+            recorder = ReplayRecorder(visualizer)
         
-        # 创建游戏引擎
-        engine = GameEngine(agents, self.map_width, self.map_height)
-        
-        # 运行游戏并记录
-        frame_interval = 2  # 每2回合记录一帧
-        winner = None
-        last_state_info = None  # 保存最后一帧的状态信息
-        while engine.state.turn < self.max_turns:
-            state_info = engine.step()
-            last_state_info = state_info  # 保存最后一帧
-            
-            # 记录帧
-            if self.save_replay and visualizer:
-                if engine.state.turn % frame_interval == 0:
-                    visualizer.record_frame(state_info)
-            
-            # 检查是否有获胜者（只允许在只剩一个存活者时判定）
-            winner = engine.state.get_winner(allow_score_judge=False)
-            if winner:
-                # 记录最后几帧
-                if self.save_replay and visualizer:
-                    for _ in range(10):
-                        state_info = engine.step()
-                        visualizer.record_frame(state_info)
-                break
-        
-        # 超时后按评分判定获胜者（如果还没有）
-        if winner is None:
-            # 确保记录最后一帧（如果还没有记录）
-            if self.save_replay and visualizer and last_state_info:
-                # 如果最后一帧的回合数不同，说明需要记录新帧
-                if not visualizer.replay_data or visualizer.replay_data[-1]['turn'] != last_state_info['turn']:
-                    visualizer.record_frame(last_state_info)
-            
-            winner = engine.state.get_winner(allow_score_judge=True)
-            # 如果有获胜者，更新回放数据中的获胜者信息
-            if winner and self.save_replay and visualizer:
-                visualizer.set_winner(winner.name)
-        
-        # 更新统计
-        for agent in agents:
-            stats = self.results[agent.name]
-            stats['kills'] += agent.kills
-            stats['deaths'] += agent.deaths
-            
-            if winner and agent == winner:
-                stats['wins'] += 1
-                stats['points'] += 3
-            else:
-                stats['losses'] += 1
+        # 运行比赛（统计由 results_table_sink 更新）
+        winner = self.runner.run(agents, recorder)['winner']
         
         # 保存回放
         if self.save_replay and visualizer and visualizer.replay_data:
@@ -200,37 +222,18 @@ class GroupTournament:
         
         advanced_agents = []
         
-        for group_idx, group in enumerate(groups, 1):
-            if verbose:
-                print(f"\n小组 {group_idx} ({len(group)} 人): {', '.join([a.name for a in group])}")
-            
-            # 小组内循环赛
-            group_tournament = Tournament(group, self.map_width, self.map_height,
-                                         save_replay=self.save_replay, replay_dir=str(self.replay_dir),
-                                         max_turns=self.max_turns)
-            
-            match_count = 0
-            total_matches = len(group) * (len(group) - 1) // 2
-            
-            for i in range(len(group)):
-                for j in range(i + 1, len(group)):
-                    match_count += 1
-                    agent1 = group[i]
-                    agent2 = group[j]
-                    
-                    match_name = f"Group{group_idx}_{agent1.name}_vs_{agent2.name}"
-                    
-                    if verbose and match_count % 10 == 0:
-                        print(f"  进度: {match_count}/{total_matches}")
-                    
-                    group_tournament.play_match([agent1, agent2], match_name=match_name, verbose=False)
-            
+        if self.workers > 1 and self.participants_dir and len(groups) > 1:
+            outcomes = self._play_groups_parallel(groups)
+        else:
+            outcomes = self._play_groups_serial(groups, verbose)
+        
+        for group_idx, (group, outcome) in enumerate(zip(groups, outcomes), 1):
             # 收集小组赛的回放
             if self.save_replay:
-                self.match_replays.extend(group_tournament.match_replays)
+                self.match_replays.extend(outcome['match_replays'])
             
             # 获取小组排名
-            rankings = group_tournament.get_rankings()
+            rankings = outcome['rankings']
             group_result = {
                 'group': group_idx,
                 'rankings': rankings
@@ -248,13 +251,54 @@ class GroupTournament:
                         break
             
             if verbose:
-                print(f"  出线: {', '.join([name for name, _ in rankings[:self.advance_per_group]])}")
+                print(f"  小组 {group_idx} 出线: {', '.join([name for name, _ in rankings[:self.advance_per_group]])}")
         
         if verbose:
             print(f"\n小组赛完成！共 {len(advanced_agents)} 人出线")
         
         return advanced_agents
     
+    def _group_settings(self) -> Dict:
+        return {'map_width': self.map_width, 'map_height': self.map_height,
+                'save_replay': self.save_replay, 'replay_dir': str(self.replay_dir),
+                'max_turns': self.max_turns, 'ruleset': self.ruleset}
+    
+    def _play_groups_serial(self, groups: List[List[Agent]], verbose: bool) -> List[Dict]:
+        """在本进程中逐组进行小组赛"""
+        outcomes = []
+        for group_idx, group in enumerate(groups, 1):
+            if verbose:
+                print(f"\n小组 {group_idx} ({len(group)} 人): {', '.join([a.name for a in group])}")
+            group_tournament, _ = _play_group_round_robin(group, group_idx, progress=self.progress,
+                                                          verbose=verbose, **self._group_settings())
+            outcomes.append({'rankings': group_tournament.get_rankings(),
+                             'match_replays': group_tournament.match_replays})
+        return outcomes
+    
+    def _play_groups_parallel(self, groups: List[List[Agent]]) -> List[Dict]:
+        """
+        多进程并行进行小组赛（各小组互不影响）
+        
+        工作进程按名称从 participants_dir 重新创建Agent；每组完成时补发该组各场比赛的进度事件，
+        结果按小组顺序返回。
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed  # 串行运行时无需加载多进程模块
+        
+        print(f"小组赛使用 {self.workers} 个工作进程")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_group_worker,
+                                 initargs=(self.participants_dir, self._group_settings())) as pool:
+            futures = {pool.submit(_play_group_in_worker, group_idx, [a.name for a in group]): group_idx
+                       for group_idx, group in enumerate(groups, 1)}
+            outcomes = {}
+            for future in as_completed(futures):
+                outcome = future.result()
+                outcomes[futures[future]] = outcome
+                if self.progress:
+                    for match in outcome['matches']:
+                        self.progress.match_finished(match['agents'], match['winner'],
+                                                     match['name'], seconds=match['seconds'])
+        return [outcomes[group_idx] for group_idx in range(1, len(groups) + 1)]
+    
     def run_elimination_stage(self, agents: List[Agent], verbose: bool = False) -> Agent:
         """
         运行淘汰赛阶段
@@ -292,50 +336,21 @@ class GroupTournament:
                     if verbose:
                         print(f"  {agent1.name} vs {agent2.name}")
                     
-                    # 重置状态
-                    agent1.reset()
-                    agent2.reset()
-                    
-                    # 创建可视化器（如果需要保存回放）
+                    # 创建回放记录器（如果需要保存回放）
                     visualizer = None
+                    recorder = None
                     if self.save_replay:
+                        from visualizer.web_visualizer import WebVisualizer
                         visualizer = WebVisualizer(self.map_width, self.map_height)
+                        recorder = ReplayRecorder(visualizer)
                     
-                    # 创建游戏引擎
-                    engine = GameEngine([agent1, agent2], self.map_width, self.map_height)
-                    
-                    # 运行游戏并记录
-                    frame_interval = 2
-                    winner = None
-                    last_state_info = None  # 保存最后一帧的状态信息
-                    while engine.state.turn < self.max_turns:
-                        state_info = engine.step()
-                        last_state_info = state_info  # 保存最后一帧
-                        
-                        if self.save_replay and visualizer:
-                            if engine.state.turn % frame_interval == 0:
-                                visualizer.record_frame(state_info)
-                        
-                        winner = engine.state.get_winner(allow_score_judge=False)
-                        if winner:
-                            if self.save_replay and visualizer:
-                                for _ in range(10):
-                                    state_info = engine.step()
-                                    visualizer.record_frame(state_info)
-                            break
-                    
-                    # 超时后按评分判定获胜者（如果还没有）
-                    if winner is None:
-                        # 确保记录最后一帧（如果还没有记录）
-                        if self.save_replay and visualizer and last_state_info:
-                            # 如果最后一帧的回合数不同，说明需要记录新帧
-                            if not visualizer.replay_data or visualizer.replay_data[-1]['turn'] != last_state_info['turn']:
-                                visualizer.record_frame(last_state_info)
-                        
-                        winner = engine.state.get_winner(allow_score_judge=True)
-                        # 如果有获胜者，更新回放数据中的获胜者信息
-                        if winner and self.save_replay and visualizer:
-                            visualizer.set_winner(winner.name)
+                    # 淘汰赛不计入积分统计
+                    names = [agent1.name, agent2.name]
+                    if self.progress:
+                        self.progress.match_started(names, match_name)
+                    winner = self.elimination_runner.run([agent1, agent2], recorder)['winner']
+                    if self.progress:
+                        self.progress.match_finished(names, winner.name if winner else None, match_name)
                     
                     # 保存回放
                     if self.save_replay and visualizer and visualizer.replay_data:
@@ -389,6 +404,11 @@ class GroupTournament:
         """
         # 创建分组
         groups = self.create_groups(shuffle=shuffle)
+        if self.progress:
+            # 小组内循环赛场数 + 淘汰赛场数（每场淘汰一人）
+            group_matches = sum(len(g) * (len(g) - 1) // 2 for g in groups)
+            advancing = sum(min(self.advance_per_group, len(g)) for g in groups)
+            self.progress.start(group_matches + max(0, advancing - 1), "分组赛")
         
         # 小组赛
         advanced_agents = self.run_group_stage(groups, verbose=verbose)
@@ -0,0 +1,86 @@
+"""
+赛事进度事件
+赛制在每场比赛开始 / 结束时通过 ProgressTracker 发出进度事件（含预计剩余时间），
+由 emit 回调转交给界面（如 GUI 通过进程队列接收），赛制本身不关心事件去向。
+
+事件均为可序列化的字典：
+    {'type': 'tournament_started', 'total', 'label'}
+    {'type': 'match_started', 'index', 'total', 'agents', 'name'}
+    {'type': 'match_finished', 'done', 'total', 'agents', 'name', 'winner', 'seconds', 'elapsed', 'eta'}
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ProgressTracker:
+    """赛事进度跟踪器"""
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], None], clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            emit: 事件回调
+            clock: 计时函数（测试时可替换）
+        """
+        self.emit = emit
+        self.clock = clock
+        self.total = 0
+        self.started = 0
+        self.done = 0
+        self._start_time: Optional[float] = None
+        self._match_start: Dict[str, float] = {}
+
+    def start(self, total: int, label: str = ""):
+        """赛事开始，total 为预计比赛场数"""
+        self.total = total
+        self.started = 0
+        self.done = 0
+        self._start_time = self.clock()
+        self._match_start.clear()
+        self.emit({'type': 'tournament_started', 'total': total, 'label': label})
+
+    def eta(self) -> Optional[float]:
+        """预计剩余秒数（按已完成比赛的平均墙钟耗时估算，并行运行时同样适用）"""
+        if not self.done or self._start_time is None:
+            return None
+        elapsed = self.clock() - self._start_time
+        return elapsed / self.done * max(0, self.total - self.done)
+
+    def match_started(self, agents: List[str], name: str = ""):
+        """一场比赛开始"""
+        if self._start_time is None:
+            self._start_time = self.clock()
+        self.started += 1
+        self._match_start[name] = self.clock()
+        self.emit({'type': 'match_started', 'index': self.started, 'total': self.total,
+                   'agents': agents, 'name': name})
+
+    def match_finished(self, agents: List[str], winner: Optional[str], name: str = "",
+                       seconds: Optional[float] = None):
+        """
+        一场比赛结束
+
+        Args:
+            agents: 参赛者名称
+            winner: 胜者名称，平局为 None
+            name: 比赛名称
+            seconds: 比赛耗时；None 表示按 match_started 的时间计算（在其他进程中运行的比赛需传入）
+        """
+        if self._start_time is None:
+            self._start_time = self.clock()
+        started = self._match_start.pop(name, None)
+        if seconds is None and started is not None:
+            seconds = self.clock() - started
+        self.done += 1
+        self.total = max(self.total, self.done)
+        self.emit({'type': 'match_finished', 'done': self.done, 'total': self.total,
+                   'agents': agents, 'name': name, 'winner': winner, 'seconds': seconds,
+                   'elapsed': self.clock() - self._start_time, 'eta': self.eta()})
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """预计剩余时间的显示文本，如 '1:05'，未知为 '--:--'"""
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
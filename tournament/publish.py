@@ -0,0 +1,163 @@
+"""
+静态排行榜发布
+把排行榜预先渲染成带版本号的 JSON 分片（前 N 名页面 + 每名选手一个文件），并同时写出
+gzip / brotli 预压缩版本，静态站点直接提供文件即可，浏览者再多也不需要运行 Python 或查询 SQLite。
+
+目录结构（output_dir 默认 data/site）：
+    latest.json                        当前版本指针（很小，不应长期缓存）
+    <版本>/leaderboard.json[.gz|.br]    前 N 名总榜、AI榜、人类榜
+    <版本>/players/<选手ID>.json[.gz|.br] 单个选手的排名与统计
+版本目录的内容不再改变，可设置长期缓存；nginx 可用 gzip_static / brotli_static 直接提供预压缩文件。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def player_shard_name(participant_id: str) -> str:
+    """选手分片文件名（只保留文件名安全的字符）"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', participant_id) + '.json'
+
+
+class LeaderboardPublisher:
+    """静态排行榜发布器"""
+
+    def __init__(self, output_dir: str = "data/site", top_n: int = 50,
+                 keep_versions: int = 3, brotli: bool = True):
+        """
+        Args:
+            output_dir: 发布目录
+            top_n: 排行榜页面包含的名次数
+            keep_versions: 保留的历史版本数（含当前版本）
+            brotli: 安装了 brotli 库时同时写出 .br 文件
+        """
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n
+        self.keep_versions = max(1, keep_versions)
+        self._brotli = None
+        if brotli:
+            try:
+                import brotli as brotli_module
+                self._brotli = brotli_module
+            except ImportError:
+                pass
+
+    def build_shards(self, rankings: Dict[str, Any],
+                     ai_vs_human: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        由排行榜生成全部分片内容
+
+        Args:
+            rankings: RankingManager.generate_daily_rankings 的结果
+            ai_vs_human: AI vs Human 统计
+
+        Returns:
+            {相对路径: JSON 对象}
+        """
+        overall = rankings.get('overall', [])
+        ai_only = rankings.get('ai_only', [])
+        human_only = rankings.get('human_only', [])
+        updated_at = rankings.get('generated_at') or datetime.now().isoformat()
+        n = self.top_n
+
+        def with_shard(rows: List[Dict]) -> List[Dict]:
+            return [dict(row, shard=f"players/{player_shard_name(row['id'])}") for row in rows[:n]]
+
+        shards: Dict[str, Any] = {
+            'leaderboard.json': {
+                'date': rankings.get('date'),
+                'updated_at': updated_at,
+                'overall': with_shard(overall),
+                'ai_leaderboard': with_shard(ai_only),
+                'human_leaderboard': with_shard(human_only),
+                'ai_vs_human': ai_vs_human or {},
+                'total_participants': len(overall),
+            }
+        }
+        category_rank = {row['id']: row['rank'] for row in ai_only + human_only}
+        for row in overall:
+            shards[f"players/{player_shard_name(row['id'])}"] = {
+                'date': rankings.get('date'),
+                'updated_at': updated_at,
+                'player': row,
+                'category_rank': category_rank.get(row['id']),
+                'total_participants': len(overall),
+            }
+        return shards
+
+    def publish(self, rankings: Dict[str, Any],
+                ai_vs_human: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        写出一个新版本并切换 latest.json
+
+        版本号由日期与全部分片内容的哈希组成，内容相同的重复发布不会重写文件。
+
+        Returns:
+            latest.json 的内容
+        """
+        shards = {path: _dumps(data) for path, data in self.build_shards(rankings, ai_vs_human).items()}
+        digest = hashlib.sha1()
+        for path in sorted(shards):
+            digest.update(path.encode('utf-8'))
+            digest.update(shards[path])
+        version = f"{rankings.get('date') or 'latest'}-{digest.hexdigest()[:10]}"
+
+        version_dir = self.output_dir / version
+        if not version_dir.exists():
+            tmp_dir = self.output_dir / f".{version}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            for path, data in shards.items():
+                self._write_shard(tmp_dir / path, data)
+            os.replace(tmp_dir, version_dir)
+
+        latest = {
+            'version': version,
+            'updated_at': rankings.get('generated_at') or datetime.now().isoformat(),
+            'leaderboard': f"{version}/leaderboard.json",
+            'players': f"{version}/players/",
+            'encodings': ['gzip'] + (['br'] if self._brotli else []),
+            'total_participants': len(rankings.get('overall', [])),
+        }
+        tmp = self.output_dir / f"latest.json.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(latest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.output_dir / "latest.json")
+
+        self._prune(version)
+        return latest
+
+    def _write_shard(self, path: Path, data: bytes):
+        """写出原始文件及其预压缩版本（gzip 固定 mtime，相同内容得到相同字节）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        path.with_name(path.name + '.gz').write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if self._brotli is not None:
+            path.with_name(path.name + '.br').write_bytes(self._brotli.compress(data))
+
+    def _prune(self, current: str):
+        """删除超出保留数量的旧版本（按修改时间，当前版本总是保留）"""
+        versions = [d for d in self.output_dir.iterdir()
+                    if d.is_dir() and not d.name.startswith('.') and d.name != current]
+        versions.sort(key=lambda d: d.stat().st_mtime, reverse=True)
+        for old in versions[self.keep_versions - 1:]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# 使用示例
+if __name__ == "__main__":
+    from tournament.ranking import RankingManager
+
+    manager = RankingManager()
+    rankings = manager.get_latest_rankings() or manager.generate_daily_rankings()
+    latest = LeaderboardPublisher().publish(rankings, manager.get_ai_vs_human_stats())
+    print(f"已发布排行榜版本 {latest['version']}（{latest['total_participants']} 名选手）")
@@ -75,6 +75,7 @@ class RankingManager:
                 'total_kills': p.get('total_kills', 0),
                 'total_deaths': p.get('total_deaths', 0),
                 'win_rate': self._calc_win_rate(p),
+                'rating': round(p['rating'], 1) if p.get('rating') is not None else None,
                 'developer_info': p.get('developer_info', '')
             })
         
@@ -128,16 +129,23 @@ class RankingManager:
         from utils.database import get_database
         db = get_database()
         
-        # 获取本周数据
-        rankings = db.get_weekly_ranking(week)
+        # 从本周累计统计计算（比赛记录时已增量累加，无需重新汇总）
+        db.update_weekly_ranks(week)
+        weekly_stats = db.get_weekly_player_stats(week)
+        if not weekly_stats:
+            # 没有累计数据时返回已保存的周榜
+            return db.get_weekly_ranking(week)
         
-        if not rankings:
-            # 如果没有本周数据，生成
-            all_participants = db.get_all_participants()
-            rankings = self._calculate_rankings(all_participants)
-            
-            # 保存到数据库
-            db.save_weekly_ranking(week, rankings)
+        rankings = self._calculate_rankings(weekly_stats)
+        
+        # 名次变化（上周名次来自上周汇总行，按主键直接查到）
+        previous = {s['id']: s['previous_rank'] for s in weekly_stats}
+        for r in rankings:
+            r['previous_rank'] = previous.get(r['id'])
+            r['rank_change'] = r['previous_rank'] - r['rank'] if r['previous_rank'] else None
+        
+        # 保存到数据库
+        db.save_weekly_ranking(week, rankings)
         
         return rankings
     
@@ -175,6 +183,17 @@ class RankingManager:
             'total_human_participants': len(human_players)
         }
     
+    def recompute_ratings(self) -> Dict[str, float]:
+        """从全部比赛记录重算等级分并写回数据库"""
+        from utils.database import get_database
+        from tournament.rating import EloRating
+        db = get_database()
+        
+        rating = EloRating()
+        ratings = rating.recompute(db.get_match_scores())
+        db.save_ratings(ratings, rating.games)
+        return ratings
+    
     def generate_leaderboard_snapshot(self) -> Dict[str, Any]:
         """生成排行榜快照（用于网页展示）"""
         rankings = self.get_latest_rankings()
@@ -0,0 +1,181 @@
+"""
+等级分系统
+基于 Elo 的增量评分（支持 2 人对战与多人混战），以及从比赛历史批量重算
+"""
+from itertools import combinations
+from typing import List, Dict, Optional
+
+
+DEFAULT_RATING = 1500.0
+
+
+def match_score(kills: int, health: int, is_win: bool) -> int:
+    """
+    单场比赛表现分（越高名次越靠前）
+
+    获胜者总是排第一，其余选手按 击杀数 × 10000 + 剩余血量 排序，与引擎超时评分一致。
+    """
+    return (1000000 if is_win else 0) + kills * 10000 + max(0, health)
+
+
+class EloRating:
+    """Elo 等级分管理器"""
+
+    def __init__(self, k_factor: float = 32.0, initial_rating: float = DEFAULT_RATING,
+                 scale: float = 400.0, provisional_games: int = 10):
+        """
+        初始化等级分管理器
+
+        Args:
+            k_factor: K 值（单场最大变化幅度）
+            initial_rating: 新选手初始等级分
+            scale: 等级分尺度（分差为 scale 时期望胜率约 91%）
+            provisional_games: 定级场次，期间 K 值加倍以便新选手更快收敛
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.scale = scale
+        self.provisional_games = provisional_games
+        self.ratings: Dict[str, float] = {}
+        self.games: Dict[str, int] = {}
+
+    def load(self, stored: Dict[str, Dict[str, float]]):
+        """从 {id: {'rating': x, 'games': n}} 载入已有等级分"""
+        for pid, row in stored.items():
+            self.ratings[pid] = row['rating']
+            self.games[pid] = row.get('games', 0)
+
+    def get_rating(self, participant_id: str) -> float:
+        """获取选手等级分（未参赛选手返回初始分）"""
+        return self.ratings.get(participant_id, self.initial_rating)
+
+    def expected_score(self, rating_a: float, rating_b: float) -> float:
+        """A 对 B 的期望得分"""
+        return 1.0 / (1.0 + 10 ** ((rating_b - rating_a) / self.scale))
+
+    def _k_for(self, participant_id: str) -> float:
+        if self.games.get(participant_id, 0) < self.provisional_games:
+            return self.k_factor * 2
+        return self.k_factor
+
+    def update_match(self, scores: Dict[str, float]) -> Dict[str, float]:
+        """
+        按一场比赛结果增量更新等级分
+
+        多人混战拆成两两对局：表现分高者记 1 分，相同记 0.5 分，
+        每名选手的变化量按对手数归一，2 人对战即为标准 Elo。
+
+        Args:
+            scores: {选手ID: 表现分}，见 match_score()
+
+        Returns:
+            {选手ID: 等级分变化量}
+        """
+        ids = list(scores)
+        if len(ids) < 2:
+            return {}
+
+        before = {pid: self.get_rating(pid) for pid in ids}
+        deltas = {}
+        for pid in ids:
+            actual = 0.0
+            expected = 0.0
+            for other in ids:
+                if other == pid:
+                    continue
+                if scores[pid] > scores[other]:
+                    actual += 1.0
+                elif scores[pid] == scores[other]:
+                    actual += 0.5
+                expected += self.expected_score(before[pid], before[other])
+            deltas[pid] = self._k_for(pid) / (len(ids) - 1) * (actual - expected)
+
+        for pid in ids:
+            self.ratings[pid] = before[pid] + deltas[pid]
+            self.games[pid] = self.games.get(pid, 0) + 1
+        return deltas
+
+    def recompute(self, history: List[Dict[str, float]], prior_games: float = 2.0,
+                  max_iterations: int = 200, tol: float = 1e-4) -> Dict[str, float]:
+        """
+        从完整比赛历史重算等级分
+
+        对全部两两对局拟合 Bradley-Terry 模型（Elo 在线更新所逼近的模型），
+        结果与比赛顺序无关。对局展开与迭代求解均为 NumPy 向量化运算。
+
+        Args:
+            history: 比赛列表，每项为 {选手ID: 表现分}
+            prior_games: 每名选手与初始分虚拟对手的虚拟对局数（一半取胜），
+                用于固定等级分零点并防止全胜/全负选手发散
+            max_iterations: 最大迭代次数
+            tol: 收敛阈值（单次迭代对数强度的最大变化）
+
+        Returns:
+            {选手ID: 等级分}，同时替换当前等级分与场次
+        """
+        import numpy as np  # 只有批量重算需要，避免每日赛事等入口启动时加载
+
+        ids = sorted({pid for scores in history for pid in scores})
+        if not ids:
+            self.ratings, self.games = {}, {}
+            return {}
+        index = {pid: i for i, pid in enumerate(ids)}
+        n = len(ids)
+
+        # 按参赛人数分组，将每组比赛展开为两两对局数组
+        by_size: Dict[int, List[Dict[str, float]]] = {}
+        for scores in history:
+            if len(scores) >= 2:
+                by_size.setdefault(len(scores), []).append(scores)
+
+        first, second, outcome = [], [], []
+        games = np.zeros(n)
+        for size, matches in by_size.items():
+            players = np.array([[index[pid] for pid in m] for m in matches])
+            values = np.array([list(m.values()) for m in matches], dtype=float)
+            games += np.bincount(players.ravel(), minlength=n)
+            for x, y in combinations(range(size), 2):
+                first.append(players[:, x])
+                second.append(players[:, y])
+                outcome.append(np.sign(values[:, x] - values[:, y]) * 0.5 + 0.5)
+
+        if first:
+            a = np.concatenate(first)
+            b = np.concatenate(second)
+            s = np.concatenate(outcome)
+        else:
+            a = b = np.zeros(0, dtype=int)
+            s = np.zeros(0)
+
+        # 对数强度上的对角牛顿迭代（收敛远快于经典 MM 迭代），以当前等级分作为初值
+        theta = np.array([self.get_rating(pid) - self.initial_rating for pid in ids])
+        theta *= np.log(10) / self.scale
+        for _ in range(max_iterations):
+            p = 1.0 / (1.0 + np.exp(theta[b] - theta[a]))
+            prior_p = 1.0 / (1.0 + np.exp(-theta))
+            grad = (np.bincount(a, weights=s - p, minlength=n)
+                    - np.bincount(b, weights=s - p, minlength=n)
+                    + prior_games * (0.5 - prior_p))
+            pq = p * (1.0 - p)
+            hess = (np.bincount(a, weights=pq, minlength=n)
+                    + np.bincount(b, weights=pq, minlength=n)
+                    + prior_games * prior_p * (1.0 - prior_p))
+            step = grad / hess
+            theta += step
+            if np.max(np.abs(step)) < tol:
+                break
+
+        values = self.initial_rating + self.scale * theta / np.log(10)
+        self.ratings = {pid: float(values[i]) for i, pid in enumerate(ids)}
+        self.games = {pid: int(games[i]) for i, pid in enumerate(ids)}
+        return dict(self.ratings)
+
+    def get_leaderboard(self, limit: Optional[int] = None) -> List[Dict]:
+        """按等级分排序的榜单"""
+        ordered = sorted(self.ratings.items(), key=lambda kv: kv[1], reverse=True)
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [
+            {'rank': rank, 'id': pid, 'rating': round(rating, 1), 'games': self.games.get(pid, 0)}
+            for rank, (pid, rating) in enumerate(ordered, 1)
+        ]
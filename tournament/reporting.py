@@ -35,13 +35,18 @@ class DailyReportGenerator:
         with open(schedule_file, 'r', encoding='utf-8') as f:
             schedule = json.load(f)
         
-        # 加载选手数据
-        from utils.participant_manager import ParticipantManager
-        pm = ParticipantManager()
-        participants = {p['id']: p for p in pm.load_from_data_file()}
-        
-        # 生成统计
-        stats = self._calculate_stats(schedule, participants)
+        # 生成统计：优先读取比赛记录时增量累加的每日汇总
+        from utils.database import get_database
+        summary = get_database().get_daily_summary(date)
+        participants = {}
+        if summary:
+            stats = self._summary_to_stats(summary)
+        else:
+            # 无汇总数据（模拟模式或旧数据）时从赛程与选手文件统计
+            from utils.participant_manager import ParticipantManager
+            pm = ParticipantManager()
+            participants = {p["id"]: p for p in pm.load_participants()}
+            stats = self._calculate_stats(schedule, participants)
         
         # 获取排行榜
         from tournament.ranking import RankingManager
@@ -65,6 +70,27 @@ class DailyReportGenerator:
         
         return report
     
+    def _summary_to_stats(self, summary: Dict) -> Dict[str, Any]:
+        """将数据库每日汇总行转换为报告统计"""
+        ai_wins = summary['ai_wins']
+        human_wins = summary['human_wins']
+        total_wins = ai_wins + human_wins
+        if total_wins > 0:
+            ai_win_rate = round(ai_wins / total_wins * 100, 1)
+            human_win_rate = round(human_wins / total_wins * 100, 1)
+        else:
+            ai_win_rate = human_win_rate = 50.0
+        
+        return {
+            'total_matches': summary['total_matches'],
+            'completed': summary['completed'],
+            'errors': summary['errors'],
+            'ai_wins': ai_wins,
+            'human_wins': human_wins,
+            'ai_win_rate': ai_win_rate,
+            'human_win_rate': human_win_rate
+        }
+    
     def _calculate_stats(self, schedule: List[Dict], participants: Dict) -> Dict[str, Any]:
         """计算统计数据"""
         total = len(schedule)
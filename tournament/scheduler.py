@@ -2,19 +2,116 @@
 赛程生成器
 为每日赛事生成比赛安排
 """
+import bisect
 import random
 import math
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Iterable
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from tournament.rating import DEFAULT_RATING
+
+
+class RatingIndex:
+    """
+    按积分排序的选手索引
+    
+    选手按 (积分, ID) 排序存放在静态数组中；移除选手时只更新并查集式的
+    "相邻存活位置"指针，因此最近积分查找为二分定位 + 均摊近似 O(1) 的跳过，
+    随机抽取存活选手为 O(1)。
+    """
+    
+    def __init__(self, points: Dict[str, float]):
+        order = sorted(points.items(), key=lambda kv: (kv[1], kv[0]))
+        self._ids = [pid for pid, _ in order]
+        self._points = [pts for _, pts in order]
+        self._pos = {pid: i for i, pid in enumerate(self._ids)}
+        n = len(order)
+        # _next[i]: >= i 的第一个存活位置（n 为哨兵）
+        # _prev[i + 1] - 1: <= i 的最后一个存活位置（-1 为哨兵）
+        self._next = list(range(n + 1))
+        self._prev = list(range(n + 1))
+        # 存活成员列表，删除时与末尾交换，支持 O(1) 随机抽取
+        self._members = list(self._ids)
+        self._member_pos = dict(self._pos)
+    
+    def __len__(self) -> int:
+        return len(self._members)
+    
+    def __contains__(self, participant_id: str) -> bool:
+        return participant_id in self._member_pos
+    
+    @staticmethod
+    def _find(parent: List[int], i: int) -> int:
+        """查找根节点并压缩路径"""
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+    
+    def _next_alive(self, i: int) -> int:
+        return self._find(self._next, i)
+    
+    def _prev_alive(self, i: int) -> int:
+        return self._find(self._prev, i + 1) - 1
+    
+    def remove(self, participant_id: str):
+        """移除选手（例如当天比赛场次已满）"""
+        if participant_id not in self._member_pos:
+            return
+        i = self._pos[participant_id]
+        self._next[i] = i + 1
+        self._prev[i + 1] = i
+        
+        slot = self._member_pos.pop(participant_id)
+        last = self._members.pop()
+        if last != participant_id:
+            self._members[slot] = last
+            self._member_pos[last] = slot
+    
+    def random_member(self) -> str:
+        """均匀随机抽取一名存活选手"""
+        return self._members[random.randrange(len(self._members))]
+    
+    def nearest(self, ref_points: float, k: int, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        查找积分最接近 ref_points 的 k 名存活选手
+        
+        Args:
+            ref_points: 参考积分
+            k: 返回人数
+            exclude: 需要跳过的选手ID
+            
+        Returns:
+            按积分差从小到大排列的选手ID列表
+        """
+        exclude = set(exclude)
+        n = len(self._ids)
+        i = bisect.bisect_left(self._points, ref_points)
+        lo = self._prev_alive(i - 1)
+        hi = self._next_alive(i)
+        
+        result = []
+        while len(result) < k and (lo >= 0 or hi < n):
+            if hi >= n or (lo >= 0 and ref_points - self._points[lo] <= self._points[hi] - ref_points):
+                idx, lo = lo, self._prev_alive(lo - 1)
+            else:
+                idx, hi = hi, self._next_alive(hi + 1)
+            pid = self._ids[idx]
+            if pid not in exclude:
+                result.append(pid)
+        return result
+
 
 class MatchScheduler:
     """赛程生成器"""
     
     def __init__(self, participants: List[Dict[str, Any]], 
                  matches_per_day: int = 5,
-                 players_per_match: int = 4):
+                 players_per_match: int = 4,
+                 ratings: Optional[Dict[str, float]] = None):
         """
         初始化赛程生成器
         
@@ -22,10 +119,17 @@ class MatchScheduler:
             participants: 选手列表
             matches_per_day: 每个选手每天比赛场数
             players_per_match: 每场比赛参赛人数
+            ratings: 选手等级分 {id: rating}，提供时按等级分而非总积分匹配对手
         """
         self.participants = participants
         self.matches_per_day = matches_per_day
         self.players_per_match = players_per_match
+        # 匹配依据：有等级分时使用等级分（未定级选手取初始分），否则使用总积分
+        if ratings is not None:
+            self._points = {p['id']: ratings.get(p['id'], DEFAULT_RATING) for p in participants}
+        else:
+            self._points = {p['id']: p.get('stats', {}).get('total_points', 0) for p in participants}
+        self._full_index: Optional[RatingIndex] = None
         
         # 按积分分组
         self._group_by_points()
@@ -55,13 +159,15 @@ class MatchScheduler:
         
         # 确保每个选手都有足够的比赛
         player_match_count = {p['id']: 0 for p in self.participants}
+        # 当天场次未满的选手
+        available = RatingIndex(self._points)
         
         # 计算总场次
         total_matches = (len(self.participants) * self.matches_per_day) // self.players_per_match
         
         for _ in range(total_matches):
             # 选择参赛选手
-            selected = self._select_players_for_match(player_match_count)
+            selected = self._select_players_for_match(player_match_count, available)
             
             if selected and len(selected) == self.players_per_match:
                 schedule.append({
@@ -72,51 +178,64 @@ class MatchScheduler:
                 })
                 match_index += 1
                 
-                # 更新计数器
+                # 更新计数器，场次已满的选手移出可选索引
                 for pid in selected:
                     player_match_count[pid] += 1
+                    if player_match_count[pid] >= self.matches_per_day:
+                        available.remove(pid)
         
         return schedule
     
-    def _select_players_for_match(self, player_match_count: Dict[str, int]) -> List[str]:
-        """为一场比赛选择选手"""
-        available = []
+    def _select_players_for_match(self, player_match_count: Dict[str, int],
+                                  available: Optional[RatingIndex] = None) -> List[str]:
+        """
+        为一场比赛选择选手
         
-        for p in self.participants:
-            pid = p['id']
-            if player_match_count[pid] < self.matches_per_day:
-                available.append(pid)
+        Args:
+            player_match_count: 选手当天已安排场次
+            available: 场次未满选手的积分索引，None 时根据 player_match_count 重建
+        """
+        if available is None:
+            available = RatingIndex({
+                pid: self._get_points(pid) for pid, count in player_match_count.items()
+                if count < self.matches_per_day
+            })
         
+        # 可选人数不足时，允许所有选手参赛
         if len(available) < self.players_per_match:
-            available = list(player_match_count.keys())
+            available = self._get_full_index()
         
         # 同积分段匹配策略
-        if available:
+        if len(available):
             # 优先选择积分接近的选手
-            candidates = available[:]
-            selected = [candidates.pop(random.randrange(len(candidates)))]
+            selected = [available.random_member()]
+            total_points = self._get_points(selected[0])
             
-            while len(selected) < self.players_per_match and candidates:
+            while len(selected) < self.players_per_match:
                 # 找与已选选手积分最接近的
-                ref_points = self._get_avg_points(selected)
-                candidates.sort(key=lambda x: abs(self._get_points(x) - ref_points))
+                ref_points = total_points / len(selected)
+                top_candidates = available.nearest(ref_points, 3, exclude=selected)
+                if not top_candidates:
+                    break
                 
                 # 从接近的候选中随机选
-                top_candidates = candidates[:min(3, len(candidates))]
                 chosen = random.choice(top_candidates)
                 selected.append(chosen)
-                candidates.remove(chosen)
+                total_points += self._get_points(chosen)
             
             return selected
         
         return []
     
+    def _get_full_index(self) -> RatingIndex:
+        """包含全部选手的积分索引（只读，按需构建一次）"""
+        if self._full_index is None:
+            self._full_index = RatingIndex(self._points)
+        return self._full_index
+    
     def _get_points(self, participant_id: str) -> int:
         """获取选手积分"""
-        for p in self.participants:
-            if p['id'] == participant_id:
-                return p.get('stats', {}).get('total_points', 0)
-        return 0
+        return self._points.get(participant_id, 0)
     
     def _get_avg_points(self, participant_ids: List[str]) -> float:
         """计算选手列表的平均积分"""
@@ -1,19 +1,20 @@
 """
 比赛系统实现（支持回放）
 """
+import math
 import random
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
-from game.engine import GameEngine
 from game.agent import Agent
-from visualizer.web_visualizer import WebVisualizer
+from game.match_runner import MatchRunner, ReplayRecorder, results_table_sink
 
 
 class Tournament:
     """比赛基类（支持回放）"""
     
     def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100,
-                 save_replay: bool = True, replay_dir: str = "replays", max_turns: int = 500):
+                 save_replay: bool = True, replay_dir: str = "replays", max_turns: int = 500,
+                 ruleset=None, progress=None, seed: Optional[int] = None):
         self.agents = agents
         self.map_width = map_width
         self.map_height = map_height
@@ -34,68 +35,41 @@ class Tournament:
                 'deaths': 0,
                 'points': 0
             }
+        
+        # progress: 进度跟踪器（见 tournament.progress），None 表示不发出进度事件
+        self.progress = progress
+        
+        # seed: 随机种子，固定后每场比赛的种子由它依次派生，比赛结果可复现；None 表示不固定
+        self.seed = seed
+        self._match_rng = random.Random(seed) if seed is not None else None
+        
+        # ruleset: 规则集（见 game.ruleset），None 表示默认规则
+        self.runner = MatchRunner(map_width, map_height, max_turns=max_turns,
+                                  stats_sinks=[results_table_sink(self.results)],
+                                  ruleset=ruleset)
     
     def play_match(self, agents: List[Agent], match_name: str = "", verbose: bool = False) -> Optional[Agent]:
         """进行一场比赛并记录回放"""
-        # 重置所有Agent状态
-        for agent in agents:
-            agent.reset()
-        
-        # 创建可视化器（如果需要保存回放）
+        # 创建回放记录器（如果需要保存回放）
         visualizer = None
+        recorder = None
         if self.save_replay:
+            from visualizer.web_visualizer import WebVisualizer  # 只有生成回放时需要
             visualizer = WebVisualizer(self.map_width, self.map_height)
+            recorder = ReplayRecorder(visualizer)
         
-        # 创建游戏引擎
-        engine = GameEngine(agents, self.map_width, self.map_height)
-        
-        # 运行游戏并记录
-        frame_interval = 2  # 每2回合记录一帧
-        winner = None
-        last_state_info = None  # 保存最后一帧的状态信息
-        while engine.state.turn < self.max_turns:
-            state_info = engine.step()
-            last_state_info = state_info  # 保存最后一帧
-            
-            # 记录帧
-            if self.save_replay and visualizer:
-                if engine.state.turn % frame_interval == 0:
-                    visualizer.record_frame(state_info)
-            
-            # 检查是否有获胜者（只允许在只剩一个存活者时判定）
-            winner = engine.state.get_winner(allow_score_judge=False)
-            if winner:
-                # 记录最后几帧
-                if self.save_replay and visualizer:
-                    for _ in range(10):
-                        state_info = engine.step()
-                        visualizer.record_frame(state_info)
-                break
-        
-        # 超时后按评分判定获胜者（如果还没有）
-        if winner is None:
-            # 确保记录最后一帧（如果还没有记录）
-            if self.save_replay and visualizer and last_state_info:
-                # 如果最后一帧的回合数不同，说明需要记录新帧
-                if not visualizer.replay_data or visualizer.replay_data[-1]['turn'] != last_state_info['turn']:
-                    visualizer.record_frame(last_state_info)
-            
-            winner = engine.state.get_winner(allow_score_judge=True)
-            # 如果有获胜者，更新回放数据中的获胜者信息
-            if winner and self.save_replay and visualizer:
-                visualizer.set_winner(winner.name)
-        
-        # 更新统计
-        for agent in agents:
-            stats = self.results[agent.name]
-            stats['kills'] += agent.kills
-            stats['deaths'] += agent.deaths
-            
-            if winner and agent == winner:
-                stats['wins'] += 1
-                stats['points'] += 3
-            else:
-                stats['losses'] += 1
+        # 运行比赛（统计由 results_table_sink 更新）
+        names = [a.name for a in agents]
+        if self.progress:
+            self.progress.match_started(names, match_name)
+        seed = None
+        if self._match_rng is not None:
+            # 与每日赛相同：同一种子既重置全局 random（Agent 策略使用）也作为引擎随机源
+            seed = self._match_rng.randrange(2 ** 31)
+            random.seed(seed)
+        winner = self.runner.run(agents, recorder, seed=seed)['winner']
+        if self.progress:
+            self.progress.match_finished(names, winner.name if winner else None, match_name)
         
         # 保存回放
         if self.save_replay and visualizer and visualizer.replay_data:
@@ -173,6 +147,8 @@ class RoundRobinTournament(Tournament):
         
         match_count = 0
         total_matches = len(self.agents) * (len(self.agents) - 1) // 2
+        if self.progress:
+            self.progress.start(total_matches, "循环赛")
         
         for i in range(len(self.agents)):
             for j in range(i + 1, len(self.agents)):
@@ -199,12 +175,176 @@ class RoundRobinTournament(Tournament):
         return self.get_rankings()
 
 
+class AdaptiveRoundRobinTournament(Tournament):
+    """
+    自适应循环赛 - 按批次对战，统计上已分出胜负的对阵提前停止，
+    剩余比赛预算优先分配给最胶着（最不确定）的对阵
+    """
+    
+    def __init__(self, agents: List[Agent], batch_size: int = 4, min_matches_per_pair: int = 4,
+                 max_matches_per_pair: int = 40, match_budget: Optional[int] = None,
+                 z: float = 1.96, **kwargs):
+        """
+        初始化自适应循环赛
+        
+        Args:
+            agents: 参赛Agent列表
+            batch_size: 每次为一个对阵安排的比赛场数
+            min_matches_per_pair: 每个对阵至少进行的场数
+            max_matches_per_pair: 每个对阵最多进行的场数
+            match_budget: 比赛总场数预算（默认 对阵数 × max_matches_per_pair）
+            z: 置信区间的 z 值（1.96 对应 95% 置信度）
+            **kwargs: 传给 Tournament 的其他参数（地图大小、回放、最大回合数、随机种子等）
+        """
+        if min_matches_per_pair < 1:
+            raise ValueError(f"min_matches_per_pair 至少为 1，当前为 {min_matches_per_pair}")
+        super().__init__(agents, **kwargs)
+        self.batch_size = batch_size
+        self.min_matches_per_pair = min_matches_per_pair
+        self.max_matches_per_pair = max_matches_per_pair
+        self.match_budget = match_budget
+        self.z = z
+        # {(name_a, name_b): {'wins_a': X, 'wins_b': Y, 'draws': Z}}
+        self.pair_stats: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for i in range(len(agents)):
+            for j in range(i + 1, len(agents)):
+                self.pair_stats[(agents[i].name, agents[j].name)] = {
+                    'wins_a': 0, 'wins_b': 0, 'draws': 0
+                }
+        for stats in self.results.values():
+            stats['pair_score'] = 0.0
+    
+    def _pair_games(self, key: Tuple[str, str]) -> int:
+        stats = self.pair_stats[key]
+        return stats['wins_a'] + stats['wins_b'] + stats['draws']
+    
+    def _pair_win_rate(self, key: Tuple[str, str]) -> float:
+        """对阵中前者的胜率（平局记半场）"""
+        n = self._pair_games(key)
+        if n == 0:
+            return 0.5
+        stats = self.pair_stats[key]
+        return (stats['wins_a'] + 0.5 * stats['draws']) / n
+    
+    def pair_confidence_interval(self, key: Tuple[str, str]) -> Tuple[float, float]:
+        """对阵中前者胜率的 Wilson 置信区间"""
+        n = self._pair_games(key)
+        if n == 0:
+            return (0.0, 1.0)
+        p = self._pair_win_rate(key)
+        z2 = self.z * self.z
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        half = self.z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return (center - half, center + half)
+    
+    def _is_settled(self, key: Tuple[str, str]) -> bool:
+        """置信区间不含 50%（已分出强弱）或已达到场数上限"""
+        n = self._pair_games(key)
+        if n >= self.max_matches_per_pair:
+            return True
+        if n < self.min_matches_per_pair:
+            return False
+        low, high = self.pair_confidence_interval(key)
+        return low > 0.5 or high < 0.5
+    
+    def _uncertainty(self, key: Tuple[str, str]) -> float:
+        """胜率偏离 50% 的标准误倍数（越小越不确定）"""
+        n = self._pair_games(key)
+        p = self._pair_win_rate(key)
+        se = math.sqrt(max(p * (1 - p), 0.25 / n) / n)
+        return abs(p - 0.5) / se
+    
+    def _play_pair(self, key: Tuple[str, str], count: int, agent_map: Dict[str, Agent], verbose: bool):
+        name_a, name_b = key
+        stats = self.pair_stats[key]
+        for _ in range(count):
+            match_name = f"{name_a}_vs_{name_b}_{self._pair_games(key) + 1}"
+            winner = self.play_match([agent_map[name_a], agent_map[name_b]],
+                                     match_name=match_name, verbose=verbose)
+            if winner is None:
+                stats['draws'] += 1
+            elif winner.name == name_a:
+                stats['wins_a'] += 1
+            else:
+                stats['wins_b'] += 1
+    
+    def run(self, verbose: bool = False):
+        """运行自适应循环赛"""
+        agent_map = {a.name: a for a in self.agents}
+        pairs = list(self.pair_stats.keys())
+        budget = self.match_budget or len(pairs) * self.max_matches_per_pair
+        print(f"\n开始自适应循环赛，共 {len(self.agents)} 名参赛者，{len(pairs)} 个对阵")
+        print(f"比赛预算 {budget} 场（每个对阵 {self.min_matches_per_pair}~{self.max_matches_per_pair} 场）\n")
+        if self.progress:
+            self.progress.start(budget, "自适应循环赛")  # 对阵提前分出胜负时实际场数更少
+        
+        played = 0
+        round_num = 0
+        while played < budget:
+            # 未达最少场数的对阵优先；其余按不确定度排序，只为较不确定的一半加赛
+            pending = [k for k in pairs if not self._is_settled(k)]
+            if not pending:
+                break
+            warmup = [k for k in pending if self._pair_games(k) < self.min_matches_per_pair]
+            if warmup:
+                selected = warmup
+            else:
+                pending.sort(key=self._uncertainty)
+                selected = pending[:max(1, (len(pending) + 1) // 2)]
+            
+            round_num += 1
+            if verbose:
+                print(f"第 {round_num} 批: {len(selected)} 个对阵待定（已赛 {played}/{budget} 场）")
+            
+            for key in selected:
+                count = min(self.batch_size,
+                            self.max_matches_per_pair - self._pair_games(key),
+                            budget - played)
+                if count <= 0:
+                    break
+                self._play_pair(key, count, agent_map, verbose=False)
+                played += count
+        
+        self._update_pair_scores()
+        settled = sum(1 for k in pairs if self._is_settled(k)
+                      and self._pair_games(k) < self.max_matches_per_pair)
+        print(f"\n共进行 {played} 场比赛（固定赛制需 {len(pairs) * self.max_matches_per_pair} 场），"
+              f"{settled}/{len(pairs)} 个对阵提前分出胜负")
+        
+        self.print_results()
+        
+        # 保存所有回放
+        if self.save_replay:
+            self.save_all_replays()
+        
+        return self.get_rankings()
+    
+    def _update_pair_scores(self):
+        """对阵得分：对每个对手的胜率之和（不受各对阵场数不同的影响）"""
+        for stats in self.results.values():
+            stats['pair_score'] = 0.0
+        for key in self.pair_stats:
+            p = self._pair_win_rate(key)
+            self.results[key[0]]['pair_score'] += p
+            self.results[key[1]]['pair_score'] += 1 - p
+    
+    def get_rankings(self) -> List[Tuple[str, Dict[str, int]]]:
+        """获取排名（按对阵得分，其次积分与净击杀）"""
+        return sorted(
+            self.results.items(),
+            key=lambda x: (x[1]['pair_score'], x[1]['points'], x[1]['kills'] - x[1]['deaths']),
+            reverse=True
+        )
+
+
 class EliminationTournament(Tournament):
     """淘汰赛 - 单败淘汰制"""
     
     def run(self, verbose: bool = False):
         """运行淘汰赛"""
         print(f"\n开始淘汰赛，共 {len(self.agents)} 名参赛者\n")
+        if self.progress:
+            self.progress.start(len(self.agents) - 1, "淘汰赛")  # 每场淘汰一人
         
         # 随机打乱顺序
         participants = self.agents.copy()
@@ -5,16 +5,15 @@ import random
 import os
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
-from game.engine import GameEngine
 from game.agent import Agent
-from visualizer.web_visualizer import WebVisualizer
+from game.match_runner import MatchRunner, ReplayRecorder, results_table_sink
 
 
 class TournamentWithReplay:
     """支持回放的比赛系统"""
     
     def __init__(self, agents: List[Agent], map_width: int = 100, map_height: int = 100,
-                 save_replay: bool = True, replay_dir: str = "replays"):
+                 save_replay: bool = True, replay_dir: str = "replays", ruleset=None):
         self.agents = agents
         self.map_width = map_width
         self.map_height = map_height
@@ -34,68 +33,24 @@ class TournamentWithReplay:
                 'deaths': 0,
                 'points': 0
             }
+        
+        # ruleset: 规则集（见 game.ruleset），None 表示默认规则
+        self.runner = MatchRunner(map_width, map_height, max_turns=500,
+                                  stats_sinks=[results_table_sink(self.results)],
+                                  ruleset=ruleset)
     
     def play_match(self, agents: List[Agent], match_name: str = "", verbose: bool = False) -> Optional[Agent]:
         """进行一场比赛并记录回放"""
-        # 重置所有Agent状态
-        for agent in agents:
-            agent.reset()
-        
-        # 创建可视化器（如果需要保存回放）
+        # 创建回放记录器（如果需要保存回放）
         visualizer = None
+        recorder = None
         if self.save_replay:
+            from visualizer.web_visualizer import WebVisualizer  # 只有生成回放时需要
             visualizer = WebVisualizer(self.map_width, self.map_height)
+            recorder = ReplayRecorder(visualizer)
         
-        # 创建游戏引擎
-        engine = GameEngine(agents, self.map_width, self.map_height)
-        
-        # 运行游戏并记录
-        frame_interval = 2  # 每2回合记录一帧
-        winner = None
-        last_state_info = None  # 保存最后一帧的状态信息
-        while engine.state.turn < 500:
-            state_info = engine.step()
-            last_state_info = state_info  # 保存最后一帧
-            
-            # 记录帧
-            if self.save_replay and visualizer:
-                if engine.state.turn % frame_interval == 0:
-                    visualizer.record_frame(state_info)
-            
-            # 检查是否有获胜者（只允许在只剩一个存活者时判定）
-            winner = engine.state.get_winner(allow_score_judge=False)
-            if winner:
-                # 记录最后几帧
-                if self.save_replay and visualizer:
-                    for _ in range(10):
-                        state_info = engine.step()
-                        visualizer.record_frame(state_info)
-                break
-        
-        # 超时后按评分判定获胜者（如果还没有）
-        if winner is None:
-            # 确保记录最后一帧（如果还没有记录）
-            if self.save_replay and visualizer and last_state_info:
-                # 如果最后一帧的回合数不同，说明需要记录新帧
-                if not visualizer.replay_data or visualizer.replay_data[-1]['turn'] != last_state_info['turn']:
-                    visualizer.record_frame(last_state_info)
-            
-            winner = engine.state.get_winner(allow_score_judge=True)
-            # 如果有获胜者，更新回放数据中的获胜者信息
-            if winner and self.save_replay and visualizer:
-                visualizer.set_winner(winner.name)
-        
-        # 更新统计
-        for agent in agents:
-            stats = self.results[agent.name]
-            stats['kills'] += agent.kills
-            stats['deaths'] += agent.deaths
-            
-            if winner and agent == winner:
-                stats['wins'] += 1
-                stats['points'] += 3
-            else:
-                stats['losses'] += 1
+        # 运行比赛（统计由 results_table_sink 更新）
+        winner = self.runner.run(agents, recorder)['winner']
         
         # 保存回放
         if self.save_replay and visualizer and visualizer.replay_data:
@@ -4,9 +4,8 @@
 """
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 
 class WeeklyReportGenerator:
@@ -14,7 +13,6 @@ class WeeklyReportGenerator:
     
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
-        self.daily_dir = self.data_dir / "daily"
         self.reports_dir = Path("reports/generated")
         self.reports_dir.mkdir(parents=True, exist_ok=True)
     
@@ -36,8 +34,7 @@ class WeeklyReportGenerator:
         year, week_num = int(year), int(week_num)
         
         # 计算该周的周一
-        jan4 = datetime(year, 1, 4)  # 1月4日总是在第1周
-        start_date = jan4 + timedelta(weeks=week_num - 1, weekday=0)
+        start_date = datetime.fromisocalendar(year, week_num, 1)
         end_date = start_date + timedelta(days=6)
         
         return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
@@ -48,92 +45,56 @@ class WeeklyReportGenerator:
         year, week_num, _ = today.isocalendar()
         return f"{year}-W{week_num:02d}"
     
-    def _get_all_daily_reports(self, start_date: str, end_date: str) -> List[Dict]:
-        """获取日期范围内的所有日报"""
-        reports = []
-        current = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+    def _aggregate_stats(self, week: str) -> Optional[Dict[str, Any]]:
+        """从数据库的每周汇总行读取统计数据（比赛记录时已增量累加）"""
+        from utils.database import get_database
+        db = get_database()
         
-        while current <= end:
-            date_str = current.strftime('%Y-%m-%d')
-            report_file = self.daily_dir / date_str / "report.json"
-            
-            if report_file.exists():
-                with open(report_file, 'r', encoding='utf-8') as f:
-                    reports.append(json.load(f))
-            
-            current += timedelta(days=1)
-        
-        return reports
-    
-    def _aggregate_stats(self, daily_reports: List[Dict]) -> Dict[str, Any]:
-        """汇总统计数据"""
-        total_matches = 0
-        completed_matches = 0
-        ai_wins = 0
-        human_wins = 0
-        
-        player_stats = defaultdict(lambda: {
-            'matches': 0, 'wins': 0, 'kills': 0, 'points': 0
-        })
-        
-        for report in daily_reports:
-            stats = report.get('stats', {})
-            total_matches += stats.get('total_matches', 0)
-            completed_matches += stats.get('completed', 0)
-            ai_wins += stats.get('ai_wins', 0)
-            human_wins += stats.get('human_wins', 0)
-            
-            # 汇总选手数据
-            rankings = report.get('rankings', {}).get('overall', [])
-            for p in rankings:
-                pid = p.get('id')
-                if pid:
-                    player_stats[pid]['matches'] += p.get('total_matches', 0)
-                    player_stats[pid]['wins'] += p.get('total_wins', 0)
-                    player_stats[pid]['kills'] += p.get('total_kills', 0)
-                    player_stats[pid]['points'] += p.get('total_points', 0)
+        summary = db.get_weekly_summary(week)
+        if not summary:
+            return None
         
+        ai_wins = summary['ai_wins']
+        human_wins = summary['human_wins']
         total_wins = ai_wins + human_wins
         
         return {
-            'total_matches': total_matches,
-            'completed_matches': completed_matches,
+            'total_matches': summary['total_matches'],
+            'completed_matches': summary['completed'],
             'ai_wins': ai_wins,
             'human_wins': human_wins,
             'ai_win_rate': round(ai_wins / total_wins * 100, 1) if total_wins > 0 else 50.0,
             'human_win_rate': round(human_wins / total_wins * 100, 1) if total_wins > 0 else 50.0,
-            'player_stats': dict(player_stats)
+            'player_stats': db.get_weekly_player_stats(week)
         }
     
-    def _calculate_weekly_rankings(self, player_stats: Dict) -> List[Dict]:
-        """计算周排行"""
-        # 获取选手元数据
-        from utils.participant_manager import ParticipantManager
-        pm = ParticipantManager()
-        participants = {p['id']: p for p in pm.load_from_data_file()}
-        
+    def _calculate_weekly_rankings(self, player_stats: List[Dict]) -> List[Dict]:
+        """计算周排行（player_stats 已附带选手元数据并按周积分排序）"""
         rankings = []
-        for pid, stats in player_stats.items():
-            p = participants.get(pid, {})
+        for p in player_stats:
+            matches = p['total_matches']
+            previous_rank = p.get('previous_rank')
             rankings.append({
-                'id': pid,
-                'name': p.get('name', pid),
-                'display_name': p.get('display_name', p.get('name', pid)),
-                'type': p.get('type', 'ai'),
-                'weekly_points': stats['points'],
-                'weekly_matches': stats['matches'],
-                'weekly_wins': stats['wins'],
-                'weekly_kills': stats['kills'],
-                'win_rate': round(stats['wins'] / stats['matches'] * 100, 1) if stats['matches'] > 0 else 0
+                'id': p['id'],
+                'name': p['name'],
+                'display_name': p.get('display_name') or p['name'],
+                'type': p['type'],
+                'weekly_points': p['total_points'],
+                'weekly_matches': matches,
+                'weekly_wins': p['total_wins'],
+                'weekly_kills': p['total_kills'],
+                'win_rate': round(p['total_wins'] / matches * 100, 1) if matches > 0 else 0,
+                'point_change': p['total_points'] - (p.get('previous_points') or 0),
+                'previous_rank': previous_rank
             })
         
         # 按周积分排序
         rankings.sort(key=lambda x: x['weekly_points'], reverse=True)
         
-        # 添加排名
+        # 添加排名与名次变化（上周未参赛为 None）
         for i, r in enumerate(rankings):
             r['rank'] = i + 1
+            r['rank_change'] = r['previous_rank'] - r['rank'] if r['previous_rank'] else None
         
         return rankings
     
@@ -153,10 +114,10 @@ class WeeklyReportGenerator:
         # 获取周日期范围
         start_date, end_date = self.get_week_range(week)
         
-        # 获取本周所有日报
-        daily_reports = self._get_all_daily_reports(start_date, end_date)
+        # 读取本周汇总
+        aggregated = self._aggregate_stats(week)
         
-        if not daily_reports:
+        if not aggregated:
             return {
                 'week': week,
                 'error': f"No data found for week {week}",
@@ -164,14 +125,11 @@ class WeeklyReportGenerator:
                 'end_date': end_date
             }
         
-        # 汇总统计
-        aggregated = self._aggregate_stats(daily_reports)
-        
         # 计算周排行
         weekly_rankings = self._calculate_weekly_rankings(aggregated['player_stats'])
         
         # 获取进步最大的选手（与上周相比）
-        improved_players = self._get_most_improved(weekly_rankings)
+        improved_players = self._get_most_improved(week, weekly_rankings)
         
         report = {
             'week': week,
@@ -199,10 +157,23 @@ class WeeklyReportGenerator:
         
         return report
     
-    def _get_most_improved(self, weekly_rankings: List[Dict]) -> List[Dict]:
-        """获取进步最大的选手"""
-        # 简化版本：取周榜前10中胜率提升的
-        return weekly_rankings[:3]
+    def _get_most_improved(self, week: str, weekly_rankings: List[Dict]) -> List[Dict]:
+        """获取周积分比上周提升最多的3名选手（由数据库的周汇总行直接查询）"""
+        from utils.database import get_database
+        by_id = {r['id']: r for r in weekly_rankings}
+        return [by_id[p['id']] for p in get_database().get_most_improved(week, limit=3) if p['id'] in by_id]
+    
+    @staticmethod
+    def _format_rank_change(player: Dict) -> str:
+        """名次变化标记：↑2 / ↓1 / - / 新"""
+        change = player.get('rank_change')
+        if change is None:
+            return "新"
+        if change > 0:
+            return f"↑{change}"
+        if change < 0:
+            return f"↓{-change}"
+        return "-"
     
     def _generate_markdown(self, report: Dict) -> str:
         """生成 Markdown 格式周报"""
@@ -225,13 +196,13 @@ class WeeklyReportGenerator:
 
 ## 🏆 本周积分榜 TOP 20
 
-| 排名 | 选手 | 类型 | 周积分 | 场次 | 胜率 | 击杀 |
-|------|------|------|--------|------|------|------|
+| 排名 | 变化 | 选手 | 类型 | 周积分 | 场次 | 胜率 | 击杀 |
+|------|------|------|------|--------|------|------|------|
 """
         
         for p in rankings:
             ptype = "🤖" if p.get('type') == 'ai' else "👤"
-            md += f"| {p['rank']} | {p.get('display_name', p.get('name'))} | {ptype} | {p.get('weekly_points', 0)} | {p.get('weekly_matches', 0)} | {p.get('win_rate', 0)}% | {p.get('weekly_kills', 0)} |\n"
+            md += f"| {p['rank']} | {self._format_rank_change(p)} | {p.get('display_name', p.get('name'))} | {ptype} | {p.get('weekly_points', 0)} | {p.get('weekly_matches', 0)} | {p.get('win_rate', 0)}% | {p.get('weekly_kills', 0)} |\n"
         
         # AI vs Human 对决统计
         md += f"""
@@ -247,12 +218,12 @@ class WeeklyReportGenerator:
         # 进步最快
         improved = report.get('most_improved', [])
         if improved:
-            md += """## 🏅 本周MVP
+            md += """## 🏅 本周进步最快
 
 """
             for i, p in enumerate(improved):
                 ptype = "🤖" if p.get('type') == 'ai' else "👤"
-                md += f"{i+1}. {p.get('display_name', p.get('name'))} {ptype} - {p.get('weekly_points', 0)}分 ({p.get('weekly_wins', 0)}胜 {p.get('weekly_matches', 0)}场)\n"
+                md += f"{i+1}. {p.get('display_name', p.get('name'))} {ptype} - {p.get('weekly_points', 0)}分 (较上周 {p.get('point_change', 0):+d}，{p.get('weekly_wins', 0)}胜 {p.get('weekly_matches', 0)}场)\n"
         
         # 详细排行（续）
         if len(rankings) > 10:
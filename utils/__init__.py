@@ -1,8 +1,11 @@
 """
 工具模块
 """
+from .lazy import lazy_exports
 
-from .agent_loader import AgentLoader
-
-__all__ = ['AgentLoader']
+_EXPORTS = {
+    'AgentLoader': '.agent_loader',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
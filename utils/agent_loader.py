@@ -2,36 +2,38 @@
 Agent自动加载器
 自动发现并加载participants目录下的所有Agent
 """
-import os
-import importlib
-import importlib.util
-import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from game.agent import Agent
+from .manifest import ManifestCache
 
 
 class AgentLoader:
     """Agent加载器"""
     
-    def __init__(self, participants_dir: str = "participants"):
+    def __init__(self, participants_dir: str = "participants", manifest_file: Optional[str] = None):
         """
         初始化Agent加载器
         
         Args:
             participants_dir: 参赛者目录路径
+            manifest_file: 清单缓存文件（见 utils.manifest），None 表示参赛者目录下的 .manifest.json
         """
         self.participants_dir = Path(participants_dir)
         self.loaded_agents: Dict[str, Any] = {}
+        self.manifest = ManifestCache(participants_dir, manifest_file)
     
     def discover_agents(self) -> List[Dict[str, Any]]:
         """
         发现所有参赛者的Agent
         
+        agent.py 未修改的参赛者直接使用清单中记录的类名，不导入模块；
+        需要Agent类时调用 load_agent_class(info)。
+        
         Returns:
             包含Agent信息的列表，每个元素包含：
             - name: 参赛者名称（目录名）
-            - agent_class: Agent类
+            - class_name: Agent类名
             - path: Agent文件路径
         """
         agents = []
@@ -41,6 +43,7 @@ class AgentLoader:
             return agents
         
         # 遍历所有子目录
+        found = []
         for player_dir in self.participants_dir.iterdir():
             if not player_dir.is_dir():
                 continue
@@ -55,75 +58,55 @@ class AgentLoader:
             if not agent_file.exists():
                 print(f"警告: {player_name} 目录下没有找到 agent.py")
                 continue
+            found.append(player_name)
             
             # 尝试加载Agent
             try:
-                agent_class = self._load_agent_from_file(agent_file, player_name)
-                if agent_class:
-                    agents.append({
-                        'name': player_name,
-                        'agent_class': agent_class,
-                        'path': str(agent_file)
-                    })
-                    print(f"[OK] 已加载: {player_name}")
+                record = self.manifest.lookup(player_name, 'loader', self._find_agent_class)
+                if record is None:
+                    raise ValueError(f"在 {agent_file} 中未找到Agent类")
+                agents.append({
+                    'name': player_name,
+                    'class_name': record['class_name'],
+                    'path': str(agent_file)
+                })
+                print(f"[OK] 已加载: {player_name}")
             except Exception as e:
                 print(f"[ERROR] 加载 {player_name} 失败: {e}")
         
+        self.manifest.prune(found)
+        self.manifest.save()
         return agents
     
-    def _load_agent_from_file(self, agent_file: Path, player_name: str):
+    @staticmethod
+    def _find_agent_class(module) -> Optional[Dict[str, Any]]:
         """
-        从文件加载Agent类
+        在模块中查找Agent类
         
-        Args:
-            agent_file: Agent文件路径
-            player_name: 参赛者名称
-            
         Returns:
-            Agent类，如果加载失败返回None
+            {'class_name': 类名}，未找到时返回 None
         """
-        # 构建模块路径
-        module_path = f"participants.{player_name}.agent"
-        
-        # 将文件所在目录添加到sys.path（如果需要）
-        parent_dir = str(agent_file.parent.parent)
-        if parent_dir not in sys.path:
-            sys.path.insert(0, parent_dir)
+        # 首先查找名为Agent的类
+        if hasattr(module, 'Agent'):
+            return {'class_name': 'Agent'}
+        # 查找所有继承自Agent的类
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if (isinstance(attr, type) and 
+                issubclass(attr, Agent) and 
+                attr != Agent):
+                return {'class_name': attr_name}
+        return None
+    
+    def load_agent_class(self, info: Dict[str, Any]) -> type:
+        """
+        导入 discover_agents 返回的Agent类（同一进程内只导入一次）
         
-        # 动态导入模块
+        Args:
+            info: discover_agents 返回的元素
+        """
         try:
-            # 如果模块已经加载，先移除
-            if module_path in sys.modules:
-                del sys.modules[module_path]
-            
-            spec = importlib.util.spec_from_file_location(module_path, agent_file)
-            if spec is None or spec.loader is None:
-                raise ImportError(f"无法创建模块规范: {module_path}")
-            
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # 查找Agent类（优先查找名为Agent的类，否则查找继承自Agent的类）
-            agent_class = None
-            
-            # 首先查找名为Agent的类
-            if hasattr(module, 'Agent'):
-                agent_class = getattr(module, 'Agent')
-            else:
-                # 查找所有继承自Agent的类
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if (isinstance(attr, type) and 
-                        issubclass(attr, Agent) and 
-                        attr != Agent):
-                        agent_class = attr
-                        break
-            
-            if agent_class is None:
-                raise ValueError(f"在 {agent_file} 中未找到Agent类")
-            
-            return agent_class
-            
+            return self.manifest.load_class(info['name'], info['class_name'])
         except Exception as e:
             raise Exception(f"加载模块失败: {e}")
     
@@ -142,7 +125,7 @@ class AgentLoader:
         
         for info in agents_info:
             try:
-                agent_class = info['agent_class']
+                agent_class = self.load_agent_class(info)
                 player_name = info['name']
                 
                 # 创建Agent实例
@@ -1,28 +1,73 @@
 """
 数据库管理模块 - SQLite
 管理选手数据、比赛记录、积分历史
+
+使用 WAL 日志模式，每个线程有自己的连接（线程结束时自动关闭）；批量写入请放在 transaction() 中，
+整批只提交一次，比赛记录与积分历史另有 executemany 批量接口。
 """
 import sqlite3
 import json
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Set
+from datetime import datetime, timedelta
+
+
+class _ThreadToken:
+    """存放在线程局部存储中的标记对象：线程结束时随线程局部数据一起被回收，触发连接关闭"""
+
+
+def _release_connection(conn: sqlite3.Connection, connections: Set[sqlite3.Connection],
+                        lock: threading.Lock):
+    """关闭已结束线程的连接并从登记表中移除（不引用 Database，避免阻止其被回收）"""
+    with lock:
+        connections.discard(conn)
+    conn.close()
 
 
 class Database:
     """SQLite数据库管理器"""
     
-    def __init__(self, db_path: str = "data/tournament.db"):
+    def __init__(self, db_path: str = "data/tournament.db", busy_timeout: float = 30.0):
+        """
+        Args:
+            db_path: 数据库文件路径
+            busy_timeout: 等待其他连接释放写锁的秒数
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn: Optional[sqlite3.Connection] = None
-        self._connect()
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
         self._create_tables()
     
-    def _connect(self):
-        """建立数据库连接"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（首次访问时建立）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """为当前线程建立数据库连接（WAL 模式：读不阻塞写，提交只追加日志）"""
+        # check_same_thread=False 只是为了 close() 能关闭其他线程的连接，连接本身不跨线程使用
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.depth = 0
+        with self._lock:
+            self._connections.add(conn)
+        # 线程结束时自动关闭它的连接，短生命周期线程（Web 请求线程、GUI 辅助线程）不会累积文件句柄
+        token = _ThreadToken()
+        self._local.token = token
+        weakref.finalize(token, _release_connection, conn, self._connections, self._lock)
+        return conn
     
     def _create_tables(self):
         """创建所有表"""
@@ -105,21 +150,122 @@ class Database:
             )
         """)
         
+        # 等级分表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ratings (
+                participant_id TEXT PRIMARY KEY,
+                rating REAL NOT NULL,
+                games INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (participant_id) REFERENCES participants(id)
+            )
+        """)
+        
+        # 选手每日 / 每周累计统计（比赛记录时增量更新）
+        for table, key in (('daily_player_stats', 'date'), ('weekly_player_stats', 'week')):
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} TEXT NOT NULL,
+                    participant_id TEXT NOT NULL,
+                    matches INTEGER DEFAULT 0,
+                    wins INTEGER DEFAULT 0,
+                    kills INTEGER DEFAULT 0,
+                    deaths INTEGER DEFAULT 0,
+                    points INTEGER DEFAULT 0,
+                    rank INTEGER,
+                    PRIMARY KEY ({key}, participant_id),
+                    FOREIGN KEY (participant_id) REFERENCES participants(id)
+                )
+            """)
+            # 旧数据库补上名次列，并一次性回填已有各期的名次
+            columns = {row['name'] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            if 'rank' not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN rank INTEGER")
+                cursor.execute(f"""
+                    UPDATE {table} SET rank = ranked.r
+                    FROM (SELECT {key} AS period, participant_id,
+                                 ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY {self._PERIOD_ORDER}) AS r
+                          FROM {table}) AS ranked
+                    WHERE {table}.{key} = ranked.period AND {table}.participant_id = ranked.participant_id
+                """)
+            # 按选手查询走势
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_participant ON {table}(participant_id, {key})")
+        
+        # 每日赛事汇总
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_summary (
+                date TEXT PRIMARY KEY,
+                week TEXT NOT NULL,
+                total_matches INTEGER DEFAULT 0,
+                completed INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                ai_wins INTEGER DEFAULT 0,
+                human_wins INTEGER DEFAULT 0
+            )
+        """)
+        
         # 创建索引
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_summary_week ON daily_summary(week)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_date ON daily_matches(date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_point_history_date ON point_history(date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_point_history_participant ON point_history(participant_id, date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_weekly_rankings_week ON weekly_rankings(week)")
         
         self.conn.commit()
     
+    @contextmanager
+    def transaction(self):
+        """
+        工作单元：将多次写操作合并为一个事务
+        
+        在 with 块内调用的写方法不再逐条提交，退出时统一提交；出现异常则整体回滚。
+        可以嵌套，只有最外层负责提交或回滚。事务属于当前线程的连接，
+        开始时即取得写锁（BEGIN IMMEDIATE），其他线程的写事务排队等待。
+        """
+        conn = self.conn
+        if self._local.depth == 0 and not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.rollback()
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.commit()
+    
+    def _commit(self):
+        """提交当前写操作（处于 transaction() 中时延迟到事务结束）"""
+        if self._local.depth == 0:
+            self.conn.commit()
+    
     def add_participant(self, participant: Dict[str, Any]) -> bool:
-        """添加选手"""
+        """
+        注册或更新选手（单行 upsert）
+        
+        已存在的选手只更新名称、类型等注册信息，累计统计保持不变；新选手的初始统计
+        取自可选的 'stats'（如从导出文件导入时）。participant 中的 'developer' 存入 developer_info，
+        可选的 'created_at' 为注册时间。
+        """
+        stats = participant.get('stats') or {}
         cursor = self.conn.cursor()
         try:
             cursor.execute("""
-                INSERT OR REPLACE INTO participants 
-                (id, name, display_name, type, developer_info, model_info, description, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO participants 
+                (id, name, display_name, type, developer_info, model_info, description,
+                 total_points, total_matches, total_wins, total_kills, total_deaths, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name,
+                    display_name = excluded.display_name,
+                    type = excluded.type,
+                    developer_info = excluded.developer_info,
+                    model_info = excluded.model_info,
+                    description = excluded.description,
+                    updated_at = excluded.updated_at
             """, (
                 participant['id'],
                 participant['name'],
@@ -128,14 +274,24 @@ class Database:
                 participant.get('developer'),
                 participant.get('model_info'),
                 participant.get('description'),
+                stats.get('total_points', 0),
+                stats.get('total_matches', 0),
+                stats.get('total_wins', 0),
+                stats.get('total_kills', 0),
+                stats.get('total_deaths', 0),
+                participant.get('created_at'),
                 datetime.now().isoformat()
             ))
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
             print(f"Error adding participant: {e}")
             return False
     
+    def has_participants(self) -> bool:
+        """选手表是否非空"""
+        return self.conn.execute("SELECT 1 FROM participants LIMIT 1").fetchone() is not None
+    
     def get_participant(self, participant_id: str) -> Optional[Dict]:
         """获取选手信息"""
         cursor = self.conn.cursor()
@@ -144,9 +300,14 @@ class Database:
         return dict(row) if row else None
     
     def get_all_participants(self) -> List[Dict]:
-        """获取所有选手"""
+        """获取所有选手（附带等级分，未定级为 None）"""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM participants ORDER BY total_points DESC")
+        cursor.execute("""
+            SELECT p.*, r.rating
+            FROM participants p
+            LEFT JOIN ratings r ON r.participant_id = p.id
+            ORDER BY p.total_points DESC
+        """)
         return [dict(row) for row in cursor.fetchall()]
     
     def get_participants_by_type(self, ptype: str) -> List[Dict]:
@@ -155,15 +316,17 @@ class Database:
         cursor.execute("SELECT * FROM participants WHERE type = ? ORDER BY total_points DESC", (ptype,))
         return [dict(row) for row in cursor.fetchall()]
     
-    def record_match(self, match_data: Dict[str, Any]) -> int:
-        """记录比赛"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO daily_matches 
-            (date, match_index, agent1_id, agent2_id, agent3_id, agent4_id, 
-             winner_id, agent1_score, agent2_score, agent3_score, agent4_score, replay_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    _MATCH_COLUMNS = ('date', 'match_index', 'agent1_id', 'agent2_id', 'agent3_id', 'agent4_id',
+                      'winner_id', 'agent1_score', 'agent2_score', 'agent3_score', 'agent4_score',
+                      'replay_path')
+    _INSERT_MATCH = f"""
+        INSERT INTO daily_matches ({', '.join(_MATCH_COLUMNS)})
+        VALUES ({', '.join('?' * len(_MATCH_COLUMNS))})
+    """
+    
+    @staticmethod
+    def _match_row(match_data: Dict[str, Any]) -> tuple:
+        return (
             match_data['date'],
             match_data['match_index'],
             match_data.get('agent1_id'),
@@ -176,10 +339,29 @@ class Database:
             match_data.get('agent3_score', 0),
             match_data.get('agent4_score', 0),
             match_data.get('replay_path')
-        ))
-        self.conn.commit()
+        )
+    
+    def record_match(self, match_data: Dict[str, Any]) -> int:
+        """记录比赛"""
+        cursor = self.conn.cursor()
+        cursor.execute(self._INSERT_MATCH, self._match_row(match_data))
+        self._commit()
         return cursor.lastrowid
     
+    def record_matches(self, matches: List[Dict[str, Any]]) -> int:
+        """
+        批量记录比赛（一次 executemany）
+        
+        Args:
+            matches: 与 record_match 参数格式相同的比赛列表
+        
+        Returns:
+            写入的行数
+        """
+        self.conn.executemany(self._INSERT_MATCH, [self._match_row(m) for m in matches])
+        self._commit()
+        return len(matches)
+    
     def update_participant_stats(self, participant_id: str, points: int = 0, 
                                   kills: int = 0, is_win: bool = False):
         """更新选手统计"""
@@ -193,17 +375,213 @@ class Database:
                 updated_at = ?
             WHERE id = ?
         """, (points, 1 if is_win else 0, kills, datetime.now().isoformat(), participant_id))
-        self.conn.commit()
+        self._commit()
     
     def record_point_history(self, participant_id: str, date: str, points: int, 
                             match_id: int = None, reason: str = ""):
         """记录积分变动历史"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self.record_point_history_batch([(participant_id, date, points, match_id, reason)])
+    
+    def record_point_history_batch(self, entries: List[tuple]):
+        """
+        批量记录积分变动历史（一次 executemany）
+        
+        Args:
+            entries: (participant_id, date, points, match_id, reason) 元组列表
+        """
+        self.conn.executemany("""
             INSERT INTO point_history (participant_id, date, points_earned, match_id, reason)
             VALUES (?, ?, ?, ?, ?)
-        """, (participant_id, date, points, match_id, reason))
-        self.conn.commit()
+        """, entries)
+        self._commit()
+    
+    def record_daily_stats(self, participant_id: str, date: str, points: int = 0,
+                           kills: int = 0, deaths: int = 0, is_win: bool = False):
+        """累加选手当日与当周的统计（报告与周榜直接读取这些汇总行）"""
+        values = (participant_id, 1 if is_win else 0, kills, deaths, points)
+        for table, key, period in (('daily_player_stats', 'date', date),
+                                   ('weekly_player_stats', 'week', iso_week(date))):
+            self.conn.execute(f"""
+                INSERT INTO {table} ({key}, participant_id, matches, wins, kills, deaths, points)
+                VALUES (?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT({key}, participant_id) DO UPDATE SET
+                    matches = matches + 1,
+                    wins = wins + excluded.wins,
+                    kills = kills + excluded.kills,
+                    deaths = deaths + excluded.deaths,
+                    points = points + excluded.points
+            """, (period,) + values)
+        self._commit()
+    
+    def record_match_summary(self, date: str, completed: bool, winner_type: Optional[str] = None):
+        """
+        累加当日赛事汇总
+        
+        Args:
+            date: 比赛日期
+            completed: 比赛是否正常完成（否则计为错误场次）
+            winner_type: 胜者类型 'ai' / 'human'，无胜者为 None
+        """
+        self.conn.execute("""
+            INSERT INTO daily_summary (date, week, total_matches, completed, errors, ai_wins, human_wins)
+            VALUES (?, ?, 1, ?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                total_matches = total_matches + 1,
+                completed = completed + excluded.completed,
+                errors = errors + excluded.errors,
+                ai_wins = ai_wins + excluded.ai_wins,
+                human_wins = human_wins + excluded.human_wins
+        """, (date, iso_week(date), 1 if completed else 0, 0 if completed else 1,
+              1 if winner_type == 'ai' else 0, 1 if winner_type == 'human' else 0))
+        self._commit()
+    
+    def get_daily_summary(self, date: str) -> Optional[Dict]:
+        """获取某日赛事汇总"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM daily_summary WHERE date = ?", (date,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_weekly_summary(self, week: str) -> Optional[Dict]:
+        """获取某周赛事汇总（各日汇总之和）"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) AS days,
+                   SUM(total_matches) AS total_matches, SUM(completed) AS completed,
+                   SUM(errors) AS errors, SUM(ai_wins) AS ai_wins, SUM(human_wins) AS human_wins
+            FROM daily_summary WHERE week = ?
+        """, (week,))
+        row = dict(cursor.fetchone())
+        return row if row['days'] else None
+    
+    # 汇总行的名次顺序（与报告、周榜的排序一致）
+    _PERIOD_ORDER = "points DESC, wins DESC, participant_id"
+    
+    def _get_period_stats(self, table: str, key: str, value: str, previous: str) -> List[Dict]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT s.participant_id AS id,
+                   COALESCE(p.name, s.participant_id) AS name,
+                   p.display_name, COALESCE(p.type, 'ai') AS type, p.developer_info,
+                   s.points AS total_points, s.matches AS total_matches, s.wins AS total_wins,
+                   s.kills AS total_kills, s.deaths AS total_deaths, s.rank,
+                   prev.points AS previous_points, prev.rank AS previous_rank
+            FROM {table} s
+            LEFT JOIN participants p ON p.id = s.participant_id
+            LEFT JOIN {table} prev ON prev.{key} = ? AND prev.participant_id = s.participant_id
+            WHERE s.{key} = ?
+            ORDER BY s.points DESC, s.wins DESC, s.participant_id
+        """, (previous, value))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_daily_player_stats(self, date: str) -> List[Dict]:
+        """
+        获取某日选手统计（字段与 get_all_participants 的 total_* 一致，
+        另附 rank 及前一日的 previous_points / previous_rank）
+        """
+        return self._get_period_stats('daily_player_stats', 'date', date, previous_date(date))
+    
+    def get_weekly_player_stats(self, week: str) -> List[Dict]:
+        """
+        获取某周选手统计（字段与 get_all_participants 的 total_* 一致，
+        另附 rank 及上周的 previous_points / previous_rank）
+        """
+        return self._get_period_stats('weekly_player_stats', 'week', week, previous_week(week))
+    
+    def _update_period_ranks(self, table: str, key: str, value: str):
+        self.conn.execute(f"""
+            UPDATE {table} SET rank = ranked.r
+            FROM (SELECT participant_id, ROW_NUMBER() OVER (ORDER BY {self._PERIOD_ORDER}) AS r
+                  FROM {table} WHERE {key} = ?) AS ranked
+            WHERE {table}.{key} = ? AND {table}.participant_id = ranked.participant_id
+        """, (value, value))
+        self._commit()
+    
+    def update_daily_ranks(self, date: str):
+        """按当日积分写入当日汇总行的名次（只涉及该日的行）"""
+        self._update_period_ranks('daily_player_stats', 'date', date)
+    
+    def update_weekly_ranks(self, week: str):
+        """按本周积分写入本周汇总行的名次（只涉及该周的行）"""
+        self._update_period_ranks('weekly_player_stats', 'week', week)
+    
+    def get_participant_trend(self, participant_id: str, weeks: int = 8,
+                              end_week: Optional[str] = None) -> List[Dict]:
+        """
+        获取选手最近若干周的走势
+        
+        Args:
+            participant_id: 选手ID
+            weeks: 周数
+            end_week: 截止周（含），None 表示最近有数据的一周
+        
+        Returns:
+            按周升序的 {'week', 'points', 'matches', 'wins', 'kills', 'deaths', 'rank'} 列表，
+            没有比赛的周不出现
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT week, points, matches, wins, kills, deaths, rank
+            FROM weekly_player_stats
+            WHERE participant_id = ? AND week <= ?
+            ORDER BY week DESC
+            LIMIT ?
+        """, (participant_id, end_week or '9999-W99', weeks))
+        return [dict(row) for row in reversed(cursor.fetchall())]
+    
+    def get_most_improved(self, week: str, limit: int = 3) -> List[Dict]:
+        """
+        获取本周积分比上周提升最多的选手（上周没有比赛按 0 分计）
+        
+        Returns:
+            {'id', 'points', 'previous_points', 'point_change', 'rank', 'previous_rank'} 列表
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT s.participant_id AS id, s.points, prev.points AS previous_points,
+                   s.points - COALESCE(prev.points, 0) AS point_change,
+                   s.rank, prev.rank AS previous_rank
+            FROM weekly_player_stats s
+            LEFT JOIN weekly_player_stats prev ON prev.week = ? AND prev.participant_id = s.participant_id
+            WHERE s.week = ?
+            ORDER BY point_change DESC, s.points DESC, s.wins DESC, s.participant_id
+            LIMIT ?
+        """, (previous_week(week), week, limit))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def save_ratings(self, ratings: Dict[str, float], games: Dict[str, int]):
+        """保存等级分"""
+        now = datetime.now().isoformat()
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO ratings (participant_id, rating, games, updated_at)
+            VALUES (?, ?, ?, ?)
+        """, [(pid, rating, games.get(pid, 0), now) for pid, rating in ratings.items()])
+        self._commit()
+    
+    def get_ratings(self) -> Dict[str, Dict]:
+        """获取所有等级分 {id: {'rating': x, 'games': n}}"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT participant_id, rating, games FROM ratings")
+        return {row['participant_id']: {'rating': row['rating'], 'games': row['games']}
+                for row in cursor.fetchall()}
+    
+    def get_match_scores(self) -> List[Dict[str, int]]:
+        """按记录顺序获取所有比赛的 {选手ID: 表现分}（用于重算等级分）"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT agent1_id, agent2_id, agent3_id, agent4_id,
+                   agent1_score, agent2_score, agent3_score, agent4_score
+            FROM daily_matches ORDER BY id
+        """)
+        history = []
+        for row in cursor.fetchall():
+            scores = {}
+            for i in range(1, 5):
+                pid = row[f'agent{i}_id']
+                if pid:
+                    scores[pid] = row[f'agent{i}_score']
+            history.append(scores)
+        return history
     
     def get_daily_matches(self, date: str) -> List[Dict]:
         """获取某日所有比赛"""
@@ -247,7 +625,7 @@ class Database:
             """, (week, r['id'], r['rank'], r['total_points'], 
                   r.get('total_matches', 0), r.get('total_wins', 0), 
                   r.get('total_kills', 0)))
-        self.conn.commit()
+        self._commit()
     
     def get_weekly_ranking(self, week: str) -> List[Dict]:
         """获取某周排行榜"""
@@ -262,9 +640,13 @@ class Database:
         return [dict(row) for row in cursor.fetchall()]
     
     def close(self):
-        """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
+        """关闭所有线程的数据库连接"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
     
     def __enter__(self):
         return self
@@ -273,6 +655,24 @@ class Database:
         self.close()
 
 
+def iso_week(date: str) -> str:
+    """日期 (YYYY-MM-DD) 所在的 ISO 周标识，如 '2026-W13'"""
+    year, week_num, _ = datetime.strptime(date, '%Y-%m-%d').isocalendar()
+    return f"{year}-W{week_num:02d}"
+
+
+def previous_week(week: str) -> str:
+    """上一个 ISO 周标识，如 '2021-W01' -> '2020-W53'"""
+    year, week_num = week.split('-W')
+    monday = datetime.fromisocalendar(int(year), int(week_num), 1)
+    return iso_week((monday - timedelta(days=7)).strftime('%Y-%m-%d'))
+
+
+def previous_date(date: str) -> str:
+    """前一天 (YYYY-MM-DD)"""
+    return (datetime.strptime(date, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+
+
 # 全局数据库实例
 _db_instance: Optional[Database] = None
 
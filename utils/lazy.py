@@ -0,0 +1,33 @@
+"""
+包级名称延迟导出
+各包的 __init__ 只声明 公开名称 -> 所在子模块 的映射表，导入包本身不加载任何子模块，
+首次访问某个名称时才导入对应子模块并缓存到包的命名空间中。
+"""
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(module_name: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    生成包模块的 __getattr__ 与 __dir__（PEP 562）
+
+    Args:
+        module_name: 包名，传入 __name__
+        exports: {公开名称: 相对子模块名（如 '.engine'）}
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, module_name), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(exports))
+
+    return __getattr__, __dir__
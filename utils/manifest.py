@@ -0,0 +1,162 @@
+"""
+参赛者清单缓存
+把每个 participants/<id>/agent.py 的发现结果（Agent类名与元数据）连同文件的 mtime、大小与内容哈希
+持久化到磁盘。文件未变化的参赛者直接使用清单中的记录，无需导入模块；真正需要创建Agent时才按类名导入。
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = ".manifest.json"
+
+
+def file_digest(path: Path) -> str:
+    """文件内容的 SHA-1 摘要"""
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def exec_agent_module(agent_file: Path, module_name: str):
+    """
+    从文件执行 Agent 模块（每次都重新执行，调用方负责缓存）
+
+    Args:
+        agent_file: agent.py 路径
+        module_name: 模块名，如 participants.<id>.agent
+
+    Returns:
+        模块对象
+    """
+    # 让选手代码中的 participants.xxx 绝对导入可用
+    parent_dir = str(agent_file.parent.parent)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+
+    spec = importlib.util.spec_from_file_location(module_name, agent_file)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"无法创建模块规范: {module_name}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ManifestCache:
+    """
+    参赛者清单缓存
+
+    每个 agent.py 对应一条记录：{'mtime_ns', 'size', 'sha1', 'records': {用途: 发现结果}}。
+    文件的 mtime 与大小不变即视为未修改；mtime 变化但内容哈希相同（如重新检出）时只更新时间戳。
+    不同发现规则（AgentLoader / ParticipantManager）以各自的用途键存放结果，共用一次模块导入。
+    """
+
+    def __init__(self, participants_dir: str = "participants", manifest_file: Optional[str] = None):
+        """
+        Args:
+            participants_dir: 参赛者目录
+            manifest_file: 清单文件路径，None 表示参赛者目录下的 .manifest.json
+        """
+        self.participants_dir = Path(participants_dir)
+        self.manifest_file = Path(manifest_file) if manifest_file else self.participants_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = self._read()
+        self._modules: Dict[str, Any] = {}
+        self._dirty = False
+        self.imports = 0  # 本进程因清单未命中而导入的模块数
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('entries', {})
+
+    def _fresh_entry(self, participant_id: str, agent_file: Path) -> Optional[Dict[str, Any]]:
+        """文件未修改时返回清单中的条目，否则删除旧条目并返回 None"""
+        entry = self.entries.get(participant_id)
+        if entry is None:
+            return None
+        stat = agent_file.stat()
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry
+        if entry['size'] == stat.st_size and entry['sha1'] == file_digest(agent_file):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._dirty = True
+            return entry
+        del self.entries[participant_id]
+        self._modules.pop(participant_id, None)
+        self._dirty = True
+        return None
+
+    def lookup(self, participant_id: str, purpose: str,
+               build: Callable[[Any], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        获取参赛者的发现结果
+
+        Args:
+            participant_id: 参赛者ID（目录名）
+            purpose: 发现规则的用途键
+            build: 清单未命中时调用 build(module) 生成结果（找不到Agent时返回 None）
+
+        Returns:
+            发现结果字典；没有 agent.py 或 build 返回 None 时为 None
+
+        Raises:
+            Exception: 清单未命中且导入模块失败
+        """
+        agent_file = self.participants_dir / participant_id / "agent.py"
+        if not agent_file.exists():
+            return None
+        entry = self._fresh_entry(participant_id, agent_file)
+        if entry is not None and purpose in entry['records']:
+            return entry['records'][purpose]
+
+        record = build(self.load_module(participant_id))
+        if entry is None:
+            stat = agent_file.stat()
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                     'sha1': file_digest(agent_file), 'records': {}}
+            self.entries[participant_id] = entry
+        entry['records'][purpose] = record
+        self._dirty = True
+        return record
+
+    def load_module(self, participant_id: str):
+        """导入（并在本进程内缓存）参赛者的 agent 模块"""
+        module = self._modules.get(participant_id)
+        if module is None:
+            agent_file = self.participants_dir / participant_id / "agent.py"
+            module = exec_agent_module(agent_file, f"participants.{participant_id}.agent")
+            self._modules[participant_id] = module
+            self.imports += 1
+        return module
+
+    def load_class(self, participant_id: str, class_name: str) -> type:
+        """按清单记录的类名导入Agent类"""
+        return getattr(self.load_module(participant_id), class_name)
+
+    def prune(self, participant_ids):
+        """删除已不存在的参赛者的条目"""
+        for stale in set(self.entries) - set(participant_ids):
+            del self.entries[stale]
+            self._dirty = True
+
+    def save(self):
+        """有变化时写回清单（先写临时文件再替换，避免并发读到半个文件）"""
+        if not self._dirty:
+            return
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_file.with_name(f"{self.manifest_file.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.manifest_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"警告: 无法写入参赛者清单 {self.manifest_file}: {e}")
@@ -1,26 +1,87 @@
 """
 选手管理模块
-自动扫描 participants/ 目录，加载选手，识别类型
+自动扫描 participants/ 目录，加载选手，识别类型。
+选手注册信息与累计统计保存在数据库的 participants 表中（按行更新），
+data/participants.json 只是从数据库生成的导出文件。
 """
 import json
-import importlib
-import inspect
+import os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
 
+from .manifest import ManifestCache
+
 
 class ParticipantManager:
     """选手管理器"""
     
-    def __init__(self, participants_dir: str = "participants", data_file: str = "data/participants.json"):
+    def __init__(self, participants_dir: str = "participants", data_file: str = "data/participants.json",
+                 manifest_file: Optional[str] = None, database=None):
+        """
+        Args:
+            participants_dir: 参赛者目录
+            data_file: 选手导出文件（数据库为空时也从这里导入一次）
+            manifest_file: 清单缓存文件（见 utils.manifest），None 表示参赛者目录下的 .manifest.json
+            database: 选手注册表所在的 Database，None 表示首次使用时取 get_database()
+        """
         self.participants_dir = Path(participants_dir)
         self.data_file = Path(data_file)
         self.participants: List[Dict[str, Any]] = []
         self._agent_cache: Dict[str, type] = {}
+        self.manifest = ManifestCache(participants_dir, manifest_file)
+        self._db = database
+    
+    @property
+    def db(self):
+        """选手注册表所在的数据库（只创建 Agent 的工作进程不会打开数据库）"""
+        if self._db is None:
+            from .database import get_database
+            self._db = get_database()
+        return self._db
+    
+    def load_participants(self) -> List[Dict[str, Any]]:
+        """
+        从数据库加载选手（注册信息 + 累计统计）
+        
+        数据库中还没有选手而存在旧的 data/participants.json 时，先在一个事务中把它导入。
+        
+        Returns:
+            选手列表，格式与导出文件中的条目一致
+        """
+        if not self.db.has_participants() and self.data_file.exists():
+            imported = self.load_from_data_file()
+            with self.db.transaction():
+                for participant in imported:
+                    self.db.add_participant(participant)
+            print(f"已从 {self.data_file} 导入 {len(imported)} 名选手")
+        self.participants = [self._row_to_participant(row) for row in self.db.get_all_participants()]
+        return self.participants
+    
+    @staticmethod
+    def _row_to_participant(row: Dict[str, Any]) -> Dict[str, Any]:
+        """数据库行转换为导出文件中的选手条目"""
+        created_at = row.get('created_at') or ''
+        return {
+            "id": row['id'],
+            "name": row['name'],
+            "display_name": row.get('display_name'),
+            "type": row['type'],
+            "developer": row.get('developer_info'),
+            "model_info": row.get('model_info'),
+            "description": row.get('description'),
+            "created_at": str(created_at)[:10],
+            "stats": {
+                "total_matches": row.get('total_matches') or 0,
+                "total_wins": row.get('total_wins') or 0,
+                "total_kills": row.get('total_kills') or 0,
+                "total_deaths": row.get('total_deaths') or 0,
+                "total_points": row.get('total_points') or 0
+            }
+        }
     
     def load_from_data_file(self) -> List[Dict[str, Any]]:
-        """从 data/participants.json 加载选手数据"""
+        """读取 data/participants.json（导出文件，只用于首次导入或离线查看）"""
         if self.data_file.exists():
             with open(self.data_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -28,19 +89,21 @@ class ParticipantManager:
         return self.participants
     
     def save_to_data_file(self):
-        """保存选手数据到文件"""
+        """把数据库中的选手导出到 data/participants.json（先写临时文件再替换）"""
         data = {
             "version": "1.0",
             "last_updated": self._get_date_str(),
-            "participants": self.participants,
+            "participants": self.load_participants(),
             "type_labels": {
                 "ai": "🤖 AI选手",
                 "human": "👤 人类选手"
             }
         }
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.data_file, 'w', encoding='utf-8') as f:
+        tmp = self.data_file.with_name(f"{self.data_file.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.data_file)
     
     def scan_participants_directory(self) -> List[Dict[str, Any]]:
         """扫描 participants/ 目录，识别所有选手"""
@@ -50,53 +113,36 @@ class ParticipantManager:
             print(f"目录不存在: {self.participants_dir}")
             return discovered
         
+        found = []
         for item in self.participants_dir.iterdir():
             if not item.is_dir() or item.name.startswith('_') or item.name.startswith('.'):
                 continue
             
+            found.append(item.name)
             agent_info = self._discover_agent(item)
             if agent_info:
                 discovered.append(agent_info)
         
+        self.manifest.prune(found)
+        self.manifest.save()
         return discovered
     
     def _discover_agent(self, agent_dir: Path) -> Optional[Dict[str, Any]]:
-        """发现单个 Agent 的信息"""
-        agent_file = agent_dir / "agent.py"
-        if not agent_file.exists():
-            return None
-        
+        """发现单个 Agent 的信息（agent.py 未修改时使用清单记录，不导入模块）"""
         try:
-            # 动态导入模块
-            module_name = f"participants.{agent_dir.name}.agent"
-            spec = importlib.util.spec_from_file_location(module_name, agent_file)
-            if not spec or not spec.loader:
+            record = self.manifest.lookup(agent_dir.name, 'participant',
+                                          lambda module: self._describe_module(module, agent_dir))
+            if not record:
                 return None
             
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # 查找 Agent 类
-            agent_class = None
-            for name, obj in inspect.getmembers(module):
-                if inspect.isclass(obj) and hasattr(obj, 'step') and obj.__module__ == module_name:
-                    agent_class = obj
-                    break
-            
-            if not agent_class:
-                return None
-            
-            # 分析 Agent 类型
-            agent_type, developer_info, model_info = self._analyze_agent_class(agent_class, agent_dir)
-            
             return {
                 "id": agent_dir.name,
-                "name": agent_class.__name__,
-                "display_name": self._get_display_name(agent_dir.name, agent_type),
-                "type": agent_type,
-                "developer": developer_info,
-                "model_info": model_info,
-                "description": self._get_description(agent_class),
+                "name": record['class_name'],
+                "display_name": self._get_display_name(agent_dir.name, record['type']),
+                "type": record['type'],
+                "developer": record['developer'],
+                "model_info": record['model_info'],
+                "description": record['description'],
                 "created_at": self._get_date_str(),
                 "stats": {
                     "total_matches": 0,
@@ -111,6 +157,31 @@ class ParticipantManager:
             print(f"Error discovering agent in {agent_dir}: {e}")
             return None
     
+    def _describe_module(self, module, agent_dir: Path) -> Optional[Dict[str, Any]]:
+        """查找模块中的 Agent 类并分析类型，生成清单记录"""
+        agent_class = self._find_agent_class(module)
+        if not agent_class:
+            return None
+        
+        # 分析 Agent 类型
+        agent_type, developer_info, model_info = self._analyze_agent_class(agent_class, agent_dir)
+        return {
+            "class_name": agent_class.__name__,
+            "type": agent_type,
+            "developer": developer_info,
+            "model_info": model_info,
+            "description": self._get_description(agent_class)
+        }
+    
+    @staticmethod
+    def _find_agent_class(module) -> Optional[type]:
+        """查找模块中定义的 Agent 类"""
+        import inspect  # 仅在清单未命中时需要
+        for name, obj in inspect.getmembers(module):
+            if inspect.isclass(obj) and hasattr(obj, 'step') and obj.__module__ == module.__name__:
+                return obj
+        return None
+    
     def _analyze_agent_class(self, agent_class: type, agent_dir: Path) -> tuple:
         """分析 Agent 类，返回 (type, developer_info, model_info)"""
         class_name = agent_class.__name__.lower()
@@ -151,6 +222,7 @@ class ParticipantManager:
     
     def _get_description(self, agent_class: type) -> str:
         """获取 Agent 描述"""
+        import inspect
         doc = inspect.getdoc(agent_class)
         if doc:
             # 取第一行作为描述
@@ -163,29 +235,15 @@ class ParticipantManager:
         return datetime.now().strftime('%Y-%m-%d')
     
     def sync_participants(self) -> Dict[str, Any]:
-        """同步选手数据：扫描目录 + 合并已有统计"""
-        # 加载已有数据
-        existing = {p['id']: p for p in self.load_from_data_file()}
-        
-        # 扫描目录发现新选手
-        discovered = {p['id']: p for p in self.scan_participants_directory()}
+        """同步选手数据：扫描目录，逐个注册/更新到数据库（已有统计保持不变），再导出文件"""
+        self.load_participants()  # 必要时先导入旧的导出文件
         
-        # 合并：保留已有统计，更新新信息
-        merged = []
-        all_ids = set(existing.keys()) | set(discovered.keys())
+        with self.db.transaction():
+            for participant in self.scan_participants_directory():
+                self.db.add_participant(participant)
         
-        for pid in all_ids:
-            if pid in discovered:
-                base = discovered[pid]
-                # 保留已有统计
-                if pid in existing:
-                    base['stats'] = existing[pid].get('stats', base['stats'])
-                merged.append(base)
-            elif pid in existing:
-                merged.append(existing[pid])
-        
-        self.participants = merged
         self.save_to_data_file()
+        merged = self.participants
         
         return {
             'total': len(merged),
@@ -193,16 +251,19 @@ class ParticipantManager:
             'human_count': sum(1 for p in merged if p['type'] == 'human')
         }
     
+    def register_participant(self, participant: Dict[str, Any]) -> bool:
+        """注册或更新单个选手（单行 upsert，不重写其他选手）"""
+        return self.db.add_participant(participant)
+    
     def get_participant(self, participant_id: str) -> Optional[Dict[str, Any]]:
         """获取指定选手信息"""
-        if not self.participants:
-            self.load_from_data_file()
-        return next((p for p in self.participants if p['id'] == participant_id), None)
+        row = self.db.get_participant(participant_id)
+        return self._row_to_participant(row) if row else None
     
     def get_all_participants(self) -> List[Dict[str, Any]]:
         """获取所有选手"""
         if not self.participants:
-            self.load_from_data_file()
+            self.load_participants()
         return self.participants
     
     def get_participants_by_type(self, ptype: str) -> List[Dict[str, Any]]:
@@ -223,29 +284,17 @@ class ParticipantManager:
             agent_class = self._agent_cache[participant_id]
             return agent_class(participant_id)
         
-        agent_dir = self.participants_dir / participant_id
-        agent_file = agent_dir / "agent.py"
-        
+        agent_file = self.participants_dir / participant_id / "agent.py"
         if not agent_file.exists():
             raise ValueError(f"Agent file not found: {agent_file}")
         
-        module_name = f"participants.{participant_id}.agent"
-        spec = importlib.util.spec_from_file_location(module_name, agent_file)
-        if not spec or not spec.loader:
-            raise ValueError(f"Cannot load agent: {participant_id}")
-        
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        
-        # 查找 Agent 类
-        agent_class = None
-        for name, obj in inspect.getmembers(module):
-            if inspect.isclass(obj) and hasattr(obj, 'step') and obj.__module__ == module_name:
-                agent_class = obj
-                break
-        
-        if not agent_class:
+        # 清单中已有类名时直接按名导入
+        record = self.manifest.lookup(participant_id, 'participant',
+                                      lambda module: self._describe_module(module, agent_file.parent))
+        if not record:
             raise ValueError(f"No Agent class found in {agent_file}")
+        agent_class = self.manifest.load_class(participant_id, record['class_name'])
+        self.manifest.save()
         
         self._agent_cache[participant_id] = agent_class
         return agent_class(participant_id)
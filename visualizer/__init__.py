@@ -1,9 +1,12 @@
 """
 可视化工具
 """
+from utils.lazy import lazy_exports
 
-from .console_visualizer import ConsoleVisualizer
-from .web_visualizer import WebVisualizer
-
-__all__ = ['ConsoleVisualizer', 'WebVisualizer']
+_EXPORTS = {
+    'ConsoleVisualizer': '.console_visualizer',
+    'WebVisualizer': '.web_visualizer',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
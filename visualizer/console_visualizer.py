@@ -1,14 +1,24 @@
 """
 命令行可视化工具
 """
-import os
 import sys
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from colorama import init, Fore, Back, Style
 
 init(autoreset=True)
 
+# ANSI 控制序列（Windows 下由 colorama 转换）
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_LINE = "\x1b[K"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+
+def _goto(row: int, col: int) -> str:
+    """光标定位序列（行列从 1 开始）"""
+    return f"\x1b[{row};{col}H"
+
 # 设置Windows控制台编码为UTF-8（如果可能）
 if sys.platform == 'win32':
     try:
@@ -21,7 +31,15 @@ class ConsoleVisualizer:
     """命令行可视化器"""
     
     def __init__(self, map_width: int = 100, map_height: int = 100, 
-                 display_width: int = 60, display_height: int = 30):
+                 display_width: int = 60, display_height: int = 30, max_fps: float = 20.0):
+        """
+        Args:
+            map_width: 地图宽度
+            map_height: 地图高度
+            display_width: 显示宽度（字符）
+            display_height: 显示高度（行）
+            max_fps: 原地刷新的最大帧率，超出的帧直接跳过（0 表示不限制）
+        """
         self.map_width = map_width
         self.map_height = map_height
         self.display_width = display_width
@@ -32,6 +50,26 @@ class ConsoleVisualizer:
         ]
         self.agent_colors = {}
         self.color_index = 0
+        self.max_fps = max_fps
+        
+        # 预先画好边界的空白帧（使用ASCII字符以兼容Windows控制台）
+        self._blank = [[' ' for _ in range(display_width)] for _ in range(display_height)]
+        for i in range(display_height):
+            self._blank[i][0] = '|'
+            self._blank[i][display_width - 1] = '|'
+        for j in range(display_width):
+            self._blank[0][j] = '-'
+            self._blank[display_height - 1][j] = '-'
+        for i, j in [(0, 0), (0, display_width - 1), (display_height - 1, 0),
+                     (display_height - 1, display_width - 1)]:
+            self._blank[i][j] = '+'
+        
+        # 上一帧内容（用于差量刷新）
+        self._prev_rows: Optional[List[str]] = None
+        self._prev_header: Optional[str] = None
+        self._prev_status: List[str] = []
+        self._bottom_row = 1
+        self._last_render_time = 0.0
     
     def _get_agent_color(self, agent_name: str) -> str:
         """获取Agent的颜色"""
@@ -48,26 +86,15 @@ class ConsoleVisualizer:
         display_y = max(0, min(display_y, self.display_height - 1))
         return (display_x, display_y)
     
-    def render(self, state_info: Dict[str, Any], clear: bool = True):
-        """渲染游戏状态"""
-        if clear:
-            os.system('cls' if os.name == 'nt' else 'clear')
-        
-        # 创建显示缓冲区
-        display = [[' ' for _ in range(self.display_width)] 
-                   for _ in range(self.display_height)]
-        
-        # 绘制边界（使用ASCII字符以兼容Windows控制台）
-        for i in range(self.display_height):
-            display[i][0] = '|'
-            display[i][self.display_width - 1] = '|'
-        for j in range(self.display_width):
-            display[0][j] = '-'
-            display[self.display_height - 1][j] = '-'
-        display[0][0] = '+'
-        display[0][self.display_width - 1] = '+'
-        display[self.display_height - 1][0] = '+'
-        display[self.display_height - 1][self.display_width - 1] = '+'
+    def _compose(self, state_info: Dict[str, Any]) -> Tuple[str, List[str], List[str]]:
+        """
+        生成一帧的内容
+        
+        Returns:
+            (标题行, 地图行列表（不含左右边框，长度均为 display_width）, 状态行列表)
+        """
+        # 创建显示缓冲区（复制预先画好边界的空白帧）
+        display = [row[:] for row in self._blank]
         
         # 绘制子弹（不同武器使用不同字符）
         for bullet in state_info['bullets']:
@@ -105,33 +132,116 @@ class ConsoleVisualizer:
                 char = agent_info['name'][0].upper()
                 display[y][x] = char
         
-        # 打印显示
-        print(f"\n回合: {state_info['turn']} | 存活: {state_info['alive_count']}")
-        print("-" * (self.display_width + 2))
-        
-        for row in display:
-            print('|' + ''.join(row) + '|')
-        
-        print("-" * (self.display_width + 2))
+        header = f"回合: {state_info['turn']} | 存活: {state_info['alive_count']}"
         
-        # 打印Agent状态
-        print("\nAgent状态:")
+        # Agent状态
+        status = ["-" * (self.display_width + 2), "", "Agent状态:"]
         for agent_info in state_info['agents']:
             if agent_info['health'] > 0:
                 color = self._get_agent_color(agent_info['name'])
-                print(f"{color}{agent_info['name']:<15} "
-                      f"血量: {agent_info['health']:>3}  "
-                      f"击杀: {agent_info['kills']:>2}  "
-                      f"位置: ({agent_info['position'][0]:>5.1f}, {agent_info['position'][1]:>5.1f})")
+                status.append(f"{color}{agent_info['name']:<15} "
+                              f"血量: {agent_info['health']:>3}  "
+                              f"击杀: {agent_info['kills']:>2}  "
+                              f"位置: ({agent_info['position'][0]:>5.1f}, {agent_info['position'][1]:>5.1f})"
+                              f"{Style.RESET_ALL}")
         
         if state_info['winner']:
-            print(f"\n{Fore.YELLOW}[WIN] 获胜者: {state_info['winner']} [WIN]")
+            status.append("")
+            status.append(f"{Fore.YELLOW}[WIN] 获胜者: {state_info['winner']} [WIN]{Style.RESET_ALL}")
+        
+        return header, [''.join(row) for row in display], status
+    
+    def render(self, state_info: Dict[str, Any], clear: bool = True, force: bool = False) -> bool:
+        """
+        渲染游戏状态
+        
+        clear=True 时在终端原地刷新：首帧清屏一次，之后只用光标定位输出发生变化的单元格和状态行，
+        并按 max_fps 限制刷新频率；clear=False 时按行追加打印整帧。
+        
+        Args:
+            state_info: GameEngine.step() 返回的状态
+            clear: 是否原地刷新
+            force: 忽略帧率限制（分出胜负的帧总会绘制）
+            
+        Returns:
+            本帧是否被绘制（因帧率限制跳过时为 False）
+        """
+        now = time.monotonic()
+        if (clear and not force and not state_info['winner'] and self.max_fps
+                and now - self._last_render_time < 1.0 / self.max_fps):
+            return False
+        self._last_render_time = now
+        
+        header, rows, status = self._compose(state_info)
+        
+        if not clear:
+            print("\n" + header)
+            print("-" * (self.display_width + 2))
+            for row in rows:
+                print('|' + row + '|')
+            for line in status:
+                print(line)
+            return True
+        
+        # 屏幕布局（行号从 1 开始）：标题、上边线、地图行、状态行
+        map_top = 3
+        status_top = map_top + len(rows)
+        out = []
+        if self._prev_rows is None:
+            out.append(HIDE_CURSOR + CLEAR_SCREEN)
+            out.append(_goto(2, 1) + "-" * (self.display_width + 2))
+            for i, row in enumerate(rows):
+                out.append(_goto(map_top + i, 1) + '|' + row + '|')
+            prev_header, prev_status = None, []
+        else:
+            # 只输出变化的单元格（相邻变化合并为一段）
+            for i, (old, new) in enumerate(zip(self._prev_rows, rows)):
+                if old == new:
+                    continue
+                x = 0
+                width = len(new)
+                while x < width:
+                    if old[x] == new[x]:
+                        x += 1
+                        continue
+                    start = x
+                    while x < width and old[x] != new[x]:
+                        x += 1
+                    out.append(_goto(map_top + i, start + 2) + new[start:x])
+            prev_header, prev_status = self._prev_header, self._prev_status
+        
+        if header != prev_header:
+            out.append(_goto(1, 1) + header + CLEAR_LINE)
+        for i, line in enumerate(status):
+            if i >= len(prev_status) or prev_status[i] != line:
+                out.append(_goto(status_top + i, 1) + line + CLEAR_LINE)
+        for i in range(len(status), len(prev_status)):
+            out.append(_goto(status_top + i, 1) + CLEAR_LINE)
+        
+        self._prev_rows, self._prev_header, self._prev_status = rows, header, status
+        self._bottom_row = status_top + len(status)
+        if out:
+            sys.stdout.write(''.join(out))
+            sys.stdout.flush()
+        return True
+    
+    def close(self):
+        """结束原地刷新：把光标移到画面下方并恢复显示，之后的输出不会覆盖画面"""
+        if self._prev_rows is not None:
+            sys.stdout.write(_goto(self._bottom_row, 1) + SHOW_CURSOR + "\n")
+            sys.stdout.flush()
+        self._prev_rows = None
+        self._prev_header = None
+        self._prev_status = []
     
     def render_replay(self, replay_data: List[Dict[str, Any]], delay: float = 0.1):
         """回放游戏"""
-        for state in replay_data:
-            self.render(state, clear=True)
-            time.sleep(delay)
+        try:
+            for state in replay_data:
+                self.render(state, clear=True, force=True)
+                time.sleep(delay)
+        finally:
+            self.close()
     
     def print_match_result(self, agent1_name: str, agent2_name: str, winner: Optional[str]):
         """打印比赛结果"""